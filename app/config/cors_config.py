@@ -0,0 +1,41 @@
+from flask import request
+from flask_cors import CORS
+
+ALLOWED_ORIGINS = [
+    "https://www.companion-lms.com",
+    "https://v0-lms-homepage-mock.vercel.app",
+    "https://companion-lms.com",
+    "http://localhost:3000"
+]
+
+
+def configure_cors(app):
+    """Apply the LMS CORS policy to a Flask app."""
+    # Configure CORS with more comprehensive settings
+    CORS(app, 
+         origins=ALLOWED_ORIGINS,
+         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
+         allow_headers=["Content-Type", "Authorization", "X-Requested-With", "Accept"],
+         supports_credentials=True,
+         expose_headers=["Content-Type", "Authorization"],
+         max_age=3600)
+
+    # Alternative: If you want to allow all origins during development
+    # CORS(app, origins="*")
+
+    # Ensure CORS headers are set for all responses, including errors
+    @app.after_request
+    def after_request(response):
+        origin = request.headers.get('Origin')
+        
+        if origin in ALLOWED_ORIGINS:
+            response.headers.add('Access-Control-Allow-Origin', origin)
+            response.headers.add('Access-Control-Allow-Credentials', 'true')
+            response.headers.add('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS, PATCH')
+            response.headers.add('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Requested-With, Accept')
+            response.headers.add('Access-Control-Expose-Headers', 'Content-Type, Authorization')
+            response.headers.add('Access-Control-Max-Age', '3600')
+        
+        return response
+
+    return app
@@ -30,10 +30,31 @@ GENERATION_MODEL = os.environ.get("GENERATION_MODEL", "gemini-2.0-flash-exp")
 SIMILARITY_THRESHOLD = float(os.environ.get("SIMILARITY_THRESHOLD", "0.3"))  # Lowered from 0.75 to 0.5 for better retrieval
 TOP_K = int(os.environ.get("TOP_K", "5"))
 
+# Hybrid (BM25 + vector) Retrieval Configuration
+HYBRID_RETRIEVAL = os.environ.get("HYBRID_RETRIEVAL", "true").lower() == "true"
+LEXICAL_INDEX_PATH = os.environ.get(
+    "LEXICAL_INDEX_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "lexical_index.pkl")
+)
+RRF_K = int(os.environ.get("RRF_K", "60"))  # Reciprocal-rank fusion damping constant
+
+# Context Assembly Configuration
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", "1500"))  # Max tokens of book excerpts per prompt
+CHARS_PER_TOKEN = float(os.environ.get("CHARS_PER_TOKEN", "4"))  # Rough chars-per-token ratio for budgeting
+
 # Text Splitting Configuration
 CHUNK_SIZE = int(os.environ.get("CHUNK_SIZE", "1000"))
 CHUNK_OVERLAP = int(os.environ.get("CHUNK_OVERLAP", "200"))
 
+# Warm-up Configuration
+# When enabled, each gunicorn worker initializes the index, embedding backend and a
+# dummy query in a background thread right after start-up
+WARMUP_ON_START = os.environ.get("FLIM_FRAME_WARMUP", "false").lower() == "true"
+
+# Request Coalescing Configuration
+# Identical concurrent questions on /api/ai/ask and /api/flim-frame/ask share one upstream stream
+AI_REQUEST_COALESCING = os.environ.get("AI_REQUEST_COALESCING", "true").lower() == "true"
+
 # Batch Processing Configuration
 BATCH_SIZE = int(os.environ.get("BATCH_SIZE", "50"))
 
@@ -0,0 +1,4 @@
+"""
+Job ingestion: parse job listings, fetch detail pages concurrently and
+bulk-load new jobs into lms.jobs_master (see ingest_jobs.py for the CLI).
+"""
@@ -0,0 +1,36 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+JOB_FETCH_TIMEOUT_SECONDS = float(os.getenv('JOB_FETCH_TIMEOUT_SECONDS', 15))
+JOB_FETCH_USER_AGENT = os.getenv(
+    'JOB_FETCH_USER_AGENT',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0 Safari/537.36'
+)
+
+# requests.Session is not thread-safe; each pool thread keeps its own (with keep-alive)
+_local = threading.local()
+
+
+def _get_session():
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+        session.mount('https://', HTTPAdapter(max_retries=retry))
+        session.mount('http://', HTTPAdapter(max_retries=retry))
+        session.headers['User-Agent'] = JOB_FETCH_USER_AGENT
+        _local.session = session
+    return session
+
+
+def fetch_page(url):
+    """
+    Fetch one page and return its HTML. Raises on HTTP errors.
+    """
+    response = _get_session().get(url, timeout=JOB_FETCH_TIMEOUT_SECONDS)
+    response.raise_for_status()
+    return response.text
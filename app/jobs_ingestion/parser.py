@@ -0,0 +1,54 @@
+from bs4 import BeautifulSoup, SoupStrainer
+
+BASE_URL = "https://www.naukri.com"
+
+JOB_WRAPPER_CLASS = 'srp-jobtuple-wrapper'
+JOB_DESCRIPTION_CLASS = 'styles_JDC__dang-inner-html__h0K4t'
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+
+def _text(tag):
+    return tag.get_text(strip=True) if tag else None
+
+
+def parse_job_listings(html, base_url=BASE_URL):
+    """
+    Extract the job cards from a search results page.
+
+    Only the job card elements are parsed (SoupStrainer), which keeps large
+    result pages cheap. Returns dicts with title, company, salary, location,
+    skills (list) and url.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer('div', class_=JOB_WRAPPER_CLASS))
+    jobs = []
+    for card in soup.find_all('div', class_=JOB_WRAPPER_CLASS):
+        title_tag = card.find('a', class_='title')
+        url = title_tag.get('href') if title_tag else None
+        if url and not url.startswith('http'):
+            url = base_url + url
+        jobs.append({
+            'title': _text(title_tag),
+            'company': _text(card.find('a', class_='comp-name')),
+            'salary': _text(card.find('span', class_='sal-wrap')) or 'Not Disclosed',
+            'location': _text(card.find('span', class_='loc-wrap')),
+            'skills': [skill.get_text(strip=True) for skill in card.find_all('li', class_='tag-li')],
+            'url': url
+        })
+    return jobs
+
+
+def parse_job_description(html):
+    """
+    Extract the description text from a job detail page (None if not found)
+    """
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer('div', class_=JOB_DESCRIPTION_CLASS))
+    description = soup.find('div', class_=JOB_DESCRIPTION_CLASS)
+    if not description:
+        return None
+    lines = (line.strip() for line in description.get_text(separator="\n").splitlines())
+    return "\n".join(line for line in lines if line)
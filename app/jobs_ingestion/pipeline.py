@@ -0,0 +1,187 @@
+import csv
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from app.jobs_ingestion.fetcher import fetch_page
+from app.jobs_ingestion.parser import parse_job_description, parse_job_listings
+from app.models.job_recommendation_model import add_new_jobs_to_recommendations
+
+JOB_FETCH_WORKERS = int(os.getenv('JOB_FETCH_WORKERS', 8))
+
+# Columns loaded into lms.jobs_master (job_id is assigned on insert)
+JOB_LOAD_COLUMNS = ('job_title', 'company', 'salary', 'location', 'skills', 'apply_link', 'description')
+
+
+def load_seen_urls(conn):
+    """
+    Apply links already in lms.jobs_master, so their detail pages are not fetched again
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT apply_link FROM lms.jobs_master WHERE apply_link IS NOT NULL")
+        return {row[0] for row in cursor.fetchall()}
+
+
+def select_new_jobs(jobs, seen_urls):
+    """
+    Drop jobs without a URL or whose URL is in seen_urls (also de-duplicates within the run).
+    seen_urls is updated in place.
+    """
+    new_jobs = []
+    for job in jobs:
+        url = job.get('url')
+        if not url or url in seen_urls:
+            continue
+        seen_urls.add(url)
+        new_jobs.append(job)
+    return new_jobs
+
+
+def _fetch_description(fetch, url):
+    return parse_job_description(fetch(url))
+
+
+def fetch_descriptions(jobs, fetch=fetch_page, workers=JOB_FETCH_WORKERS):
+    """
+    Fetch and parse the detail page of every job with a bounded thread pool,
+    filling job['description'] in place. Returns the failures as [{url, error}];
+    a page without a description (captcha, consent wall, changed layout) counts
+    as a failure too, since storing it would stop the job from being retried.
+    """
+    failures = []
+    if not jobs:
+        return failures
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as pool:
+        futures = {pool.submit(_fetch_description, fetch, job['url']): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                job['description'] = future.result()
+            except Exception as e:
+                job['description'] = None
+                failures.append({'url': job['url'], 'error': str(e)})
+                continue
+            if not job['description']:
+                failures.append({'url': job['url'], 'error': 'No job description found on the detail page'})
+    return failures
+
+
+def _job_row(job):
+    return (
+        job.get('title'),
+        job.get('company'),
+        job.get('salary'),
+        job.get('location'),
+        ', '.join(job.get('skills') or []),
+        job.get('url'),
+        job.get('description')
+    )
+
+
+def upsert_jobs(conn, jobs):
+    """
+    Bulk-load jobs with one COPY into a staging table, then in one statement
+    update the jobs whose apply_link already exists and insert the rest with
+    job_ids following the current maximum. Commits and returns
+    {'inserted_ids': [...], 'updated_rows': n}.
+    """
+    if not jobs:
+        return {'inserted_ids': [], 'updated_rows': 0}
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row_num, job in enumerate(jobs, start=1):
+        writer.writerow((row_num,) + _job_row(job))
+    buffer.seek(0)
+
+    columns = ', '.join(JOB_LOAD_COLUMNS)
+    updates = ', '.join(
+        f"{col} = COALESCE(s.{col}, jm.{col})" for col in JOB_LOAD_COLUMNS if col != 'apply_link'
+    )
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS jobs_staging
+            (
+                row_num integer,
+                job_title text,
+                company text,
+                salary text,
+                location text,
+                skills text,
+                apply_link text,
+                description text
+            ) ON COMMIT DELETE ROWS;
+            TRUNCATE jobs_staging;
+            """)
+            cursor.copy_expert(f"COPY jobs_staging (row_num, {columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+            # job_ids are max + n, so concurrent loads must not interleave
+            cursor.execute("LOCK TABLE lms.jobs_master IN SHARE ROW EXCLUSIVE MODE")
+            cursor.execute(f"""
+            WITH staged AS (
+                SELECT DISTINCT ON (apply_link) *
+                FROM jobs_staging
+                ORDER BY apply_link, row_num DESC
+            ),
+            updated AS (
+                UPDATE lms.jobs_master AS jm
+                SET {updates}
+                FROM staged AS s
+                WHERE jm.apply_link = s.apply_link
+                RETURNING jm.job_id
+            ),
+            base AS (
+                SELECT COALESCE(MAX(job_id), 0) AS max_id FROM lms.jobs_master
+            ),
+            inserted AS (
+                INSERT INTO lms.jobs_master (job_id, {columns})
+                SELECT base.max_id + row_number() OVER (ORDER BY s.row_num), {', '.join(f's.{col}' for col in JOB_LOAD_COLUMNS)}
+                FROM staged AS s
+                CROSS JOIN base
+                WHERE NOT EXISTS (SELECT 1 FROM lms.jobs_master jm WHERE jm.apply_link = s.apply_link)
+                RETURNING job_id
+            )
+            SELECT
+                COALESCE((SELECT array_agg(job_id ORDER BY job_id) FROM inserted), '{{}}'),
+                (SELECT COUNT(*) FROM updated)
+            """)
+            inserted_ids, updated_rows = cursor.fetchone()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return {'inserted_ids': list(inserted_ids), 'updated_rows': updated_rows}
+
+
+def ingest_jobs(conn, listing_pages, fetch=fetch_page, workers=JOB_FETCH_WORKERS, refresh_existing=False):
+    """
+    Run the pipeline over already-fetched search result pages (HTML strings):
+    parse the job cards, skip jobs already stored (unless refresh_existing),
+    fetch the remaining detail pages concurrently, bulk-upsert the jobs and
+    add the new ones to the precomputed user recommendations. Jobs whose detail
+    page could not be fetched or had no description are not stored, so the
+    next run tries them again.
+    """
+    listed = []
+    for html in listing_pages:
+        listed.extend(parse_job_listings(html))
+
+    seen_urls = set() if refresh_existing else load_seen_urls(conn)
+    jobs = select_new_jobs(listed, seen_urls)
+    failures = fetch_descriptions(jobs, fetch, workers)
+    failed_urls = {failure['url'] for failure in failures}
+    loaded = upsert_jobs(conn, [job for job in jobs if job['url'] not in failed_urls])
+
+    recommendation_users = 0
+    if loaded['inserted_ids']:
+        recommendation_users = add_new_jobs_to_recommendations(conn, loaded['inserted_ids'])
+
+    return {
+        'listed': len(listed),
+        'skipped': len(listed) - len(jobs),
+        'fetched': len(jobs) - len(failures),
+        'fetch_failures': failures,
+        'inserted': len(loaded['inserted_ids']),
+        'updated': loaded['updated_rows'],
+        'recommendation_users': recommendation_users
+    }
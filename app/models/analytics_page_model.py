@@ -0,0 +1,175 @@
+from psycopg2.extras import RealDictCursor
+
+from app.utils.pagination import encode_cursor
+
+# Per-status counters used by the summary views
+_STATUS_COUNTS = """
+    COUNT(*) AS course_count,
+    COUNT(*) FILTER (WHERE f.enrollment_status = 'Enrolled') AS enrolled,
+    COUNT(*) FILTER (WHERE f.completion_status = 'Completed') AS completed,
+    COUNT(*) FILTER (WHERE f.completion_status = 'In Progress') AS in_progress,
+    COUNT(*) FILTER (WHERE f.completion_status = 'Not Started') AS not_started
+"""
+
+_COURSE_JSON = """
+    JSON_AGG(
+        JSON_BUILD_OBJECT(
+            'course_id', f.course_id,
+            'course_name', f.course_name,
+            'enrollment_status', f.enrollment_status,
+            'completion_status', f.completion_status,
+            'certificate_id', f.certificate_id,
+            'validity', f.validity,
+            'updated_date', f.updated_date
+        ) ORDER BY f.course_id
+    ) AS courses
+"""
+
+
+def _filter_clause(batch_key, filters):
+    conditions = []
+    params = {}
+    if 'batch_id' in filters:
+        conditions.append(f"{batch_key} = %(batch_id)s")
+        params['batch_id'] = filters['batch_id']
+    if 'course_id' in filters:
+        conditions.append("course_id = %(course_id)s")
+        params['course_id'] = filters['course_id']
+    if 'completion_status' in filters:
+        conditions.append("completion_status = %(completion_status)s")
+        params['completion_status'] = filters['completion_status']
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where, params
+
+
+def fetch_analytics_page(conn, source_sql, batch_key, page):
+    """
+    Fetch one keyset-paginated page of batch analytics.
+
+    :param conn: Database connection
+    :param source_sql: SELECT returning one row per (user, course) with the analytics columns
+    :param batch_key: Name of the batch column in source_sql ('batch_id' or 'qc_id')
+    :param page: Parsed arguments from parse_analytics_page_args
+    :return: Dictionary with 'items', 'next_cursor' and the page settings
+    """
+    where, params = _filter_clause(batch_key, page['filters'])
+    params['limit'] = page['limit'] + 1  # One extra row tells us whether there is a next page
+    cursor_values = page['cursor'] or {}
+
+    if page['page_by'] == 'user':
+        keyset = ""
+        if cursor_values:
+            keyset = f"WHERE ({batch_key}, user_id) > (%(after_batch)s, %(after_user)s)"
+            params['after_batch'] = cursor_values.get('batch')
+            params['after_user'] = cursor_values.get('user')
+        detail = _STATUS_COUNTS if page['summary'] else _COURSE_JSON
+        query = f"""
+        WITH filtered AS (
+            SELECT * FROM ({source_sql}) AS src {where}
+        ),
+        page_keys AS (
+            SELECT DISTINCT {batch_key}, user_id FROM filtered
+            {keyset}
+            ORDER BY {batch_key}, user_id
+            LIMIT %(limit)s
+        )
+        SELECT f.{batch_key}, f.batch_name, f.user_id, f.username, f.initial_assessment, {detail}
+        FROM filtered AS f
+        JOIN page_keys AS p ON p.{batch_key} = f.{batch_key} AND p.user_id = f.user_id
+        GROUP BY f.{batch_key}, f.batch_name, f.user_id, f.username, f.initial_assessment
+        ORDER BY f.{batch_key}, f.user_id
+        """
+    else:
+        keyset = ""
+        if cursor_values:
+            keyset = f"WHERE {batch_key} > %(after_batch)s"
+            params['after_batch'] = cursor_values.get('batch')
+        if page['summary']:
+            query_tail = f"""
+            SELECT f.{batch_key}, f.batch_name, COUNT(DISTINCT f.user_id) AS user_count, {_STATUS_COUNTS}
+            FROM filtered AS f
+            JOIN page_keys AS p ON p.{batch_key} = f.{batch_key}
+            GROUP BY f.{batch_key}, f.batch_name
+            ORDER BY f.{batch_key}
+            """
+        else:
+            query_tail = f"""
+            , user_courses AS (
+                SELECT f.{batch_key}, f.batch_name, f.user_id, f.username, f.initial_assessment, {_COURSE_JSON}
+                FROM filtered AS f
+                JOIN page_keys AS p ON p.{batch_key} = f.{batch_key}
+                GROUP BY f.{batch_key}, f.batch_name, f.user_id, f.username, f.initial_assessment
+            )
+            SELECT {batch_key}, batch_name,
+                JSON_AGG(
+                    JSON_BUILD_OBJECT(
+                        'user_id', user_id,
+                        'username', username,
+                        'initial_assessment', initial_assessment,
+                        'courses', courses
+                    ) ORDER BY user_id
+                ) AS users
+            FROM user_courses
+            GROUP BY {batch_key}, batch_name
+            ORDER BY {batch_key}
+            """
+        query = f"""
+        WITH filtered AS (
+            SELECT * FROM ({source_sql}) AS src {where}
+        ),
+        page_keys AS (
+            SELECT DISTINCT {batch_key} FROM filtered
+            {keyset}
+            ORDER BY {batch_key}
+            LIMIT %(limit)s
+        )
+        {query_tail}
+        """
+
+    with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        cursor.execute(query, params)
+        items = cursor.fetchall()
+
+    next_cursor = None
+    if len(items) > page['limit']:
+        items = items[:page['limit']]
+        last = items[-1]
+        values = {'page_by': page['page_by'], 'batch': last[batch_key]}
+        if page['page_by'] == 'user':
+            values['user'] = last['user_id']
+        next_cursor = encode_cursor(values)
+
+    return {
+        'page_by': page['page_by'],
+        'summary': page['summary'],
+        'filters': page['filters'],
+        'limit': page['limit'],
+        'items': items,
+        'next_cursor': next_cursor
+    }
+
+
+ANALYTICS_EXPORT_COLUMNS = (
+    'batch_name', 'user_id', 'username', 'initial_assessment', 'course_id', 'course_name',
+    'enrollment_status', 'completion_status', 'certificate_id', 'validity', 'updated_date'
+)
+
+
+def iter_analytics_rows(conn, source_sql, batch_key, filters, itersize=2000):
+    """
+    Yield flat (user, course) analytics rows from a server-side (named) cursor.
+    Only ``itersize`` rows are held in memory at a time; the caller owns the connection.
+    """
+    where, params = _filter_clause(batch_key, filters)
+    columns = ', '.join((batch_key,) + ANALYTICS_EXPORT_COLUMNS)
+    query = f"""
+    SELECT {columns}
+    FROM ({source_sql}) AS src
+    {where}
+    ORDER BY {batch_key}, user_id, course_id
+    """
+    with conn.cursor(name='analytics_export', cursor_factory=RealDictCursor) as cursor:
+        cursor.itersize = itersize
+        cursor.execute(query, params)
+        for row in cursor:
+            yield row
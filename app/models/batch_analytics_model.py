@@ -0,0 +1,295 @@
+import os
+import threading
+import time
+
+from psycopg2.extras import RealDictCursor
+
+from app.utils.db_utils import get_db_connection
+from app.config.database import DB_CONFIG
+from app.models.analytics_page_model import fetch_analytics_page
+
+BATCH_ANALYTICS_REFRESH_SECONDS = int(os.getenv('BATCH_ANALYTICS_REFRESH_SECONDS', 300))
+BATCH_ANALYTICS_REFRESH_DEBOUNCE_SECONDS = int(os.getenv('BATCH_ANALYTICS_REFRESH_DEBOUNCE_SECONDS', 5))
+
+# Shared by every worker so only one of them refreshes the view at a time
+_REFRESH_LOCK_KEY = 703815001
+_VIEW_NAME = 'lms.batch_analytics_mv'
+
+_view_ready = False
+_view_lock = threading.Lock()
+
+_refresh_requested = threading.Event()
+_refresher_pid = None
+_refresher_lock = threading.Lock()
+
+
+# One row per (user, batch course); the same flattening the live analytics query used
+BATCH_ANALYTICS_ROWS_QUERY = """
+SELECT
+    u.user_id,
+    u.username,
+    u.batch_id,
+    b.batch_name,
+    u.initial_assessment,
+    cm.course_id,
+    cm.course_name,
+    CASE
+      WHEN uce.user_id IS NOT NULL THEN 'Enrolled'
+      ELSE 'Not Enrolled'
+    END AS enrollment_status,
+    CASE
+      WHEN ce.certificate_id IS NOT NULL THEN 'Completed'
+      WHEN uce.user_id IS NOT NULL THEN 'In Progress'
+      ELSE 'Not Started'
+    END AS completion_status,
+    ce.certificate_id,
+    bc.validity,
+    bc.updated_date
+FROM
+    lms.users AS u
+LEFT JOIN
+    lms.batch AS b ON b.batch_id = u.batch_id
+LEFT JOIN
+    lms.batch_course AS bc ON bc.batch_id = u.batch_id
+LEFT JOIN
+    lms.course_master AS cm ON cm.course_id = bc.course_id
+LEFT JOIN
+    lms.user_course_enrollment AS uce ON uce.user_id = u.user_id AND uce.course_id = bc.course_id
+LEFT JOIN
+    lms.certificate_master AS cert_m ON cert_m.course_id = cm.course_id
+LEFT JOIN
+    lms.user_certicate_enrollment AS ce ON ce.certificate_id = cert_m.certificate_id AND ce.user_id = u.user_id
+WHERE
+    cm.course_id IS NOT NULL
+"""
+
+
+def ensure_batch_analytics_view(conn):
+    """
+    Ensure the batch analytics materialized view and its refresh log exist (checked once per worker)
+    """
+    global _view_ready
+    if _view_ready:
+        return
+    with _view_lock:
+        if _view_ready:
+            return
+        with conn.cursor() as cursor:
+            cursor.execute(f"""
+            CREATE MATERIALIZED VIEW IF NOT EXISTS {_VIEW_NAME} AS
+            SELECT
+                row_number() OVER (ORDER BY data.batch_id, data.user_id, data.course_id, data.certificate_id) AS row_id,
+                data.*
+            FROM ({BATCH_ANALYTICS_ROWS_QUERY}) AS data
+            WITH DATA;
+            -- REFRESH ... CONCURRENTLY needs a unique index
+            CREATE UNIQUE INDEX IF NOT EXISTS batch_analytics_mv_row_idx ON {_VIEW_NAME} (row_id);
+            CREATE INDEX IF NOT EXISTS batch_analytics_mv_batch_user_idx ON {_VIEW_NAME} (batch_id, user_id);
+            CREATE TABLE IF NOT EXISTS lms.analytics_refresh_log
+            (
+                view_name character varying(100) PRIMARY KEY,
+                refreshed_at timestamp NOT NULL,
+                duration_ms integer
+            );
+            INSERT INTO lms.analytics_refresh_log (view_name, refreshed_at)
+            VALUES ('{_VIEW_NAME}', CURRENT_TIMESTAMP)
+            ON CONFLICT (view_name) DO NOTHING;
+            """)
+        conn.commit()
+        _view_ready = True
+
+
+def refresh_batch_analytics(conn, if_older_than=None):
+    """
+    Refresh the snapshot concurrently (readers are never blocked).
+    Returns False if another worker is already refreshing it, or if it was
+    refreshed less than ``if_older_than`` seconds ago.
+    """
+    ensure_batch_analytics_view(conn)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", (_REFRESH_LOCK_KEY,))
+        if not cursor.fetchone()[0]:
+            conn.commit()
+            return False
+        try:
+            if if_older_than:
+                cursor.execute(
+                    """
+                    SELECT refreshed_at > CURRENT_TIMESTAMP - make_interval(secs => %s)
+                    FROM lms.analytics_refresh_log WHERE view_name = %s
+                    """,
+                    (if_older_than, _VIEW_NAME)
+                )
+                row = cursor.fetchone()
+                if row and row[0]:
+                    conn.commit()
+                    return False
+            started = time.perf_counter()
+            cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {_VIEW_NAME}")
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            cursor.execute(
+                """
+                INSERT INTO lms.analytics_refresh_log (view_name, refreshed_at, duration_ms)
+                VALUES (%s, CURRENT_TIMESTAMP, %s)
+                ON CONFLICT (view_name) DO UPDATE
+                SET refreshed_at = EXCLUDED.refreshed_at, duration_ms = EXCLUDED.duration_ms
+                """,
+                (_VIEW_NAME, duration_ms)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (_REFRESH_LOCK_KEY,))
+            conn.commit()
+    return True
+
+
+def get_batch_analytics_snapshot(conn):
+    """
+    Build the batch analytics document from the materialized snapshot.
+    Same shape as get_batch_analytics_data plus 'refreshed_at', returned as
+    JSON text so it can be sent without being parsed in Python.
+    """
+    ensure_batch_analytics_view(conn)
+    query = f"""
+    WITH user_courses AS (
+      SELECT
+        user_id,
+        username,
+        batch_id,
+        batch_name,
+        initial_assessment,
+        JSON_AGG(
+          JSON_BUILD_OBJECT(
+            'course_id', course_id,
+            'course_name', course_name,
+            'enrollment_status', enrollment_status,
+            'completion_status', completion_status,
+            'certificate_id', certificate_id,
+            'validity', validity,
+            'updated_date', updated_date
+          ) ORDER BY row_id
+        ) AS courses
+      FROM {_VIEW_NAME}
+      GROUP BY user_id, username, batch_id, batch_name, initial_assessment
+    ),
+    batches_data AS (
+      SELECT
+        batch_id,
+        batch_name,
+        JSON_AGG(
+          JSON_BUILD_OBJECT(
+            'username', username,
+            'initial_assessment', initial_assessment,
+            'courses', courses
+          ) ORDER BY user_id
+        ) AS users_json
+      FROM user_courses
+      GROUP BY batch_id, batch_name
+    )
+    SELECT
+      JSON_BUILD_OBJECT(
+        'total_users', (SELECT COUNT(*) FROM lms.users),
+        'total_batches', (SELECT COUNT(*) FROM lms.batch),
+        'total_courses', (SELECT COUNT(*) FROM lms.course_master),
+        'refreshed_at', (SELECT refreshed_at FROM lms.analytics_refresh_log WHERE view_name = '{_VIEW_NAME}'),
+        'batches',
+        (SELECT JSON_AGG(
+          JSON_BUILD_OBJECT(
+            'batch_id', batch_id,
+            'batch_name', batch_name,
+            'users', users_json
+          ) ORDER BY batch_id
+        ) FROM batches_data)
+      )::text AS result;
+    """
+    with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        cursor.execute(query)
+        result = cursor.fetchone()
+        return result['result'] if result else None
+
+
+def get_batch_analytics_source(conn):
+    """
+    SQL for the flat batch analytics rows: the snapshot when available, else the live query
+    """
+    try:
+        ensure_batch_analytics_view(conn)
+        return f"SELECT * FROM {_VIEW_NAME}"
+    except Exception as e:
+        print(f"Batch analytics snapshot unavailable, exporting the live query: {str(e)}")
+        conn.rollback()
+        return BATCH_ANALYTICS_ROWS_QUERY
+
+
+def get_batch_analytics_page(conn, page):
+    """
+    One keyset-paginated, filtered page of batch analytics read from the snapshot.
+    Falls back to the live rows query if the snapshot is unavailable.
+    """
+    try:
+        ensure_batch_analytics_view(conn)
+        result = fetch_analytics_page(conn, f"SELECT * FROM {_VIEW_NAME}", 'batch_id', page)
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT refreshed_at FROM lms.analytics_refresh_log WHERE view_name = %s", (_VIEW_NAME,))
+            row = cursor.fetchone()
+        result['refreshed_at'] = row[0].isoformat() if row and row[0] else None
+        return result
+    except Exception as e:
+        print(f"Batch analytics snapshot unavailable, paging the live query: {str(e)}")
+        conn.rollback()
+        result = fetch_analytics_page(conn, BATCH_ANALYTICS_ROWS_QUERY, 'batch_id', page)
+        result['refreshed_at'] = None
+        return result
+
+
+def request_batch_analytics_refresh():
+    """
+    Ask for a snapshot refresh after enrollment/certificate writes.
+    Bursts of writes are debounced into a single refresh.
+    """
+    start_batch_analytics_refresher()
+    _refresh_requested.set()
+
+
+def start_batch_analytics_refresher():
+    """
+    Start the per-worker background refresher (scheduled + on request)
+    """
+    global _refresher_pid
+    pid = os.getpid()
+    if _refresher_pid == pid:
+        return
+    with _refresher_lock:
+        if _refresher_pid == pid:
+            return
+        thread = threading.Thread(target=_refresh_loop, name='batch-analytics-refresh')
+        thread.daemon = True
+        thread.start()
+        _refresher_pid = pid
+
+
+def _refresh_loop():
+    while True:
+        requested = _refresh_requested.wait(BATCH_ANALYTICS_REFRESH_SECONDS)
+        if requested:
+            # Let a burst of writes settle before refreshing
+            time.sleep(BATCH_ANALYTICS_REFRESH_DEBOUNCE_SECONDS)
+        _refresh_requested.clear()
+
+        conn = None
+        try:
+            conn = get_db_connection(DB_CONFIG)
+            if not conn:
+                continue
+            # Scheduled refreshes are skipped if another worker refreshed recently
+            if_older_than = None if requested else BATCH_ANALYTICS_REFRESH_SECONDS / 2
+            if refresh_batch_analytics(conn, if_older_than=if_older_than):
+                print("📊 Batch analytics snapshot refreshed")
+        except Exception as e:
+            print(f"Error refreshing batch analytics snapshot: {str(e)}")
+        finally:
+            if conn:
+                conn.close()
@@ -1,48 +1,36 @@
+from psycopg2.extras import execute_values
+
 from app.utils.db_utils import get_db_connection
 from app.config.database import DB_CONFIG
+import io
 import uuid
 
-def create_batch(batch_name):
+def _copy_login_keys(cursor, batch_id, num_keys):
     """
-    Create a new batch and return the batch_id
+    Generate login keys in Python and load them with a single COPY
     """
-    conn = get_db_connection(DB_CONFIG)
-    if not conn:
-        return None
-    
-    try:
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO lms.batch (batch_name) VALUES (%s) RETURNING batch_id",
-            (batch_name,)
-        )
-        batch_id = cursor.fetchone()[0]
-        conn.commit()
-        return batch_id
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        cursor.close()
-        conn.close()
+    codes = [str(uuid.uuid4()) for _ in range(num_keys)]
+    buffer = io.StringIO()
+    for code in codes:
+        buffer.write(f"{code}\tno\t{int(batch_id)}\n")
+    buffer.seek(0)
+    cursor.copy_expert("COPY lms.new_login (code, used, batch_id) FROM STDIN", buffer)
+    return codes
+
 
-def associate_course_with_batch(batch_id, course_id, validity):
+def create_login_keys_bulk(batch_id, num_keys):
     """
-    Associate a course with a batch and set its validity period
+    Create num_keys login keys for a batch in one transaction and return the codes
     """
     conn = get_db_connection(DB_CONFIG)
     if not conn:
         return None
-    
+
     try:
         cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO lms.batch_course (batch_id, course_id, validity) VALUES (%s, %s, %s) RETURNING bc_id",
-            (batch_id, course_id, validity)
-        )
-        bc_id = cursor.fetchone()[0]
+        codes = _copy_login_keys(cursor, batch_id, num_keys)
         conn.commit()
-        return bc_id
+        return codes
     except Exception as e:
         conn.rollback()
         raise e
@@ -50,26 +38,34 @@ def associate_course_with_batch(batch_id, course_id, validity):
         cursor.close()
         conn.close()
 
-def create_login_key(batch_id):
+
+def create_batch_with_keys(batch_name, course_ids, validity, num_keys):
     """
-    Create a new login key associated with a batch
+    Create a batch, associate its courses and create its login keys in one
+    transaction. Returns (batch_id, codes); nothing is kept if any step fails.
     """
     conn = get_db_connection(DB_CONFIG)
     if not conn:
-        return None
-    
+        return None, None
+
     try:
         cursor = conn.cursor()
         cursor.execute(
-            "INSERT INTO lms.new_login (code, used, batch_id) VALUES (%s, %s, %s) RETURNING code",
-            (str(uuid.uuid4()), "no", batch_id)
+            "INSERT INTO lms.batch (batch_name) VALUES (%s) RETURNING batch_id",
+            (batch_name,)
         )
-        key_id = cursor.fetchone()[0]
+        batch_id = cursor.fetchone()[0]
+        execute_values(
+            cursor,
+            "INSERT INTO lms.batch_course (batch_id, course_id, validity) VALUES %s",
+            [(batch_id, course_id, validity) for course_id in course_ids]
+        )
+        codes = _copy_login_keys(cursor, batch_id, num_keys)
         conn.commit()
-        return key_id
+        return batch_id, codes
     except Exception as e:
         conn.rollback()
         raise e
     finally:
         cursor.close()
-        conn.close() 
\ No newline at end of file
+        conn.close()
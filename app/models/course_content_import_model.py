@@ -0,0 +1,258 @@
+import csv
+import os
+import threading
+import time
+
+import pandas as pd
+from openpyxl import load_workbook
+from psycopg2.extras import Json, RealDictCursor
+
+from app.utils.db_utils import get_db_connection
+from app.config.database import DB_CONFIG
+from app.models.course_model import (
+    COURSE_CONTENT_ID_COLUMNS,
+    validate_course_content_frame,
+    merge_course_content,
+)
+
+COURSE_CONTENT_IMPORT_CHUNK_ROWS = int(os.getenv('COURSE_CONTENT_IMPORT_CHUNK_ROWS', 5000))
+# Only the first errors are kept in the status; error_count has the total
+COURSE_CONTENT_IMPORT_MAX_ERRORS = int(os.getenv('COURSE_CONTENT_IMPORT_MAX_ERRORS', 1000))
+# Task rows not updated for this long (finished, or orphaned by a dead worker) are deleted
+COURSE_CONTENT_IMPORT_TASK_TTL_SECONDS = int(os.getenv('COURSE_CONTENT_IMPORT_TASK_TTL_SECONDS', 86400))
+
+TASK_COLUMNS = (
+    'status', 'progress', 'processed_rows', 'total_rows', 'successful_inserts',
+    'updated_rows', 'error_count', 'errors', 'error'
+)
+
+_table_ready = False
+_table_lock = threading.Lock()
+
+
+def ensure_import_task_table(conn):
+    """
+    Ensure the course_content_import_task table exists (checked once per worker).
+    Progress lives in the database so any worker can answer a status poll.
+    """
+    global _table_ready
+    if _table_ready:
+        return
+    with _table_lock:
+        if _table_ready:
+            return
+        with conn.cursor() as cursor:
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS lms.course_content_import_task
+            (
+                task_id character varying(255) PRIMARY KEY,
+                status character varying(20) NOT NULL,
+                progress integer NOT NULL DEFAULT 0,
+                processed_rows integer NOT NULL DEFAULT 0,
+                total_rows integer,
+                successful_inserts integer NOT NULL DEFAULT 0,
+                updated_rows integer NOT NULL DEFAULT 0,
+                error_count integer NOT NULL DEFAULT 0,
+                errors jsonb NOT NULL DEFAULT '[]'::jsonb,
+                error text,
+                created_date timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                updated_date timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE INDEX IF NOT EXISTS course_content_import_task_updated_idx
+                ON lms.course_content_import_task (updated_date);
+            """)
+        conn.commit()
+        _table_ready = True
+
+
+def save_import_task(conn, task_id, task):
+    """
+    Write the task's progress and commit
+    """
+    values = dict(task, errors=Json(task['errors']))
+    assignments = ', '.join(f"{col} = %({col})s" for col in TASK_COLUMNS)
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE lms.course_content_import_task SET {assignments}, updated_date = CURRENT_TIMESTAMP "
+            "WHERE task_id = %(task_id)s",
+            dict(values, task_id=task_id)
+        )
+    conn.commit()
+
+
+def get_import_task(conn, task_id):
+    """
+    The progress of an import task, or None if it is unknown or expired
+    """
+    ensure_import_task_table(conn)
+    query = f"""
+    SELECT {', '.join(TASK_COLUMNS)}, created_date, updated_date
+    FROM lms.course_content_import_task
+    WHERE task_id = %s
+    """
+    with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        cursor.execute(query, (task_id,))
+        return cursor.fetchone()
+
+
+def _iter_xlsx_rows(path):
+    """Yield (header, total_rows) then (row_number, row) for every non-blank data row."""
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        total_rows = sheet.max_row - 1 if sheet.max_row else None
+        yield header, total_rows
+        for row_number, row in enumerate(rows, start=1):
+            if row is None or all(value is None or value == '' for value in row):
+                continue
+            yield row_number, row
+    finally:
+        workbook.close()
+
+
+def _iter_csv_rows(path):
+    """Yield (header, None) then (row_number, row) for every non-blank data row."""
+    with open(path, newline='', encoding='utf-8-sig') as fh:
+        reader = csv.reader(fh)
+        header = next(reader, None)
+        yield header, None
+        for row_number, row in enumerate(reader, start=1):
+            if not any(value.strip() for value in row):
+                continue
+            yield row_number, row
+
+
+def iter_upload_chunks(path, file_format, chunk_rows=COURSE_CONTENT_IMPORT_CHUNK_ROWS):
+    """
+    Read an uploaded .xlsx or .csv file in fixed-size DataFrame chunks.
+
+    Yields (chunk_df, row_numbers, total_rows). row_numbers are the data row
+    numbers in the file (1 = first row after the header, blank rows counted)
+    so errors point at the source row; total_rows is None when unknown.
+    Raises ValueError if required columns are missing.
+    """
+    rows = _iter_xlsx_rows(path) if file_format == 'xlsx' else _iter_csv_rows(path)
+    header, total_rows = next(rows)
+    columns = [str(name).strip() if name is not None else '' for name in (header or ())]
+    missing_columns = [col for col in COURSE_CONTENT_ID_COLUMNS if col not in columns]
+    if missing_columns:
+        raise ValueError(f'Missing required columns: {missing_columns}')
+
+    width = len(columns)
+    buffer = []
+    row_numbers = []
+    for row_number, row in rows:
+        buffer.append(list(row[:width]) + [None] * (width - len(row)))
+        row_numbers.append(row_number)
+        if len(buffer) >= chunk_rows:
+            yield pd.DataFrame(buffer, columns=columns), row_numbers, total_rows
+            buffer = []
+            row_numbers = []
+    if buffer:
+        yield pd.DataFrame(buffer, columns=columns), row_numbers, total_rows
+
+
+def start_course_content_import(conn, path, file_format):
+    """
+    Register a background import of a spooled upload, start it and return its task id.
+    Expired task rows are removed on the way.
+    """
+    ensure_import_task_table(conn)
+    task_id = f"import_{int(time.time())}_{threading.get_ident()}_{os.path.basename(path)}"
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "DELETE FROM lms.course_content_import_task "
+            "WHERE updated_date < CURRENT_TIMESTAMP - make_interval(secs => %s)",
+            (COURSE_CONTENT_IMPORT_TASK_TTL_SECONDS,)
+        )
+        cursor.execute(
+            "INSERT INTO lms.course_content_import_task (task_id, status) VALUES (%s, 'starting')",
+            (task_id,)
+        )
+    conn.commit()
+
+    thread = threading.Thread(
+        target=run_course_content_import,
+        args=(task_id, path, file_format),
+        name='course-content-import'
+    )
+    thread.daemon = True
+    thread.start()
+    return task_id
+
+
+def run_course_content_import(task_id, path, file_format):
+    """
+    Validate and merge the upload chunk by chunk. Each chunk is committed on
+    its own, so memory stays bounded and progress is visible while it runs.
+    """
+    task = {
+        'status': 'processing',
+        'progress': 0,
+        'processed_rows': 0,
+        'total_rows': None,
+        'successful_inserts': 0,
+        'updated_rows': 0,
+        'error_count': 0,
+        'errors': [],
+        'error': None
+    }
+    conn = None
+    try:
+        conn = get_db_connection(DB_CONFIG)
+        if not conn:
+            raise RuntimeError("Database connection failed")
+
+        save_import_task(conn, task_id, task)
+        for chunk_df, row_numbers, total_rows in iter_upload_chunks(path, file_format):
+            valid_df, errors = validate_course_content_frame(conn, chunk_df, row_numbers=row_numbers)
+            if not valid_df.empty:
+                try:
+                    merged = merge_course_content(conn, valid_df)
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    errors.append({
+                        'row': int(valid_df['row_num'].iloc[0]),
+                        'error': f"Rows {int(valid_df['row_num'].iloc[0])}-{int(valid_df['row_num'].iloc[-1])} failed to load: {str(e)}"
+                    })
+                    merged = {'inserted_ids': [], 'updated_rows': 0}
+                task['successful_inserts'] += len(merged['inserted_ids'])
+                task['updated_rows'] += merged['updated_rows']
+
+            task['error_count'] += len(errors)
+            room = COURSE_CONTENT_IMPORT_MAX_ERRORS - len(task['errors'])
+            if room > 0:
+                task['errors'].extend(errors[:room])
+
+            task['processed_rows'] = row_numbers[-1]
+            task['total_rows'] = total_rows
+            if total_rows:
+                task['progress'] = min(99, int(task['processed_rows'] * 100 / total_rows))
+            save_import_task(conn, task_id, task)
+            print(f"Course content import {task_id}: {task['processed_rows']} rows processed")
+
+        if task['processed_rows'] == 0:
+            raise ValueError('Uploaded file is empty')
+
+        task['total_rows'] = task['processed_rows']
+        task['progress'] = 100
+        task['status'] = 'completed'
+    except Exception as e:
+        print(f"Course content import {task_id} failed: {str(e)}")
+        task['status'] = 'error'
+        task['error'] = str(e)
+    finally:
+        if conn:
+            try:
+                conn.rollback()
+                save_import_task(conn, task_id, task)
+            except Exception as e:
+                print(f"Could not save status of course content import {task_id}: {str(e)}")
+            conn.close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
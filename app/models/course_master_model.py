@@ -1,5 +1,7 @@
 from psycopg2.extras import RealDictCursor
 
+from app.models.job_recommendation_model import ensure_job_recommendation_tables, mark_job_recommendations_stale
+
 def get_courses(conn):
     query = """
     SELECT 
@@ -150,10 +152,14 @@ def enroll_user_in_course(conn, user_id, course_id):
     RETURNING enrollment_id, user_id, course_id, enrollment_date
     """
     
+    ensure_job_recommendation_tables(conn)
     with conn.cursor(cursor_factory=RealDictCursor) as cursor:
         cursor.execute(insert_query, (user_id, course_id))
+        enrollment = cursor.fetchone()
+        # Stored job recommendations follow the enrolled courses
+        mark_job_recommendations_stale(cursor, user_id)
         conn.commit()
-        return cursor.fetchone()
+        return enrollment
 
 def get_batch_analytics_data(conn):
     query = """
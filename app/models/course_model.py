@@ -1,4 +1,5 @@
 from psycopg2.extras import RealDictCursor
+import io
 import pandas as pd
 
 def create_course(conn, course_data):
@@ -55,80 +56,187 @@ def create_course_enrollment(conn, enrollment_data):
         result = cursor.fetchone()
         return result
 
-def create_course_content(conn, course_contents):
-    insert_query = """
-    INSERT INTO lms.course_content(
-        course_id, course_mastertitle_breakdown_id, course_mastertitle_breakdown,
-        course_subtitle_id, course_subtitle, subtitle_content,
-        subtitle_code, subtitle_help_text, helpfull_links)
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-    RETURNING course_content_id
+COURSE_CONTENT_ID_COLUMNS = ['course_id', 'course_mastertitle_breakdown_id', 'course_subtitle_id']
+COURSE_CONTENT_TEXT_COLUMNS = [
+    'course_mastertitle_breakdown', 'course_subtitle', 'subtitle_content',
+    'subtitle_code', 'subtitle_help_text', 'helpfull_links'
+]
+# character varying(100) columns in lms.course_content
+COURSE_CONTENT_TITLE_COLUMNS = ['course_mastertitle_breakdown', 'course_subtitle']
+COURSE_CONTENT_TITLE_MAX_LENGTH = 100
+
+
+def validate_course_content_frame(conn, df, row_offset=0, row_numbers=None):
     """
-    
-    inserted_ids = []
-    errors = []
-    
-    with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-        # First verify if the course_id exists
-        course_id = course_contents[0].get('course_id')
-        cursor.execute("SELECT course_id FROM lms.course_master WHERE course_id = %s", (course_id,))
-        if not cursor.fetchone():
-            raise ValueError(f"Course ID {course_id} does not exist")
-        
-        for row_num, content in enumerate(course_contents, start=1):
-            try:
-                # Clean and validate the data
-                cleaned_content = {
-                    'course_id': content.get('course_id'),
-                    'course_mastertitle_breakdown_id': content.get('course_mastertitle_breakdown_id'),
-                    'course_mastertitle_breakdown': str(content.get('course_mastertitle_breakdown', '')).strip(),
-                    'course_subtitle_id': content.get('course_subtitle_id'),
-                    'course_subtitle': str(content.get('course_subtitle', '')).strip(),
-                    'subtitle_content': str(content.get('subtitle_content', '')).strip(),
-                    'subtitle_code': str(content.get('subtitle_code', '')).strip(),
-                    'subtitle_help_text': str(content.get('subtitle_help_text', '')).strip(),
-                    'helpfull_links': str(content.get('helpfull_links', '')).strip()
-                }
-                
-                # Validate required fields
-                if not all([cleaned_content['course_id'], 
-                          cleaned_content['course_mastertitle_breakdown_id'],
-                          cleaned_content['course_subtitle_id']]):
-                    raise ValueError("Missing required fields: course_id, course_mastertitle_breakdown_id, or course_subtitle_id")
-                
-                cursor.execute(insert_query, (
-                    cleaned_content['course_id'],
-                    cleaned_content['course_mastertitle_breakdown_id'],
-                    cleaned_content['course_mastertitle_breakdown'],
-                    cleaned_content['course_subtitle_id'],
-                    cleaned_content['course_subtitle'],
-                    cleaned_content['subtitle_content'],
-                    cleaned_content['subtitle_code'],
-                    cleaned_content['subtitle_help_text'],
-                    cleaned_content['helpfull_links']
-                ))
-                
-                result = cursor.fetchone()
-                inserted_ids.append(result['course_content_id'])
-                
-            except Exception as e:
-                errors.append({
-                    'row': row_num,
-                    'error': str(e)
-                })
-                continue
-        
-        if len(errors) == len(course_contents):
-            # If all rows failed, rollback and raise exception
-            conn.rollback()
-            raise ValueError(f"All rows failed to insert. First error: {errors[0]['error']}")
-        
-        # If some rows succeeded, commit those
+    Validate course content rows with vectorized DataFrame operations.
+
+    Checks required integer IDs, title lengths, duplicate
+    (course_id, course_mastertitle_breakdown_id, course_subtitle_id) keys and
+    that every course exists.
+
+    :param conn: Database connection
+    :param df: DataFrame read from the upload
+    :param row_offset: Row number of the first row of df minus one (for chunked imports)
+    :param row_numbers: Source row number of every row of df; overrides row_offset
+             when rows were skipped while reading (e.g. blank rows)
+    :return: (valid_df, errors) where valid_df has integer IDs, a row_num column
+             and text columns, and errors is a list of {'row', 'error'}
+    """
+    if row_numbers is None:
+        row_numbers = range(row_offset + 1, row_offset + len(df) + 1)
+    frame = pd.DataFrame({'row_num': list(row_numbers)}, index=df.index)
+    problems = pd.Series('', index=df.index)
+
+    for col in COURSE_CONTENT_ID_COLUMNS:
+        values = pd.to_numeric(df[col], errors='coerce') if col in df.columns else pd.Series(float('nan'), index=df.index)
+        invalid = values.isna() | (values <= 0) | (values % 1 != 0)
+        problems = problems.mask(invalid & (problems == ''), f"Missing or invalid {col}")
+        frame[col] = values.where(~invalid).astype('Int64')
+
+    for col in COURSE_CONTENT_TEXT_COLUMNS:
+        frame[col] = df[col] if col in df.columns else ''
+    frame[COURSE_CONTENT_TEXT_COLUMNS] = frame[COURSE_CONTENT_TEXT_COLUMNS].fillna('')
+
+    for col in COURSE_CONTENT_TITLE_COLUMNS:
+        too_long = frame[col].astype(str).str.strip().str.len() > COURSE_CONTENT_TITLE_MAX_LENGTH
+        problems = problems.mask(too_long & (problems == ''), f"{col} is longer than {COURSE_CONTENT_TITLE_MAX_LENGTH} characters")
+
+    has_ids = problems == ''
+    duplicated = frame[has_ids].duplicated(subset=COURSE_CONTENT_ID_COLUMNS, keep='first')
+    duplicated = duplicated.reindex(frame.index, fill_value=False)
+    problems = problems.mask(duplicated, 'Duplicate course_id, course_mastertitle_breakdown_id and course_subtitle_id')
+
+    course_ids = [int(course_id) for course_id in frame.loc[problems == '', 'course_id'].unique()]
+    if course_ids:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT course_id FROM lms.course_master WHERE course_id = ANY(%s)", (course_ids,))
+            known = {row[0] for row in cursor.fetchall()}
+        unknown = (problems == '') & ~frame['course_id'].isin(known)
+        problems = problems.mask(unknown, 'Course ID ' + frame['course_id'].astype(str) + ' does not exist')
+
+    failed = problems != ''
+    errors = [
+        {'row': int(row_num), 'error': error}
+        for row_num, error in zip(frame.loc[failed, 'row_num'], problems[failed])
+    ]
+    return frame[~failed], errors
+
+
+def merge_course_content(conn, valid_df):
+    """
+    Load validated rows with one COPY into a staging table and merge them into
+    lms.course_content in a single statement: rows whose
+    (course_id, course_mastertitle_breakdown_id, course_subtitle_id) already
+    exist are updated, the rest are inserted. The caller commits.
+
+    :return: Dictionary with 'inserted_ids' and 'updated_rows'
+    """
+    columns = ['row_num'] + COURSE_CONTENT_ID_COLUMNS + COURSE_CONTENT_TEXT_COLUMNS
+    buffer = io.StringIO()
+    valid_df[columns].to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+
+    with conn.cursor() as cursor:
+        cursor.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS course_content_staging
+        (
+            row_num integer,
+            course_id integer,
+            course_mastertitle_breakdown_id integer,
+            course_subtitle_id integer,
+            course_mastertitle_breakdown text,
+            course_subtitle text,
+            subtitle_content text,
+            subtitle_code text,
+            subtitle_help_text text,
+            helpfull_links text
+        ) ON COMMIT DELETE ROWS;
+        TRUNCATE course_content_staging;
+        """)
+        cursor.copy_expert(
+            f"COPY course_content_staging ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+        cursor.execute("""
+        WITH staged AS (
+            SELECT course_id, course_mastertitle_breakdown_id, course_subtitle_id, row_num,
+                   COALESCE(btrim(course_mastertitle_breakdown, E' \\t\\r\\n'), '') AS course_mastertitle_breakdown,
+                   COALESCE(btrim(course_subtitle, E' \\t\\r\\n'), '') AS course_subtitle,
+                   COALESCE(btrim(subtitle_content, E' \\t\\r\\n'), '') AS subtitle_content,
+                   COALESCE(btrim(subtitle_code, E' \\t\\r\\n'), '') AS subtitle_code,
+                   COALESCE(btrim(subtitle_help_text, E' \\t\\r\\n'), '') AS subtitle_help_text,
+                   COALESCE(btrim(helpfull_links, E' \\t\\r\\n'), '') AS helpfull_links
+            FROM course_content_staging
+        ),
+        updated AS (
+            UPDATE lms.course_content AS cc
+            SET course_mastertitle_breakdown = s.course_mastertitle_breakdown,
+                course_subtitle = s.course_subtitle,
+                subtitle_content = s.subtitle_content,
+                subtitle_code = s.subtitle_code,
+                subtitle_help_text = s.subtitle_help_text,
+                helpfull_links = s.helpfull_links
+            FROM staged AS s
+            WHERE cc.course_id = s.course_id
+              AND cc.course_mastertitle_breakdown_id = s.course_mastertitle_breakdown_id
+              AND cc.course_subtitle_id = s.course_subtitle_id
+            RETURNING cc.course_id, cc.course_mastertitle_breakdown_id, cc.course_subtitle_id
+        ),
+        inserted AS (
+            INSERT INTO lms.course_content(
+                course_id, course_mastertitle_breakdown_id, course_mastertitle_breakdown,
+                course_subtitle_id, course_subtitle, subtitle_content,
+                subtitle_code, subtitle_help_text, helpfull_links)
+            SELECT s.course_id, s.course_mastertitle_breakdown_id, s.course_mastertitle_breakdown,
+                   s.course_subtitle_id, s.course_subtitle, s.subtitle_content,
+                   s.subtitle_code, s.subtitle_help_text, s.helpfull_links
+            FROM staged AS s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM lms.course_content AS cc
+                WHERE cc.course_id = s.course_id
+                  AND cc.course_mastertitle_breakdown_id = s.course_mastertitle_breakdown_id
+                  AND cc.course_subtitle_id = s.course_subtitle_id
+            )
+            ORDER BY s.row_num
+            RETURNING course_content_id
+        )
+        SELECT
+            (SELECT COUNT(*) FROM updated) AS updated_rows,
+            ARRAY(SELECT course_content_id FROM inserted ORDER BY course_content_id) AS inserted_ids
+        """)
+        updated_rows, inserted_ids = cursor.fetchone()
+
+    return {'inserted_ids': list(inserted_ids), 'updated_rows': updated_rows}
+
+
+def import_course_content(conn, df):
+    """
+    Validate and merge a course content sheet in one transaction.
+    Invalid rows are skipped and reported; raises ValueError if no row is valid.
+    """
+    valid_df, errors = validate_course_content_frame(conn, df)
+    if valid_df.empty:
+        first_error = errors[0]['error'] if errors else 'no rows'
+        raise ValueError(f"All rows failed to insert. First error: {first_error}")
+
+    try:
+        merged = merge_course_content(conn, valid_df)
         conn.commit()
-        
-        return {
-            'inserted_ids': inserted_ids,
-            'total_rows': len(course_contents),
-            'successful_inserts': len(inserted_ids),
-            'errors': errors
-        }
+    except Exception:
+        conn.rollback()
+        raise
+
+    return {
+        'inserted_ids': merged['inserted_ids'],
+        'total_rows': len(df),
+        'successful_inserts': len(merged['inserted_ids']),
+        'updated_rows': merged['updated_rows'],
+        'errors': errors
+    }
+
+
+def create_course_content(conn, course_contents):
+    """
+    Import a list of course content dictionaries (see import_course_content)
+    """
+    return import_course_content(conn, pd.DataFrame(course_contents))
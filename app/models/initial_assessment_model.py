@@ -1,22 +1,292 @@
-from psycopg2.extras import RealDictCursor
+import os
+import threading
+import time
+
+import numpy as np
+from psycopg2.extras import execute_values
+
+ASSESSMENT_RUBRIC_CACHE_SECONDS = int(os.getenv('ASSESSMENT_RUBRIC_CACHE_SECONDS', 300))
+ASSESSMENT_RESCORE_CHUNK_USERS = int(os.getenv('ASSESSMENT_RESCORE_CHUNK_USERS', 5000))
+
+# Score columns of lms.initial_assessment_results a category may write to
+RESULT_COLUMNS = ('tech_skill', 'psychology', 'interests', 'learning_style', 'career_preference')
+
+# Raw sums are scaled from [min_raw, max_raw] onto [50, 100]
+SCORE_FLOOR = 50
+SCORE_CEILING = 100
+
+# Rubric the scoring used before it moved into tables; seeded while the category table is empty
+DEFAULT_RUBRIC = {
+    'tech_skill': {'min_raw': 8, 'max_raw': 32, 'questions': (12, 13, 14, 21, 22, 23, 24, 25)},
+    'psychology': {'min_raw': 9, 'max_raw': 36, 'questions': (2, 5, 10, 15, 16, 17, 18, 19, 20)},
+    'interests': {'min_raw': 5, 'max_raw': 20, 'questions': (4, 6, 7, 9, 21)},
+    'learning_style': {'min_raw': 3, 'max_raw': 12, 'questions': (1, 3, 11)},
+    'career_preference': {'min_raw': 4, 'max_raw': 16, 'questions': (8, 9, 10, 19)},
+}
+
+_tables_ready = False
+_tables_lock = threading.Lock()
+
+# Rubric loaded per worker: {'loaded_at', 'columns', 'membership', 'min_raw', 'span'}
+_rubric_cache = {}
+_rubric_lock = threading.Lock()
+
+
+def ensure_rubric_tables(conn):
+    """
+    Ensure the scoring rubric tables exist (checked once per worker) and seed
+    DEFAULT_RUBRIC while there are no categories yet. An existing rubric is never
+    re-seeded, so categories or questions an admin removed stay removed.
+    """
+    global _tables_ready
+    if _tables_ready:
+        return
+    with _tables_lock:
+        if _tables_ready:
+            return
+        with conn.cursor() as cursor:
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS lms.initial_assessment_score_category
+            (
+                result_column character varying(50) PRIMARY KEY,
+                min_raw numeric NOT NULL,
+                max_raw numeric NOT NULL,
+                CHECK (max_raw > min_raw)
+            );
+            -- A question may count towards several categories
+            CREATE TABLE IF NOT EXISTS lms.initial_assessment_category_question
+            (
+                result_column character varying(50) NOT NULL
+                    REFERENCES lms.initial_assessment_score_category (result_column) ON DELETE CASCADE,
+                question_id integer NOT NULL,
+                PRIMARY KEY (result_column, question_id)
+            );
+            """)
+            # Both statements are no-ops unless the category table is empty
+            seeded = execute_values(
+                cursor,
+                """
+                INSERT INTO lms.initial_assessment_score_category (result_column, min_raw, max_raw)
+                SELECT * FROM (VALUES %s) AS v(result_column, min_raw, max_raw)
+                WHERE NOT EXISTS (SELECT 1 FROM lms.initial_assessment_score_category)
+                ON CONFLICT (result_column) DO NOTHING
+                RETURNING result_column
+                """,
+                [(column, rule['min_raw'], rule['max_raw']) for column, rule in DEFAULT_RUBRIC.items()],
+                fetch=True
+            )
+            seeded_columns = {row[0] for row in seeded}
+            if seeded_columns:
+                execute_values(
+                    cursor,
+                    """
+                    INSERT INTO lms.initial_assessment_category_question (result_column, question_id)
+                    VALUES %s
+                    ON CONFLICT DO NOTHING
+                    """,
+                    [
+                        (column, question_id)
+                        for column, rule in DEFAULT_RUBRIC.items() if column in seeded_columns
+                        for question_id in rule['questions']
+                    ]
+                )
+                print(f"Seeded the default initial assessment rubric ({len(seeded_columns)} categories)")
+        conn.commit()
+        _tables_ready = True
+
+
+def build_rubric(categories, memberships):
+    """
+    Build the array-backed rubric.
+
+    :param categories: Iterable of (result_column, min_raw, max_raw)
+    :param memberships: Iterable of (result_column, question_id)
+    :return: Dictionary with 'columns', 'membership' (question_id x category
+        matrix, indexed directly by question id), 'min_raw' and 'span'
+    """
+    columns = []
+    min_raw = []
+    span = []
+    for column, low, high in sorted(categories):
+        if column not in RESULT_COLUMNS:
+            print(f"Ignoring unknown assessment score column: {column}")
+            continue
+        columns.append(column)
+        min_raw.append(float(low))
+        span.append(float(high) - float(low))
+
+    position = {column: index for index, column in enumerate(columns)}
+    memberships = [(position[column], int(question_id)) for column, question_id in memberships if column in position]
+    max_question = max((question_id for _, question_id in memberships), default=0)
+    membership = np.zeros((max_question + 1, len(columns)), dtype=np.float64)
+    for index, question_id in memberships:
+        membership[question_id, index] = 1.0
+
+    return {
+        'columns': tuple(columns),
+        'membership': membership,
+        'min_raw': np.array(min_raw, dtype=np.float64),
+        'span': np.array(span, dtype=np.float64)
+    }
+
+
+def load_rubric(conn):
+    """
+    The scoring rubric, read from the tables at most every ASSESSMENT_RUBRIC_CACHE_SECONDS
+    """
+    cached = _rubric_cache.get('rubric')
+    if cached and time.time() - cached['loaded_at'] < ASSESSMENT_RUBRIC_CACHE_SECONDS:
+        return cached
+    ensure_rubric_tables(conn)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT result_column, min_raw, max_raw FROM lms.initial_assessment_score_category")
+        categories = cursor.fetchall()
+        cursor.execute("SELECT result_column, question_id FROM lms.initial_assessment_category_question")
+        memberships = cursor.fetchall()
+    rubric = build_rubric(categories, memberships)
+    rubric['loaded_at'] = time.time()
+    with _rubric_lock:
+        _rubric_cache['rubric'] = rubric
+    return rubric
+
+
+def reset_rubric_cache():
+    with _rubric_lock:
+        _rubric_cache.clear()
+
+
+def compute_scores(rubric, user_ids, response_users, question_ids, score_values):
+    """
+    Score many users at once.
+
+    :param user_ids: Users to score (one output row each, in this order)
+    :param response_users, question_ids, score_values: One entry per stored response
+    :return: Array of shape (len(user_ids), len(rubric['columns'])); rows of
+        users without responses are NaN
+    """
+    user_ids = np.asarray(user_ids, dtype=np.int64)
+    response_users = np.asarray(response_users, dtype=np.int64)
+    question_ids = np.asarray(question_ids, dtype=np.int64)
+    score_values = np.asarray(score_values, dtype=np.float64)
+
+    order = np.argsort(user_ids)
+    row = order[np.searchsorted(user_ids, response_users, sorter=order)]
+
+    membership = rubric['membership']
+    known = (question_ids >= 0) & (question_ids < membership.shape[0])
+    contributions = np.zeros((len(question_ids), membership.shape[1]))
+    contributions[known] = membership[question_ids[known]] * score_values[known, None]
+
+    raw = np.zeros((len(user_ids), membership.shape[1]))
+    np.add.at(raw, row, contributions)
+
+    scores = SCORE_FLOOR + (raw - rubric['min_raw']) * (SCORE_CEILING - SCORE_FLOOR) / rubric['span']
+    scores = np.clip(scores, SCORE_FLOOR, SCORE_CEILING)
+    answered = np.bincount(row, minlength=len(user_ids)) > 0
+    scores[~answered] = np.nan
+    return scores
+
+
+def fetch_response_scores(conn, user_ids):
+    """
+    (user_id, question_id, score_value) for every stored response of the given users
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT r.user_id, r.question_id, o.score_value
+            FROM lms.initial_assessment_responses r
+            JOIN lms.initial_assessment_options o ON r.selected_option_id = o.option_id
+            WHERE r.user_id = ANY(%s)
+            """,
+            (list(user_ids),)
+        )
+        return cursor.fetchall()
+
+
+def save_scores(conn, user_ids, scores, columns, mark_completed=True):
+    """
+    Upsert the results of many users (and mark them completed) in one statement
+    """
+    rows = [
+        (user_id,) + tuple(None if np.isnan(value) else float(value) for value in user_scores)
+        for user_id, user_scores in zip(user_ids, scores.tolist())
+    ]
+    column_list = ', '.join(columns)
+    updates = ', '.join(f"{column} = EXCLUDED.{column}" for column in columns)
+    template = '(' + ', '.join(['%s::integer'] + ['%s::numeric'] * len(columns)) + ')'
+    upsert = f"""
+        INSERT INTO lms.initial_assessment_results (user_id, {column_list})
+        SELECT * FROM (VALUES %s) AS v(user_id, {column_list})
+        ON CONFLICT (user_id)
+        DO UPDATE SET {updates}, assessment_timestamp = CURRENT_TIMESTAMP
+        RETURNING user_id
+    """
+    if mark_completed:
+        query = f"""
+        WITH upserted AS ({upsert})
+        UPDATE lms.users AS u
+        SET initial_assessment = 'completed'
+        FROM upserted
+        WHERE u.user_id = upserted.user_id
+        """
+    else:
+        query = upsert
+    with conn.cursor() as cursor:
+        execute_values(cursor, query, rows, template=template, page_size=max(len(rows), 1))
+
+
+def score_users(conn, user_ids, mark_completed=True):
+    """
+    Score the given users from their stored responses and save the results.
+    Commits; returns the number of users written.
+    """
+    user_ids = sorted({int(user_id) for user_id in user_ids})
+    if not user_ids:
+        return 0
+    rubric = load_rubric(conn)
+    if not rubric['columns']:
+        raise ValueError('No initial assessment score categories are configured')
+    responses = fetch_response_scores(conn, user_ids)
+    response_users, question_ids, score_values = (zip(*responses) if responses else ((), (), ()))
+    scores = compute_scores(
+        rubric, user_ids, response_users, question_ids,
+        [value if value is not None else 0 for value in score_values]
+    )
+    try:
+        save_scores(conn, user_ids, scores, rubric['columns'], mark_completed)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(user_ids)
+
+
+def rescore_users(conn, user_ids=None, chunk_size=ASSESSMENT_RESCORE_CHUNK_USERS):
+    """
+    Re-score users that already have results (all of them when user_ids is None),
+    e.g. after the rubric changed. Works through them in chunks; returns the count.
+    """
+    reset_rubric_cache()
+    with conn.cursor() as cursor:
+        if user_ids is None:
+            cursor.execute("SELECT user_id FROM lms.initial_assessment_results ORDER BY user_id")
+        else:
+            cursor.execute(
+                "SELECT user_id FROM lms.initial_assessment_results WHERE user_id = ANY(%s) ORDER BY user_id",
+                ([int(user_id) for user_id in user_ids],)
+            )
+        scored_users = [row[0] for row in cursor.fetchall()]
+
+    rescored = 0
+    for start in range(0, len(scored_users), chunk_size):
+        rescored += score_users(conn, scored_users[start:start + chunk_size], mark_completed=False)
+    return rescored
+
 
 def get_user_initial_assessment_details(conn, user_id):
-    query = """
-    BEGIN;
-    WITH raw_scores AS (
-        SELECT 
-            SUM(CASE WHEN r.question_id IN (12,13,14,21,22,23,24,25) THEN o.score_value ELSE 0 END) AS v_tech_raw,
-            SUM(CASE WHEN r.question_id IN (2,5,10,15,16,17,18,19,20) THEN o.score_value ELSE 0 END) AS v_psych_raw,
-            SUM(CASE WHEN r.question_id IN (4,6,7,9,21) THEN o.score_value ELSE 0 END) AS v_interest_raw,
-            SUM(CASE WHEN r.question_id IN (1,3,11) THEN o.score_value ELSE 0 END) AS v_learn_raw,
-            SUM(CASE WHEN r.question_id IN (8,9,10,19) THEN o.score_value ELSE 0 END) AS v_career_raw
-        FROM lms.initial_assessment_responses r
-        JOIN lms.initial_assessment_options o 
-            ON r.selected_option_id = o.option_id
-        WHERE r.user_id = %s\n    ),\n    bounds AS (\n        SELECT\n            8 AS v_tech_min, 32 AS v_tech_max,\n            9 AS v_psych_min, 36 AS v_psych_max,\n            5 AS v_interest_min, 20 AS v_interest_max,\n            3 AS v_learn_min, 12 AS v_learn_max,\n            4 AS v_career_min, 16 AS v_career_max\n    ),\n    calculated_scores AS (\n        SELECT\n            GREATEST(50, LEAST(100, 50 + ((raw_scores.v_tech_raw - bounds.v_tech_min) * 50)::NUMERIC / (bounds.v_tech_max - bounds.v_tech_min))) AS tech_skill,\n            GREATEST(50, LEAST(100, 50 + ((raw_scores.v_psych_raw - bounds.v_psych_min) * 50)::NUMERIC / (bounds.v_psych_max - bounds.v_psych_min))) AS psychology,\n            GREATEST(50, LEAST(100, 50 + ((raw_scores.v_interest_raw - bounds.v_interest_min) * 50)::NUMERIC / (bounds.v_interest_max - bounds.v_interest_min))) AS interests,\n            GREATEST(50, LEAST(100, 50 + ((raw_scores.v_learn_raw - bounds.v_learn_min) * 50)::NUMERIC / (bounds.v_learn_max - bounds.v_learn_min))) AS learning_style,\n            GREATEST(50, LEAST(100, 50 + ((raw_scores.v_career_raw - bounds.v_career_min) * 50)::NUMERIC / (bounds.v_career_max - bounds.v_career_min))) AS career_preference\n        FROM raw_scores, bounds\n    )\n    INSERT INTO lms.initial_assessment_results (\n        user_id, tech_skill, psychology, interests, learning_style, career_preference\n    )\n    SELECT\n        %s AS user_id,\n        tech_skill, psychology, interests, learning_style, career_preference\n    FROM calculated_scores\n    ON CONFLICT (user_id)\n    DO UPDATE SET\n        tech_skill = EXCLUDED.tech_skill,\n        psychology = EXCLUDED.psychology,\n        interests = EXCLUDED.interests,\n        learning_style = EXCLUDED.learning_style,\n        career_preference = EXCLUDED.career_preference,\n        assessment_timestamp = CURRENT_TIMESTAMP;\n\n    UPDATE lms.users\n    SET initial_assessment = 'completed'\n    WHERE user_id = %s;\n\n    COMMIT;\n    """
     try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-            cursor.execute(query, (user_id, user_id, user_id))
+        score_users(conn, [user_id])
         return True
     except Exception as e:
         print(f"Error during assessment results update: {e}")
@@ -1,33 +1,158 @@
-from psycopg2.extras import RealDictCursor
+import os
+import threading
+import time
 
-def upsert_initial_assessment_response(conn, user_id, question_id, selected_option_id, tab_id):
-    query_check_user = """
-    SELECT 1 FROM lms.users WHERE user_id = %s
+from psycopg2.extras import execute_values
+
+MAX_RESPONSES_PER_BATCH = 500
+# How long a worker keeps upserting without ON CONFLICT before checking again
+# whether create_response_unique_index.py has built the index
+RESPONSE_UNIQUE_INDEX_CHECK_SECONDS = int(os.getenv('RESPONSE_UNIQUE_INDEX_CHECK_SECONDS', 300))
+
+RESPONSE_UNIQUE_INDEX = 'initial_assessment_responses_user_question_idx'
+# No row if the index does not exist; false while a concurrent build is unfinished or failed
+INDEX_VALID_QUERY = "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)"
+
+# None until checked; then whether (user_id, question_id) has a unique index for ON CONFLICT
+_unique_index_ready = None
+_unique_index_checked_at = 0.0
+_unique_index_lock = threading.Lock()
+
+
+def create_response_unique_index(conn):
+    """
+    Remove duplicate answers (keeping one row per user and question) and build
+    the unique (user_id, question_id) index without blocking writes.
+
+    Call it from create_response_unique_index.py, never from a request. The
+    index is built CONCURRENTLY, which cannot run inside a transaction, so the
+    connection is switched to autocommit after the cleanup is committed.
+    Returns the number of duplicate rows removed.
+    """
+    with conn.cursor() as cursor:
+        # An interrupted concurrent build leaves an invalid index behind; rebuild it
+        cursor.execute(INDEX_VALID_QUERY, (f"lms.{RESPONSE_UNIQUE_INDEX}",))
+        row = cursor.fetchone()
+        invalid = row is not None and not row[0]
+        # Without the index the fallback path updates every copy alike, so
+        # duplicates hold the same answer and any one of them can stay
+        cursor.execute("""
+        DELETE FROM lms.initial_assessment_responses AS r
+        USING lms.initial_assessment_responses AS other
+        WHERE other.user_id = r.user_id AND other.question_id = r.question_id
+        AND other.ctid > r.ctid
+        """)
+        removed = cursor.rowcount
+    conn.commit()
+
+    autocommit = conn.autocommit
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            if invalid:
+                cursor.execute(f"DROP INDEX CONCURRENTLY lms.{RESPONSE_UNIQUE_INDEX}")
+            cursor.execute(f"""
+            CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {RESPONSE_UNIQUE_INDEX}
+            ON lms.initial_assessment_responses (user_id, question_id)
+            """)
+    finally:
+        conn.autocommit = autocommit
+    return removed
+
+
+def has_response_unique_index(conn):
     """
-    
-    query_update = """
-    UPDATE lms.initial_assessment_responses
-    SET selected_option_id = %s, tab_id = %s
-    WHERE user_id = %s AND question_id = %s
+    Whether answers can be upserted with ON CONFLICT, i.e. the unique index
+    exists and is valid. Only reads the catalog; a missing index is looked up
+    again after RESPONSE_UNIQUE_INDEX_CHECK_SECONDS.
     """
-    
-    query_insert = """
-    INSERT INTO lms.initial_assessment_responses (user_id, question_id, selected_option_id, tab_id)
-    VALUES (%s, %s, %s, %s)
+    global _unique_index_ready, _unique_index_checked_at
+
+    def known():
+        return _unique_index_ready or (
+            _unique_index_ready is False
+            and time.time() - _unique_index_checked_at < RESPONSE_UNIQUE_INDEX_CHECK_SECONDS
+        )
+
+    if known():
+        return _unique_index_ready
+    with _unique_index_lock:
+        if known():
+            return _unique_index_ready
+        with conn.cursor() as cursor:
+            cursor.execute(INDEX_VALID_QUERY, (f"lms.{RESPONSE_UNIQUE_INDEX}",))
+            row = cursor.fetchone()
+            ready = row is not None and row[0]
+        if not ready and _unique_index_ready is None:
+            print("Initial assessment responses have no unique index (run create_response_unique_index.py), "
+                  "upserting without ON CONFLICT")
+        _unique_index_ready = ready
+        _unique_index_checked_at = time.time()
+        return _unique_index_ready
+
+
+def upsert_initial_assessment_responses(conn, user_id, responses):
     """
+    Save a batch of answers for one user in a single transaction.
 
-    with conn.cursor() as cursor:
-        # Check if the user exists
-        cursor.execute(query_check_user, (user_id,))
-        user_exists = cursor.fetchone()
-        
-        if not user_exists:
-            return {'error': 'User ID does not exist'}
-
-        # Try to update the record first
-        cursor.execute(query_update, (selected_option_id, tab_id, user_id, question_id))
-        if cursor.rowcount == 0:  # If no row was updated, perform insert
-            cursor.execute(query_insert, (user_id, question_id, selected_option_id, tab_id))
-        
+    :param responses: List of (question_id, selected_option_id, tab_id); if a
+        question appears more than once the last answer wins
+    :return: {'success': True, 'saved': n} or {'error': ...} if the user does not exist
+    """
+    answers = {}
+    for question_id, selected_option_id, tab_id in responses:
+        answers[question_id] = (user_id, question_id, selected_option_id, tab_id)
+    rows = list(answers.values())
+
+    has_unique_index = has_response_unique_index(conn)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM lms.users WHERE user_id = %s", (user_id,))
+            if not cursor.fetchone():
+                conn.rollback()
+                return {'error': 'User ID does not exist'}
+
+            if has_unique_index:
+                execute_values(
+                    cursor,
+                    """
+                    INSERT INTO lms.initial_assessment_responses (user_id, question_id, selected_option_id, tab_id)
+                    VALUES %s
+                    ON CONFLICT (user_id, question_id) DO UPDATE
+                    SET selected_option_id = EXCLUDED.selected_option_id, tab_id = EXCLUDED.tab_id
+                    """,
+                    rows
+                )
+            else:
+                updated = execute_values(
+                    cursor,
+                    """
+                    UPDATE lms.initial_assessment_responses AS r
+                    SET selected_option_id = v.selected_option_id, tab_id = v.tab_id
+                    FROM (VALUES %s) AS v(user_id, question_id, selected_option_id, tab_id)
+                    WHERE r.user_id = v.user_id AND r.question_id = v.question_id
+                    RETURNING r.question_id
+                    """,
+                    rows,
+                    fetch=True
+                )
+                updated_questions = {row[0] for row in updated}
+                insert_rows = [row for row in rows if row[1] not in updated_questions]
+                if insert_rows:
+                    execute_values(
+                        cursor,
+                        """
+                        INSERT INTO lms.initial_assessment_responses (user_id, question_id, selected_option_id, tab_id)
+                        VALUES %s
+                        """,
+                        insert_rows
+                    )
         conn.commit()
-        return {'success': True}
+    except Exception:
+        conn.rollback()
+        raise
+    return {'success': True, 'saved': len(rows)}
+
+
+def upsert_initial_assessment_response(conn, user_id, question_id, selected_option_id, tab_id):
+    return upsert_initial_assessment_responses(conn, user_id, [(question_id, selected_option_id, tab_id)])
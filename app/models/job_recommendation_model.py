@@ -0,0 +1,335 @@
+import os
+import threading
+import time
+
+from psycopg2.extras import RealDictCursor
+
+from app.utils.db_utils import get_db_connection
+from app.utils.pagination import encode_cursor
+from app.config.database import DB_CONFIG
+from app.models.jobs_model import JOB_COLUMNS, USER_COURSE_TERMS_QUERY, get_job_search_vector
+
+JOB_RECOMMENDATIONS_PER_USER = int(os.getenv('JOB_RECOMMENDATIONS_PER_USER', 200))
+JOB_RECOMMENDATION_DEBOUNCE_SECONDS = int(os.getenv('JOB_RECOMMENDATION_DEBOUNCE_SECONDS', 2))
+# Stored recommendations older than this are recomputed when read (new jobs are
+# merged in as they are ingested, so this only catches drift such as edited jobs)
+JOB_RECOMMENDATION_MAX_AGE_SECONDS = int(os.getenv('JOB_RECOMMENDATION_MAX_AGE_SECONDS', 86400))
+ALL_JOBS_CACHE_SECONDS = int(os.getenv('ALL_JOBS_CACHE_SECONDS', 300))
+ALL_JOBS_CACHE_MAX_PAGES = int(os.getenv('ALL_JOBS_CACHE_MAX_PAGES', 1000))
+
+_tables_ready = False
+_tables_lock = threading.Lock()
+
+# Users waiting for a background recommendation refresh (after enrolling in a course).
+# Only an optimisation: the enrollment also clears computed_at in the database,
+# so a refresh lost with a recycled worker happens on the user's next read.
+_pending_users = set()
+_pending_lock = threading.Lock()
+_refresh_requested = threading.Event()
+_refresher_pid = None
+_refresher_lock = threading.Lock()
+
+# All-jobs pages cached per worker: (after_job_id, limit) -> (expires_at, page)
+_all_jobs_cache = {}
+_all_jobs_lock = threading.Lock()
+
+
+def ensure_job_recommendation_tables(conn):
+    """
+    Ensure the recommendation tables exist (checked once per worker)
+    """
+    global _tables_ready
+    if _tables_ready:
+        return
+    with _tables_lock:
+        if _tables_ready:
+            return
+        with conn.cursor() as cursor:
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS lms.user_job_recommendations
+            (
+                user_id integer NOT NULL,
+                job_id integer NOT NULL,
+                match_rank real NOT NULL,
+                computed_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (user_id, job_id)
+            );
+            CREATE INDEX IF NOT EXISTS user_job_recommendations_rank_idx
+            ON lms.user_job_recommendations (user_id, match_rank DESC, job_id);
+            -- Users whose recommendations have been computed (including users with no matches);
+            -- computed_at is NULL while they are out of date
+            CREATE TABLE IF NOT EXISTS lms.user_job_recommendation_state
+            (
+                user_id integer PRIMARY KEY,
+                computed_at timestamp
+            );
+            """)
+        conn.commit()
+        _tables_ready = True
+
+
+def refresh_user_job_recommendations(conn, user_ids):
+    """
+    Recompute the stored recommendations of the given users in one transaction
+    """
+    ensure_job_recommendation_tables(conn)
+    search_vector = get_job_search_vector(conn)
+    user_ids = sorted({int(user_id) for user_id in user_ids})
+    if not user_ids:
+        return
+    params = {'user_ids': user_ids, 'per_user': JOB_RECOMMENDATIONS_PER_USER}
+    try:
+        with conn.cursor() as cursor:
+            # Enrollments that mark these users stale wait for this refresh to commit,
+            # so their flag is not overwritten by results computed without them
+            cursor.execute(
+                "SELECT user_id FROM lms.user_job_recommendation_state WHERE user_id = ANY(%(user_ids)s) FOR UPDATE",
+                params
+            )
+            cursor.execute("DELETE FROM lms.user_job_recommendations WHERE user_id = ANY(%(user_ids)s)", params)
+            cursor.execute(f"""
+            WITH course_terms AS ({USER_COURSE_TERMS_QUERY.format(where='uce.user_id = ANY(%(user_ids)s)')}),
+            ranked AS (
+                SELECT ct.user_id, jm.job_id, ts_rank_cd({search_vector}, ct.query) AS match_rank
+                FROM course_terms ct
+                JOIN lms.jobs_master jm ON {search_vector} @@ ct.query
+            ),
+            numbered AS (
+                SELECT *, row_number() OVER (PARTITION BY user_id ORDER BY match_rank DESC, job_id) AS position
+                FROM ranked
+            )
+            INSERT INTO lms.user_job_recommendations (user_id, job_id, match_rank)
+            SELECT user_id, job_id, match_rank FROM numbered WHERE position <= %(per_user)s
+            """, params)
+            cursor.execute("""
+            INSERT INTO lms.user_job_recommendation_state (user_id, computed_at)
+            SELECT unnest(%(user_ids)s::integer[]), CURRENT_TIMESTAMP
+            ON CONFLICT (user_id) DO UPDATE SET computed_at = EXCLUDED.computed_at
+            """, params)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def add_new_jobs_to_recommendations(conn, job_ids):
+    """
+    Match newly ingested jobs against every user with stored recommendations,
+    add the hits and trim each affected user back to the per-user limit.
+    Existing matches are left alone. Returns the number of users affected.
+    """
+    ensure_job_recommendation_tables(conn)
+    search_vector = get_job_search_vector(conn)
+    job_ids = [int(job_id) for job_id in job_ids]
+    if not job_ids:
+        return 0
+    params = {'job_ids': job_ids, 'per_user': JOB_RECOMMENDATIONS_PER_USER}
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"""
+            WITH course_terms AS ({USER_COURSE_TERMS_QUERY.format(
+                where='uce.user_id IN (SELECT user_id FROM lms.user_job_recommendation_state)'
+            )})
+            INSERT INTO lms.user_job_recommendations (user_id, job_id, match_rank)
+            SELECT ct.user_id, jm.job_id, ts_rank_cd({search_vector}, ct.query)
+            FROM course_terms ct
+            JOIN lms.jobs_master jm ON jm.job_id = ANY(%(job_ids)s) AND {search_vector} @@ ct.query
+            ON CONFLICT (user_id, job_id) DO UPDATE
+            SET match_rank = EXCLUDED.match_rank, computed_at = EXCLUDED.computed_at
+            RETURNING user_id
+            """, params)
+            params['affected'] = sorted({row[0] for row in cursor.fetchall()})
+            if params['affected']:
+                cursor.execute("""
+                DELETE FROM lms.user_job_recommendations AS r
+                USING (
+                    SELECT user_id, job_id,
+                        row_number() OVER (PARTITION BY user_id ORDER BY match_rank DESC, job_id) AS position
+                    FROM lms.user_job_recommendations
+                    WHERE user_id = ANY(%(affected)s)
+                ) AS ranked
+                WHERE r.user_id = ranked.user_id AND r.job_id = ranked.job_id
+                AND ranked.position > %(per_user)s
+                """, params)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    invalidate_all_jobs_cache()
+    return len(params['affected'])
+
+
+def mark_job_recommendations_stale(cursor, user_id):
+    """
+    Flag a user's stored recommendations as out of date. Run it in the
+    transaction that changes their enrollments; the next read recomputes them.
+    """
+    cursor.execute(
+        "UPDATE lms.user_job_recommendation_state SET computed_at = NULL WHERE user_id = %s",
+        (user_id,)
+    )
+
+
+def get_user_job_recommendations_page(conn, user_id, limit, cursor=None):
+    """
+    One page of a user's stored recommendations, best matches first.
+    They are computed on the spot when missing, flagged stale or older than
+    JOB_RECOMMENDATION_MAX_AGE_SECONDS.
+    """
+    ensure_job_recommendation_tables(conn)
+    with conn.cursor() as db_cursor:
+        db_cursor.execute(
+            """
+            SELECT computed_at,
+                computed_at IS NULL OR computed_at < CURRENT_TIMESTAMP - make_interval(secs => %s) AS stale
+            FROM lms.user_job_recommendation_state WHERE user_id = %s
+            """,
+            (JOB_RECOMMENDATION_MAX_AGE_SECONDS, user_id)
+        )
+        state = db_cursor.fetchone()
+    if not state or state[1]:
+        refresh_user_job_recommendations(conn, [user_id])
+        with conn.cursor() as db_cursor:
+            db_cursor.execute("SELECT computed_at FROM lms.user_job_recommendation_state WHERE user_id = %s", (user_id,))
+            state = db_cursor.fetchone()
+
+    params = {'user_id': user_id, 'limit': limit + 1}
+    keyset = ""
+    if cursor:
+        keyset = """
+        AND (r.match_rank < %(after_rank)s::real
+             OR (r.match_rank = %(after_rank)s::real AND r.job_id > %(after_job)s))
+        """
+        try:
+            params['after_rank'] = float(cursor['rank'])
+            params['after_job'] = int(cursor['job'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError('Invalid cursor')
+
+    columns = ', '.join(f"jm.{col}" for col in JOB_COLUMNS)
+    query = f"""
+    SELECT {columns}, r.match_rank
+    FROM lms.user_job_recommendations r
+    JOIN lms.jobs_master jm ON jm.job_id = r.job_id
+    WHERE r.user_id = %(user_id)s {keyset}
+    ORDER BY r.match_rank DESC, r.job_id
+    LIMIT %(limit)s
+    """
+    with conn.cursor(cursor_factory=RealDictCursor) as db_cursor:
+        db_cursor.execute(query, params)
+        items = db_cursor.fetchall()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor({'rank': items[-1]['match_rank'], 'job': items[-1]['job_id']})
+
+    return {
+        'items': items,
+        'next_cursor': next_cursor,
+        'limit': limit,
+        'computed_at': state[0].isoformat() if state and state[0] else None
+    }
+
+
+def get_all_jobs_page(conn, limit, cursor=None):
+    """
+    One page of all jobs ordered by job_id, cached per worker for ALL_JOBS_CACHE_SECONDS
+    """
+    try:
+        after_job = int(cursor['job']) if cursor else None
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('Invalid cursor')
+    key = (after_job, limit)
+    now = time.time()
+    cached = _all_jobs_cache.get(key)
+    if cached and now < cached[0]:
+        return cached[1]
+
+    keyset = "WHERE job_id > %(after_job)s" if after_job is not None else ""
+    query = f"""
+    SELECT {', '.join(JOB_COLUMNS)}
+    FROM lms.jobs_master
+    {keyset}
+    ORDER BY job_id
+    LIMIT %(limit)s
+    """
+    with conn.cursor(cursor_factory=RealDictCursor) as db_cursor:
+        db_cursor.execute(query, {'after_job': after_job, 'limit': limit + 1})
+        items = db_cursor.fetchall()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor({'job': items[-1]['job_id']})
+
+    page = {'items': items, 'next_cursor': next_cursor, 'limit': limit}
+    with _all_jobs_lock:
+        # Cursors come from clients, so drop expired pages and cap the cache size
+        for expired in [k for k, (expires_at, _) in _all_jobs_cache.items() if expires_at <= now]:
+            del _all_jobs_cache[expired]
+        while len(_all_jobs_cache) >= ALL_JOBS_CACHE_MAX_PAGES:
+            del _all_jobs_cache[min(_all_jobs_cache, key=lambda k: _all_jobs_cache[k][0])]
+        _all_jobs_cache[key] = (now + ALL_JOBS_CACHE_SECONDS, page)
+    return page
+
+
+def invalidate_all_jobs_cache():
+    with _all_jobs_lock:
+        _all_jobs_cache.clear()
+
+
+def request_job_recommendation_refresh(user_id):
+    """
+    Queue a user's recommendations for a background refresh (e.g. after enrolling).
+    Bursts of enrollments are debounced into one set-based refresh.
+    """
+    with _pending_lock:
+        _pending_users.add(int(user_id))
+    start_job_recommendation_refresher()
+    _refresh_requested.set()
+
+
+def start_job_recommendation_refresher():
+    """
+    Start the per-worker background recommendation refresher
+    """
+    global _refresher_pid
+    pid = os.getpid()
+    if _refresher_pid == pid:
+        return
+    with _refresher_lock:
+        if _refresher_pid == pid:
+            return
+        thread = threading.Thread(target=_refresh_loop, name='job-recommendation-refresh')
+        thread.daemon = True
+        thread.start()
+        _refresher_pid = pid
+
+
+def _refresh_loop():
+    while True:
+        _refresh_requested.wait()
+        time.sleep(JOB_RECOMMENDATION_DEBOUNCE_SECONDS)
+        _refresh_requested.clear()
+        with _pending_lock:
+            user_ids = list(_pending_users)
+            _pending_users.clear()
+        if not user_ids:
+            continue
+
+        conn = None
+        try:
+            conn = get_db_connection(DB_CONFIG)
+            if not conn:
+                raise RuntimeError("Database connection failed")
+            refresh_user_job_recommendations(conn, user_ids)
+            print(f"💼 Job recommendations refreshed for {len(user_ids)} user(s)")
+        except Exception as e:
+            print(f"Error refreshing job recommendations: {str(e)}")
+            # Try again on the next request
+            with _pending_lock:
+                _pending_users.update(user_ids)
+        finally:
+            if conn:
+                conn.close()
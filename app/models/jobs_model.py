@@ -1,45 +1,103 @@
-from psycopg2.extras import RealDictCursor
-
-def get_all_jobs(conn):
-    query = "SELECT * FROM lms.jobs_master"
-    with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-        cursor.execute(query)
-        return cursor.fetchall()
-
-def get_jobs_by_user_courses(conn, user_id):
-    # First get all course titles for the user
-    course_query = """
-        SELECT DISTINCT cm.course_name as course_title 
-        FROM lms.user_course_enrollment uce
-        JOIN lms.course_master cm ON uce.course_id = cm.course_id
-        WHERE uce.user_id = %s
+import os
+import threading
+import time
+
+# Columns returned to clients (search_vector is internal)
+JOB_COLUMNS = ('job_id', 'job_title', 'company', 'salary', 'location', 'skills', 'apply_link', 'description')
+
+# Title matches rank above skills, skills above description
+def _job_search_document(prefix=''):
+    return f"""
+    setweight(to_tsvector('english', coalesce({prefix}job_title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce({prefix}skills, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce({prefix}description, '')), 'C')
+    """
+
+# One OR-ed full-text query per user, built from their enrolled course names
+USER_COURSE_TERMS_QUERY = """
+    SELECT uce.user_id, replace(
+        plainto_tsquery('english', string_agg(DISTINCT cm.course_name, ' '))::text, '&', '|'
+    )::tsquery AS query
+    FROM lms.user_course_enrollment uce
+    JOIN lms.course_master cm ON uce.course_id = cm.course_id
+    WHERE {where}
+    GROUP BY uce.user_id
+"""
+
+# How long a worker keeps using the inline expression before checking again
+# whether create_job_search_index.py has added the column
+JOB_SEARCH_INDEX_CHECK_SECONDS = int(os.getenv('JOB_SEARCH_INDEX_CHECK_SECONDS', 300))
+
+# Expression used for matching: the indexed column once it exists, the inline document otherwise
+_search_vector = None
+_search_checked_at = 0.0
+_search_lock = threading.Lock()
+
+
+def create_job_search_index(conn):
+    """
+    Add the stored, generated search_vector column to jobs_master and build its
+    GIN index without blocking writes. Postgres keeps the column up to date on
+    every insert and update.
+
+    Runs DDL, so call it from create_job_search_index.py (or a deploy step),
+    never from a request. Adding the column rewrites the table once; the index
+    is built CONCURRENTLY, which cannot run inside a transaction, so the
+    connection is switched to autocommit for the duration.
+    """
+    autocommit = conn.autocommit
+    conn.rollback()
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"""
+            ALTER TABLE lms.jobs_master
+            ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS ({_job_search_document()}) STORED
+            """)
+            # An interrupted concurrent build leaves an invalid index behind; rebuild it
+            cursor.execute("""
+            SELECT 1 FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = 'lms' AND c.relname = 'jobs_master_search_idx' AND NOT i.indisvalid
+            """)
+            if cursor.fetchone():
+                cursor.execute("DROP INDEX CONCURRENTLY lms.jobs_master_search_idx")
+            cursor.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS jobs_master_search_idx
+            ON lms.jobs_master USING GIN (search_vector)
+            """)
+    finally:
+        conn.autocommit = autocommit
+
+
+def get_job_search_vector(conn):
+    """
+    The tsvector expression to match jobs with: jm.search_vector when
+    create_job_search_index has added the column, the inline weighted document
+    otherwise. Only reads the catalog; a missing column is looked up again
+    after JOB_SEARCH_INDEX_CHECK_SECONDS.
     """
-    
-    with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-        cursor.execute(course_query, (user_id,))
-        courses = cursor.fetchall()
-        
-        if not courses:
-            return []
-            
-        # Create a list to store all search terms
-        search_terms = []
-        for course in courses:
-            # Split course title into words and add to search terms
-            words = course['course_title'].split()
-            search_terms.extend(words)
-            
-        # Remove duplicates and create the LIKE conditions
-        search_terms = list(set(search_terms))
-        like_conditions = " OR ".join([f"description ILIKE %s" for _ in search_terms])
-        search_params = [f"%{term}%" for term in search_terms]
-        
-        # Final query to search jobs
-        jobs_query = f"""
-            SELECT DISTINCT jm.* 
-            FROM lms.jobs_master jm
-            WHERE {like_conditions}
-        """
-        
-        cursor.execute(jobs_query, search_params)
-        return cursor.fetchall()
+    global _search_vector, _search_checked_at
+    if _search_vector == 'jm.search_vector':
+        return _search_vector
+    if _search_vector and time.time() - _search_checked_at < JOB_SEARCH_INDEX_CHECK_SECONDS:
+        return _search_vector
+    with _search_lock:
+        if _search_vector == 'jm.search_vector':
+            return _search_vector
+        with conn.cursor() as cursor:
+            cursor.execute("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = 'lms' AND table_name = 'jobs_master' AND column_name = 'search_vector'
+            """)
+            indexed = cursor.fetchone() is not None
+        if indexed:
+            _search_vector = 'jm.search_vector'
+        else:
+            if _search_vector is None:
+                print("Job search column missing (run create_job_search_index.py), matching without it")
+            _search_vector = f"({_job_search_document('jm.')})"
+        _search_checked_at = time.time()
+        return _search_vector
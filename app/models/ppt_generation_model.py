@@ -1,22 +1,46 @@
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import BinaryIO, List, Dict, Optional, Tuple
+import hashlib
+import io
+import json
 import os
-import tempfile
-import boto3
+import threading
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
 
 from psycopg2.extras import RealDictCursor
+import pptx
 from pptx import Presentation
 from pptx.util import Pt
 from pptx.enum.text import PP_ALIGN
 
 from app.utils.db_utils import get_db_connection
+from app.utils.s3_utils import get_s3_client, S3_PUBLIC_READ, S3_IMMUTABLE_CACHE_CONTROL
 from app.config.database import DB_CONFIG
 
 # Load environment variables
 load_dotenv()
 
+PPTX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.presentationml.presentation'
+
+# Multipart part size for streaming uploads (S3 minimum is 5 MB)
+PPT_UPLOAD_PART_SIZE = int(float(os.getenv('PPT_UPLOAD_PART_SIZE_MB', '8')) * 1024 * 1024)
+_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=PPT_UPLOAD_PART_SIZE,
+    multipart_chunksize=PPT_UPLOAD_PART_SIZE
+)
+
+# Bump when the slide-building code changes so existing decks are rebuilt
+DECK_FORMAT_VERSION = "1"
+
+_deck_table_ready = False
+_deck_table_lock = threading.Lock()
+
+# Parsed templates cached per worker: path -> {'mtime', 'data', 'digest', 'layouts', 'content_layout'}
+_template_cache: Dict[str, Dict] = {}
+_template_lock = threading.Lock()
+
 
 def _truncate_text(text: str, max_chars: int) -> str:
     if text is None:
@@ -39,29 +63,90 @@ def _add_bullets_to_placeholder(placeholder, bullets: List[str], font_size_pt: i
         p.alignment = PP_ALIGN.LEFT
 
 
-def _get_layout(prs: Presentation, name_fallback_index: int = 1):
+def _find_content_layout(layout_names: List[str], name_fallback_index: int = 1) -> int:
     # Try to pick a Title and Content layout; fallback to index if names vary
-    for layout in prs.slide_layouts:
-        if layout.name and ("Title and Content" in layout.name or "Title and Body" in layout.name):
-            return layout
-    return prs.slide_layouts[name_fallback_index]
+    for idx, name in enumerate(layout_names):
+        if name and ("Title and Content" in name or "Title and Body" in name):
+            return idx
+    return name_fallback_index
+
+
+def _get_layout(prs: Presentation, template: Dict, name: Optional[str] = None, name_fallback_index: int = 1):
+    # Layout indexes are precomputed per template; without a name use the title-and-content layout
+    if name is None:
+        return prs.slide_layouts[template['content_layout']]
+    return prs.slide_layouts[template['layouts'].get(name, name_fallback_index)]
+
+
+def _resolve_template_path(template_path: Optional[str]) -> str:
+    return template_path or os.path.join(os.path.dirname(pptx.__file__), 'templates', 'default.pptx')
+
+
+def _load_template(template_path: Optional[str] = None) -> Dict:
+    """
+    Return the cached template entry, re-reading the file only when it changes on disk
+
+    :param template_path: Optional path to PowerPoint template (python-pptx default when None)
+    :return: Dictionary with the template 'data', its 'digest', a layout name -> index map
+             under 'layouts' and the index of the title-and-content layout under 'content_layout'
+    """
+    path = _resolve_template_path(template_path)
+    mtime = os.path.getmtime(path)
+    entry = _template_cache.get(path)
+    if entry and entry['mtime'] == mtime:
+        return entry
+
+    with _template_lock:
+        entry = _template_cache.get(path)
+        if entry and entry['mtime'] == mtime:
+            return entry
+        with open(path, 'rb') as fh:
+            data = fh.read()
+        layout_names = [layout.name for layout in Presentation(io.BytesIO(data)).slide_layouts]
+        entry = {
+            'mtime': mtime,
+            'data': data,
+            'digest': hashlib.sha256(data).hexdigest(),
+            'layouts': {name: idx for idx, name in enumerate(layout_names) if name},
+            'content_layout': _find_content_layout(layout_names)
+        }
+        _template_cache[path] = entry
+        return entry
+
+
+def _new_presentation(template_path: Optional[str] = None) -> Tuple[Presentation, Dict]:
+    """
+    Create a presentation from the cached template bytes instead of re-reading the file
+    """
+    entry = _load_template(template_path)
+    return Presentation(io.BytesIO(entry['data'])), entry
 
 
-def update_course_ppt_url(conn, course_id: int, ppt_url: str) -> bool:
+def update_course_ppt_url(conn, course_id: int, ppt_url: str, only_if_changed: bool = False) -> bool:
     """
     Update the PPT URL in the course_master table
     
     :param conn: Database connection
     :param course_id: ID of the course to update
     :param ppt_url: S3 URL of the generated PPT
+    :param only_if_changed: Leave the row untouched when it already holds this URL
     :return: True if successful, False otherwise
     """
     try:
         with conn.cursor() as cursor:
-            cursor.execute(
-                "UPDATE lms.course_master SET ppt_url = %s WHERE course_id = %s",
-                (ppt_url, course_id)
-            )
+            if only_if_changed:
+                cursor.execute(
+                    "UPDATE lms.course_master SET ppt_url = %s WHERE course_id = %s AND ppt_url IS DISTINCT FROM %s",
+                    (ppt_url, course_id, ppt_url)
+                )
+                if cursor.rowcount == 0:
+                    conn.rollback()
+                    return True
+            else:
+                cursor.execute(
+                    "UPDATE lms.course_master SET ppt_url = %s WHERE course_id = %s",
+                    (ppt_url, course_id)
+                )
             
             # Check if any row was updated
             if cursor.rowcount > 0:
@@ -78,62 +163,364 @@ def update_course_ppt_url(conn, course_id: int, ppt_url: str) -> bool:
         return False
 
 
-def upload_to_s3(file_path: str, bucket_name: str, object_name: str) -> str:
+def compute_deck_hash(rows: List[Dict], template_path: Optional[str] = None, max_slides: int = 30) -> str:
     """
-    Upload a file to an S3 bucket and return the public URL
-    
-    :param file_path: File to upload
+    Hash everything that determines the deck: course rows, template and build settings
+
+    :param rows: course_content rows used to build the deck
+    :param template_path: Optional path to PowerPoint template
+    :param max_slides: Maximum number of slides to generate
+    :return: Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    digest.update(f"format={DECK_FORMAT_VERSION};max_slides={max_slides};".encode())
+    if template_path:
+        digest.update(_load_template(template_path)['digest'].encode())
+    else:
+        digest.update(f"default-template:python-pptx-{pptx.__version__}".encode())
+    digest.update(json.dumps(rows, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def ensure_deck_table(conn) -> None:
+    """
+    Ensure the course_ppt_deck table exists (checked once per worker)
+    """
+    global _deck_table_ready
+    if _deck_table_ready:
+        return
+    with _deck_table_lock:
+        if _deck_table_ready:
+            return
+        with conn.cursor() as cursor:
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS lms.course_ppt_deck
+            (
+                content_hash character varying(64) PRIMARY KEY,
+                course_id integer NOT NULL,
+                ppt_url text NOT NULL,
+                created_date timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
+            """)
+        conn.commit()
+        _deck_table_ready = True
+
+
+def get_deck_by_hash(conn, content_hash: str) -> Optional[Dict]:
+    """
+    Look up an already uploaded deck by its content hash
+    """
+    ensure_deck_table(conn)
+    with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        cursor.execute(
+            "SELECT content_hash, course_id, ppt_url, created_date FROM lms.course_ppt_deck WHERE content_hash = %s",
+            (content_hash,)
+        )
+        return cursor.fetchone()
+
+
+def record_deck(conn, content_hash: str, course_id: int, ppt_url: str) -> None:
+    """
+    Remember the uploaded deck for a content hash
+    """
+    ensure_deck_table(conn)
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO lms.course_ppt_deck (content_hash, course_id, ppt_url)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (content_hash) DO UPDATE SET ppt_url = EXCLUDED.ppt_url, created_date = CURRENT_TIMESTAMP
+            """,
+            (content_hash, course_id, ppt_url)
+        )
+    conn.commit()
+
+
+def upload_fileobj_to_s3(fileobj: BinaryIO, bucket_name: str, object_name: str, metadata: Optional[Dict[str, str]] = None, immutable: bool = False) -> str:
+    """
+    Stream a file-like object to an S3 bucket (multipart above the configured
+    part size) and return the object URL.
+
+    :param fileobj: Binary file-like object positioned at the start of the data
     :param bucket_name: Bucket to upload to
     :param object_name: S3 object name
-    :return: Public URL of uploaded file or None if error
+    :param metadata: Optional user metadata stored with the object
+    :param immutable: The key is content-addressed (never rewritten with other
+        content), so the object may be cached forever
+    :return: Object URL (serve it through presign_url unless S3_PUBLIC_READ is set)
     """
-    # Get AWS credentials from environment
-    aws_access_key = os.getenv('AWS_ACCESS_KEY_ID')
-    aws_secret_key = os.getenv('AWS_SECRET_ACCESS_KEY')
     aws_region = os.getenv('AWS_REGION', 'us-east-1')
-    
-    if not aws_access_key or not aws_secret_key:
-        raise ValueError("AWS credentials not found in environment variables")
-    
-    # Create S3 client
-    s3_client = boto3.client(
-        's3',
-        aws_access_key_id=aws_access_key,
-        aws_secret_access_key=aws_secret_key,
-        region_name=aws_region
-    )
-    
+
+    # Reuse the worker's pooled S3 client
+    s3_client = get_s3_client()
+
+    extra_args = {
+        'ContentType': PPTX_CONTENT_TYPE,
+        'ContentDisposition': f'attachment; filename="{os.path.basename(object_name)}"'
+    }
+    if immutable:
+        extra_args['CacheControl'] = S3_IMMUTABLE_CACHE_CONTROL
+    if metadata:
+        extra_args['Metadata'] = metadata
+    if S3_PUBLIC_READ:
+        extra_args['ACL'] = 'public-read'
+
     try:
-        # Upload the file
-        s3_client.upload_file(
-            file_path, 
-            bucket_name, 
+        s3_client.upload_fileobj(
+            fileobj,
+            bucket_name,
             object_name,
-            ExtraArgs={
-                'ContentType': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
-                'ACL': 'public-read'  # Make file publicly accessible
-            }
+            ExtraArgs=extra_args,
+            Config=_TRANSFER_CONFIG
         )
         
-        # Return the public URL
-        public_url = f"https://{bucket_name}.s3.{aws_region}.amazonaws.com/{object_name}"
-        return public_url
+        # Return the object URL
+        object_url = f"https://{bucket_name}.s3.{aws_region}.amazonaws.com/{object_name}"
+        return object_url
         
     except ClientError as e:
         print(f"Error uploading to S3: {e}")
         raise
 
 
-def generate_ppt_for_course(course_id: int, filename: Optional[str] = None, template_path: Optional[str] = None, max_slides: int = 30, upload_to_cloud: bool = True) -> Dict[str, str]:
+def upload_to_s3(file_path: str, bucket_name: str, object_name: str) -> str:
+    """
+    Upload a file to an S3 bucket and return the public URL
+    
+    :param file_path: File to upload
+    :param bucket_name: Bucket to upload to
+    :param object_name: S3 object name
+    :return: Public URL of uploaded file or None if error
+    """
+    with open(file_path, 'rb') as fileobj:
+        return upload_fileobj_to_s3(fileobj, bucket_name, object_name)
+
+
+COURSE_CONTENT_QUERY = """
+SELECT course_id, course_mastertitle_breakdown_id, course_mastertitle_breakdown,
+       course_subtitle_id, course_subtitle, subtitle_content, subtitle_code, subtitle_help_text,
+       helpfull_links
+FROM lms.course_content
+WHERE course_id = ANY(%s)
+ORDER BY course_id, course_mastertitle_breakdown_id, course_subtitle_id
+"""
+
+
+def fetch_course_rows_bulk(conn, course_ids: List[int]) -> Dict[int, List[Dict]]:
+    """
+    Read course_content for many courses in a single query
+
+    :param conn: Database connection
+    :param course_ids: Courses to read
+    :return: Dictionary of course_id -> ordered content rows (courses without content are omitted)
+    """
+    rows_by_course: Dict[int, List[Dict]] = {}
+    with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        cursor.execute(COURSE_CONTENT_QUERY, (list(course_ids),))
+        for row in cursor.fetchall():
+            rows_by_course.setdefault(row['course_id'], []).append(dict(row))
+    return rows_by_course
+
+
+def fetch_course_rows(conn, course_id: int) -> List[Dict]:
+    """
+    Read the course_content rows used to build a course deck
+    """
+    return fetch_course_rows_bulk(conn, [course_id]).get(course_id, [])
+
+
+def build_presentation_bytes(course_id: int, rows: List[Dict], template_path: Optional[str] = None, max_slides: int = 30) -> bytes:
+    """
+    Build the course deck from its content rows and return the .pptx bytes.
+    Does not touch the database or S3, so it can run in a worker process.
+
+    :param course_id: ID of the course
+    :param rows: course_content rows ordered by section and subtitle
+    :param template_path: Optional path to PowerPoint template
+    :param max_slides: Maximum number of slides to generate
+    :return: Serialized presentation
+    """
+    # Build comprehensive course structure
+    course_title = rows[0].get("course_mastertitle_breakdown") or f"Course {course_id}"
+    sections: Dict[int, Dict] = {}
+    for r in rows:
+        sect_id = r["course_mastertitle_breakdown_id"]
+        sections.setdefault(sect_id, {"title": r["course_mastertitle_breakdown"], "items": []})
+        sections[sect_id]["items"].append(r)
+
+    print(f"Found {len(sections)} sections with {len(rows)} total content items")
+
+    prs, template = _new_presentation(template_path)
+    title_layout = prs.slide_layouts[0]
+    content_layout = _get_layout(prs, template)
+
+    # Slide 1: Title
+    slide = prs.slides.add_slide(title_layout)
+    slide.shapes.title.text = _truncate_text(course_title, 100)
+    if len(slide.placeholders) > 1:
+        subtitle_ph = slide.placeholders[1]
+        subtitle_ph.text = f"Comprehensive Learning Guide\nCourse ID: {course_id} | {len(sections)} Modules | {len(rows)} Topics"
+
+    # Add course overview slide
+    if len(sections) > 1:
+        overview_slide = prs.slides.add_slide(content_layout)
+        overview_slide.shapes.title.text = "Course Overview"
+        if len(overview_slide.placeholders) > 1:
+            body = overview_slide.placeholders[1]
+            overview_bullets = []
+            for sect_id in sorted(sections.keys()):
+                section = sections[sect_id]
+                section_title = section["title"] or f"Module {sect_id}"
+                item_count = len(section["items"])
+                overview_bullets.append(f"{section_title} ({item_count} topics)")
+            _add_bullets_to_placeholder(body, overview_bullets, font_size_pt=18)
+
+    # Slides 2..N: content
+    slide_count = 2 if len(sections) > 1 else 1
+    for sect_id in sorted(sections.keys()):
+        section = sections[sect_id]
+        section_title = section["title"] or f"Module {sect_id}"
+
+        # Add section header slide
+        if slide_count < max_slides - 2:
+            s = prs.slides.add_slide(content_layout)
+            slide_count += 1
+            s.shapes.title.text = f"📚 {_truncate_text(section_title, 70)}"
+            if len(s.placeholders) > 1:
+                body = s.placeholders[1]
+                bullets = []
+                bullets.append(f"📊 Topics covered: {len(section['items'])}")
+                bullets.append("🎯 Learning objectives:")
+
+                # Add first few subtitles as objectives
+                for item in section["items"][:5]:
+                    bullet_text = item.get("course_subtitle") or ""
+                    if bullet_text:
+                        bullets.append(f"  • {_truncate_text(bullet_text, 80)}")
+                _add_bullets_to_placeholder(body, bullets, font_size_pt=18)
+
+        # Add detailed content slides for each item
+        for item in section["items"]:
+            if slide_count >= max_slides - 2:
+                break
+            s = prs.slides.add_slide(content_layout)
+            slide_count += 1
+            sub_title = item.get("course_subtitle") or "Topic"
+            s.shapes.title.text = _truncate_text(sub_title, 60)
+
+            if len(s.placeholders) > 1:
+                body = s.placeholders[1]
+                content = item.get("subtitle_content") or ""
+                code_content = item.get("subtitle_code") or ""
+                help_text = item.get("subtitle_help_text") or ""
+                helpful_links = item.get("helpfull_links") or ""
+
+                bullets = []
+
+                # Add main content
+                if content:
+                    content_lines = [ln.strip() for ln in content.split("\n") if ln.strip()]
+                    for line in content_lines[:4]:
+                        if len(line) > 10:  # Skip very short lines
+                            bullets.append(f"📝 {_truncate_text(line, 120)}")
+
+                # Add code examples if available
+                if code_content:
+                    bullets.append("💻 Code Example:")
+                    code_lines = [ln.strip() for ln in code_content.split("\n") if ln.strip()]
+                    for line in code_lines[:3]:
+                        bullets.append(f"  {_truncate_text(line, 100)}")
+
+                # Add help text
+                if help_text:
+                    bullets.append(f"💡 Tip: {_truncate_text(help_text, 100)}")
+
+                # Add helpful links
+                if helpful_links:
+                    bullets.append(f"🔗 Resources: {_truncate_text(helpful_links, 80)}")
+
+                # Ensure we have at least some content
+                if not bullets:
+                    bullets = [f"📚 {sub_title}", "Content will be added in future updates"]
+
+                _add_bullets_to_placeholder(body, bullets[:8], font_size_pt=16)
+
+    if slide_count < max_slides:
+        # Last slide: Thanks
+        s = prs.slides.add_slide(content_layout)
+        s.shapes.title.text = "Thank You"
+        if len(s.placeholders) > 1:
+            body = s.placeholders[1]
+            _add_bullets_to_placeholder(body, ["Questions?", f"Generated on {datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}"])
+
+    # Serialize the presentation in memory
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+
+def default_deck_filename(course_id: int, content_hash: str) -> str:
+    """
+    Object filename for a deck; the content hash versions the key
+    """
+    return f"course_{course_id}_presentation_{content_hash[:16]}"
+
+
+def deck_metadata(course_id: int, content_hash: str) -> Dict[str, str]:
+    """
+    S3 user metadata recorded with an uploaded deck
+    """
+    return {'course-id': str(course_id), 'content-hash': content_hash, 'deck-format': DECK_FORMAT_VERSION}
+
+
+def upload_deck(data: bytes, filename: str, metadata: Optional[Dict[str, str]] = None, immutable: bool = False) -> Optional[str]:
+    """
+    Upload a built deck to the configured bucket
+
+    :param data: Serialized presentation
+    :param filename: Object filename (without extension)
+    :param metadata: Optional user metadata stored with the object
+    :param immutable: filename is content-hashed (default_deck_filename), so it may be cached forever
+    :return: Object URL, or None if no bucket is configured
+    """
+    bucket_name = os.getenv('AWS_S3_BUCKET_NAME')
+    if not bucket_name:
+        print("⚠️  AWS_S3_BUCKET_NAME not found in environment. Skipping S3 upload.")
+        return None
+
+    # Create S3 object key
+    s3_key = f"presentations/{filename}.pptx"
+    print(f"Uploading to S3 bucket: {bucket_name}")
+    return upload_fileobj_to_s3(io.BytesIO(data), bucket_name, s3_key, metadata, immutable=immutable)
+
+
+def record_published_deck(conn, course_id: int, content_hash: str, cloud_url: str) -> bool:
+    """
+    Remember an uploaded deck and point course_master at it
+    """
+    record_deck(conn, content_hash, course_id, cloud_url)
+    return update_course_ppt_url(conn, course_id, cloud_url)
+
+
+def generate_ppt_for_course(course_id: int, filename: Optional[str] = None, template_path: Optional[str] = None, max_slides: int = 30, upload_to_cloud: bool = True, save_local: bool = False, force: bool = False) -> Dict[str, str]:
     """
     Generate a PPTX for a course using stored content from DB and optionally upload to S3.
+    The presentation is serialized in memory; a local copy is only written when
+    requested, when upload_to_cloud is False, or when no bucket is configured
+    (AWS_S3_BUCKET_NAME unset). If a deck was already uploaded for
+    the same content hash (course rows + template), its URL is reused without
+    rebuilding or uploading.
 
     :param course_id: ID of the course to generate PPT for
-    :param filename: Optional custom filename (without extension)
+    :param filename: Optional custom filename (without extension). Custom names are
+        not content-addressed, so they are uploaded without the immutable
+        Cache-Control header and not registered for content-hash reuse
     :param template_path: Optional path to PowerPoint template
     :param max_slides: Maximum number of slides to generate
     :param upload_to_cloud: Whether to upload to S3 (default: True)
-    :return: Dictionary with 'local_path', 'cloud_url', and 'filename'
+    :param save_local: Also write the deck to <project_root>/temp_files (default: False)
+    :param force: Rebuild and upload even if an identical deck exists (default: False)
+    :return: Dictionary with 'local_path', 'cloud_url', 'filename', 'content_hash' and 'reused'
     """
     conn = None
     try:
@@ -141,195 +528,82 @@ def generate_ppt_for_course(course_id: int, filename: Optional[str] = None, temp
         if not conn:
             raise RuntimeError("Database connection failed")
 
-        query = (
-            """
-            SELECT course_id, course_mastertitle_breakdown_id, course_mastertitle_breakdown,
-                   course_subtitle_id, course_subtitle, subtitle_content, subtitle_code, subtitle_help_text,
-                   helpfull_links
-            FROM lms.course_content
-            WHERE course_id = %s
-            ORDER BY course_mastertitle_breakdown_id, course_subtitle_id
-            """
-        )
-        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-            cursor.execute(query, (course_id,))
-            rows: List[Dict] = cursor.fetchall()
-
+        rows = fetch_course_rows(conn, course_id)
         if not rows:
             raise ValueError(f"No content found for course_id={course_id}")
 
-        # Build comprehensive course structure
-        course_title = rows[0].get("course_mastertitle_breakdown") or f"Course {course_id}"
-        sections: Dict[int, Dict] = {}
-        for r in rows:
-            sect_id = r["course_mastertitle_breakdown_id"]
-            sections.setdefault(sect_id, {"title": r["course_mastertitle_breakdown"], "items": []})
-            sections[sect_id]["items"].append(r)
-        
-        print(f"Found {len(sections)} sections with {len(rows)} total content items")
-
-        prs = Presentation(template_path) if template_path else Presentation()
-        title_layout = prs.slide_layouts[0]
-        content_layout = _get_layout(prs)
-
-        # Slide 1: Title
-        slide = prs.slides.add_slide(title_layout)
-        slide.shapes.title.text = _truncate_text(course_title, 100)
-        if len(slide.placeholders) > 1:
-            subtitle_ph = slide.placeholders[1]
-            subtitle_ph.text = f"Comprehensive Learning Guide\nCourse ID: {course_id} | {len(sections)} Modules | {len(rows)} Topics"
-
-        # Add course overview slide
-        if len(sections) > 1:
-            overview_slide = prs.slides.add_slide(content_layout)
-            overview_slide.shapes.title.text = "Course Overview"
-            if len(overview_slide.placeholders) > 1:
-                body = overview_slide.placeholders[1]
-                overview_bullets = []
-                for sect_id in sorted(sections.keys()):
-                    section = sections[sect_id]
-                    section_title = section["title"] or f"Module {sect_id}"
-                    item_count = len(section["items"])
-                    overview_bullets.append(f"{section_title} ({item_count} topics)")
-                _add_bullets_to_placeholder(body, overview_bullets, font_size_pt=18)
-        
-        # Slides 2..N: content
-        slide_count = 2 if len(sections) > 1 else 1
-        for sect_id in sorted(sections.keys()):
-            section = sections[sect_id]
-            section_title = section["title"] or f"Module {sect_id}"
-            
-            # Add section header slide
-            if slide_count < max_slides - 2:
-                s = prs.slides.add_slide(content_layout)
-                slide_count += 1
-                s.shapes.title.text = f"📚 {_truncate_text(section_title, 70)}"
-                if len(s.placeholders) > 1:
-                    body = s.placeholders[1]
-                    bullets = []
-                    bullets.append(f"📊 Topics covered: {len(section['items'])}")
-                    bullets.append("🎯 Learning objectives:")
-                    
-                    # Add first few subtitles as objectives
-                    for item in section["items"][:5]:
-                        bullet_text = item.get("course_subtitle") or ""
-                        if bullet_text:
-                            bullets.append(f"  • {_truncate_text(bullet_text, 80)}")
-                    _add_bullets_to_placeholder(body, bullets, font_size_pt=18)
-
-            # Add detailed content slides for each item
-            for item in section["items"]:
-                if slide_count >= max_slides - 2:
-                    break
-                s = prs.slides.add_slide(content_layout)
-                slide_count += 1
-                sub_title = item.get("course_subtitle") or "Topic"
-                s.shapes.title.text = _truncate_text(sub_title, 60)
-                
-                if len(s.placeholders) > 1:
-                    body = s.placeholders[1]
-                    content = item.get("subtitle_content") or ""
-                    code_content = item.get("subtitle_code") or ""
-                    help_text = item.get("subtitle_help_text") or ""
-                    helpful_links = item.get("helpfull_links") or ""
-                    
-                    bullets = []
-                    
-                    # Add main content
-                    if content:
-                        content_lines = [ln.strip() for ln in content.split("\n") if ln.strip()]
-                        for line in content_lines[:4]:
-                            if len(line) > 10:  # Skip very short lines
-                                bullets.append(f"📝 {_truncate_text(line, 120)}")
-                    
-                    # Add code examples if available
-                    if code_content:
-                        bullets.append("💻 Code Example:")
-                        code_lines = [ln.strip() for ln in code_content.split("\n") if ln.strip()]
-                        for line in code_lines[:3]:
-                            bullets.append(f"  {_truncate_text(line, 100)}")
-                    
-                    # Add help text
-                    if help_text:
-                        bullets.append(f"💡 Tip: {_truncate_text(help_text, 100)}")
-                    
-                    # Add helpful links
-                    if helpful_links:
-                        bullets.append(f"🔗 Resources: {_truncate_text(helpful_links, 80)}")
-                    
-                    # Ensure we have at least some content
-                    if not bullets:
-                        bullets = [f"📚 {sub_title}", "Content will be added in future updates"]
-                    
-                    _add_bullets_to_placeholder(body, bullets[:8], font_size_pt=16)
-
-        if slide_count < max_slides:
-            # Last slide: Thanks
-            s = prs.slides.add_slide(content_layout)
-            s.shapes.title.text = "Thank You"
-            if len(s.placeholders) > 1:
-                body = s.placeholders[1]
-                _add_bullets_to_placeholder(body, ["Questions?", f"Generated on {datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}"])
+        content_hash = compute_deck_hash(rows, template_path, max_slides)
+
+        # Skip the build and upload when this exact content was already published
+        if upload_to_cloud and not save_local and not force:
+            existing_deck = get_deck_by_hash(conn, content_hash)
+            if existing_deck:
+                print(f"♻️  Course {course_id} content unchanged, reusing deck: {existing_deck['ppt_url']}")
+                update_course_ppt_url(conn, course_id, existing_deck['ppt_url'], only_if_changed=True)
+                return {
+                    'local_path': None,
+                    'filename': os.path.basename(existing_deck['ppt_url']),
+                    'cloud_url': existing_deck['ppt_url'],
+                    'content_hash': content_hash,
+                    'reused': True
+                }
+
+        data = build_presentation_bytes(course_id, rows, template_path, max_slides)
+        print(f"PPT built in memory: {len(data):,} bytes")
+
+        # Generated filenames carry the content hash, so their objects never change
+        hashed_key = not filename
+        if hashed_key:
+            filename = default_deck_filename(course_id, content_hash)
 
-        # Generate filename if not provided
-        if not filename:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"course_{course_id}_presentation_{timestamp}"
-        
-        # Create temp directory in project root (production-safe)
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-        temp_dir = os.path.join(project_root, 'temp_files')
-        os.makedirs(temp_dir, exist_ok=True)
-        
-        # Create temp file path
-        temp_filename = f"{filename}_{datetime.now().strftime('%H%M%S')}.pptx"
-        temp_path = os.path.join(temp_dir, temp_filename)
-        
-        # Save to temp file
-        prs.save(temp_path)
-        print(f"PPT saved locally to: {temp_path}")
-        
         result = {
-            'local_path': temp_path,
+            'local_path': None,
             'filename': f"{filename}.pptx",
-            'cloud_url': None
+            'cloud_url': None,
+            'content_hash': content_hash,
+            'reused': False
         }
-        
+
+        def save_locally():
+            project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+            local_dir = os.path.join(project_root, 'temp_files')
+            os.makedirs(local_dir, exist_ok=True)
+            local_path = os.path.join(local_dir, f"{filename}.pptx")
+            with open(local_path, 'wb') as fh:
+                fh.write(data)
+            result['local_path'] = local_path
+            print(f"PPT saved locally to: {local_path}")
+
+        # Only touch the filesystem when explicitly requested or when there is nowhere else to put the deck
+        if save_local or not upload_to_cloud:
+            save_locally()
+
         # Upload to S3 if requested
         if upload_to_cloud:
             try:
-                bucket_name = os.getenv('AWS_S3_BUCKET_NAME')
-                if not bucket_name:
-                    print("⚠️  AWS_S3_BUCKET_NAME not found in environment. Skipping S3 upload.")
+                cloud_url = upload_deck(data, filename, deck_metadata(course_id, content_hash), immutable=hashed_key)
+                if not cloud_url:
+                    # No bucket configured: keep a local copy instead
+                    if not result['local_path']:
+                        save_locally()
                     return result
-                
-                # Create S3 object key
-                s3_key = f"presentations/{filename}.pptx"
-                
-                print(f"Uploading to S3 bucket: {bucket_name}")
-                cloud_url = upload_to_s3(temp_path, bucket_name, s3_key)
                 result['cloud_url'] = cloud_url
                 print(f"✅ PPT uploaded to S3: {cloud_url}")
-                
-                # Update database with PPT URL
-                if update_course_ppt_url(conn, course_id, cloud_url):
+
+                # Update database with PPT URL; only content-addressed keys can be reused by hash
+                if hashed_key:
+                    updated = record_published_deck(conn, course_id, content_hash, cloud_url)
+                else:
+                    updated = update_course_ppt_url(conn, course_id, cloud_url)
+                if updated:
                     print(f"📊 Course master table updated with PPT URL")
                 else:
                     print(f"⚠️  Failed to update course master table")
-                
-                # Clean up local temp file after successful S3 upload
-                try:
-                    os.remove(temp_path)
-                    print(f"🗑️  Local temp file cleaned up: {temp_filename}")
-                    result['local_path'] = None  # File no longer exists locally
-                except OSError as cleanup_error:
-                    print(f"⚠️  Could not clean up temp file: {cleanup_error}")
-                
+
             except Exception as e:
                 print(f"❌ Failed to upload to S3: {str(e)}")
-                print("PPT is still available locally")
-                # Keep local file if S3 upload fails
-        
+                result['upload_error'] = str(e)
+
         return result
 
     finally:
@@ -0,0 +1,288 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from psycopg2.extras import RealDictCursor
+
+from app.utils.db_utils import get_db_connection
+from app.config.database import DB_CONFIG
+from app.models.ppt_generation_model import generate_ppt_for_course
+
+PPT_JOB_WORKERS = int(os.getenv('PPT_JOB_WORKERS', 1))
+PPT_JOB_MAX_ATTEMPTS = int(os.getenv('PPT_JOB_MAX_ATTEMPTS', 3))
+PPT_JOB_RETRY_DELAY_SECONDS = int(os.getenv('PPT_JOB_RETRY_DELAY_SECONDS', 10))
+# Owned jobs touch updated_date this often; active jobs silent for longer
+# than PPT_JOB_STALE_SECONDS belonged to a worker that died (the heartbeat is
+# its own thread, so a slow build still beats)
+PPT_JOB_HEARTBEAT_SECONDS = int(os.getenv('PPT_JOB_HEARTBEAT_SECONDS', 30))
+PPT_JOB_STALE_SECONDS = int(os.getenv('PPT_JOB_STALE_SECONDS', 300))
+
+ACTIVE_STATUSES = ('queued', 'running', 'retrying')
+# Namespace for pg_advisory_xact_lock(namespace, course_id)
+_ENQUEUE_LOCK_NAMESPACE = 703815002
+
+# PPT builds run in a small per-worker pool instead of the approval request.
+# The queue is in memory: if the worker stops, its jobs stay active in the
+# table without a heartbeat, status reads report them as stale, and they are
+# only resumed when the course is enqueued again (e.g. approved again).
+_executor = ThreadPoolExecutor(max_workers=PPT_JOB_WORKERS, thread_name_prefix='ppt-job')
+
+_table_ready = False
+_table_lock = threading.Lock()
+
+# Jobs queued or running in this worker, kept alive by the heartbeat thread
+_owned_jobs = set()
+_owned_jobs_lock = threading.Lock()
+_heartbeat_pid = None
+
+
+def ensure_ppt_job_table(conn):
+    """
+    Ensure the course_ppt_job table exists (checked once per worker)
+    """
+    global _table_ready
+    if _table_ready:
+        return
+    with _table_lock:
+        if _table_ready:
+            return
+        with conn.cursor() as cursor:
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS lms.course_ppt_job
+            (
+                job_id SERIAL PRIMARY KEY,
+                course_id integer NOT NULL,
+                status character varying(20) NOT NULL,
+                attempts integer NOT NULL DEFAULT 0,
+                ppt_url text,
+                error text,
+                created_date timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                updated_date timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE INDEX IF NOT EXISTS course_ppt_job_course_idx
+                ON lms.course_ppt_job (course_id, job_id DESC);
+            -- At most one active job per course
+            CREATE UNIQUE INDEX IF NOT EXISTS course_ppt_job_active_idx
+                ON lms.course_ppt_job (course_id) WHERE status IN ('queued', 'running', 'retrying');
+            """)
+        conn.commit()
+        _table_ready = True
+
+
+# Job columns plus whether an active job has lost its worker
+JOB_SELECT = """
+    SELECT job_id, course_id, status, attempts, ppt_url, error, created_date, updated_date,
+        status IN ('queued', 'running', 'retrying')
+            AND updated_date < CURRENT_TIMESTAMP - make_interval(secs => %(stale_seconds)s) AS stale
+    FROM lms.course_ppt_job
+"""
+
+
+def get_latest_ppt_job(conn, course_id):
+    """
+    Get the most recent PPT job for a course (read-only; 'stale' is True for
+    an active job whose worker stopped, which the next enqueue resumes)
+    """
+    ensure_ppt_job_table(conn)
+    query = JOB_SELECT + """
+    WHERE course_id = %(course_id)s
+    ORDER BY job_id DESC
+    LIMIT 1
+    """
+    with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        cursor.execute(query, {'course_id': course_id, 'stale_seconds': PPT_JOB_STALE_SECONDS})
+        return cursor.fetchone()
+
+
+def update_ppt_job(conn, job_id, status, attempts=None, ppt_url=None, error=None):
+    """
+    Update the status of a PPT job. Returns False if the job was superseded
+    or finished in the meantime (its runner should stop).
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            UPDATE lms.course_ppt_job
+            SET status = %s,
+                attempts = COALESCE(%s, attempts),
+                ppt_url = COALESCE(%s, ppt_url),
+                error = %s,
+                updated_date = CURRENT_TIMESTAMP
+            WHERE job_id = %s AND status IN ('queued', 'running', 'retrying')
+            """,
+            (status, attempts, ppt_url, error, job_id)
+        )
+        updated = cursor.rowcount == 1
+    conn.commit()
+    return updated
+
+
+def enqueue_ppt_job(conn, course_id, force=False):
+    """
+    Queue a PPT build for a course and return the job row.
+    An active job for the course is reused, unless force=True: then it is
+    superseded and a new job rebuilds the deck even if the content is unchanged.
+    An active job whose worker died (no heartbeat for PPT_JOB_STALE_SECONDS)
+    is queued again in this worker; this is the only way lost work is resumed.
+    """
+    ensure_ppt_job_table(conn)
+
+    params = {'course_id': course_id, 'stale_seconds': PPT_JOB_STALE_SECONDS}
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            # Serializes concurrent approvals of the same course
+            cursor.execute("SELECT pg_advisory_xact_lock(%s, %s)", (_ENQUEUE_LOCK_NAMESPACE, course_id))
+            cursor.execute(
+                JOB_SELECT + "WHERE course_id = %(course_id)s AND status IN ('queued', 'running', 'retrying')",
+                params
+            )
+            active = cursor.fetchone()
+            if active and active['stale']:
+                cursor.execute(
+                    """
+                    UPDATE lms.course_ppt_job
+                    SET status = 'queued', error = 'Requeued: the previous worker stopped',
+                        updated_date = CURRENT_TIMESTAMP
+                    WHERE job_id = %(job_id)s
+                    """,
+                    {'job_id': active['job_id']}
+                )
+                cursor.execute(JOB_SELECT + "WHERE job_id = %(job_id)s", dict(params, job_id=active['job_id']))
+                job = cursor.fetchone()
+            elif active and not force:
+                conn.commit()
+                return active
+            else:
+                if active:
+                    cursor.execute(
+                        """
+                        UPDATE lms.course_ppt_job
+                        SET status = 'superseded', error = 'Superseded by a forced rebuild', updated_date = CURRENT_TIMESTAMP
+                        WHERE job_id = %(job_id)s
+                        """,
+                        {'job_id': active['job_id']}
+                    )
+                cursor.execute(
+                    """
+                    INSERT INTO lms.course_ppt_job (course_id, status)
+                    VALUES (%(course_id)s, 'queued')
+                    RETURNING job_id
+                    """,
+                    params
+                )
+                job_id = cursor.fetchone()['job_id']
+                cursor.execute(JOB_SELECT + "WHERE job_id = %(job_id)s", dict(params, job_id=job_id))
+                job = cursor.fetchone()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    _track_job(job['job_id'])
+    _executor.submit(run_ppt_job, job['job_id'], course_id, force)
+    return job
+
+
+def _track_job(job_id):
+    """
+    Register a job this worker owns (queued or running) with the heartbeat
+    """
+    global _heartbeat_pid
+    with _owned_jobs_lock:
+        _owned_jobs.add(job_id)
+        pid = os.getpid()
+        if _heartbeat_pid != pid:
+            thread = threading.Thread(target=_heartbeat_loop, name='ppt-job-heartbeat')
+            thread.daemon = True
+            thread.start()
+            _heartbeat_pid = pid
+
+
+def _untrack_job(job_id):
+    with _owned_jobs_lock:
+        _owned_jobs.discard(job_id)
+
+
+def _heartbeat_loop():
+    """
+    Touch updated_date of every job this worker owns, so live jobs (including
+    ones waiting in the pool) are never taken for abandoned ones
+    """
+    conn = None
+    while True:
+        time.sleep(PPT_JOB_HEARTBEAT_SECONDS)
+        with _owned_jobs_lock:
+            job_ids = list(_owned_jobs)
+        if not job_ids:
+            continue
+        try:
+            if conn is None or conn.closed:
+                conn = get_db_connection(DB_CONFIG)
+            if not conn:
+                continue
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    UPDATE lms.course_ppt_job SET updated_date = CURRENT_TIMESTAMP
+                    WHERE job_id = ANY(%s) AND status IN ('queued', 'running', 'retrying')
+                    """,
+                    (job_ids,)
+                )
+            conn.commit()
+        except Exception as e:
+            print(f"PPT job heartbeat failed: {str(e)}")
+            if conn:
+                conn.close()
+            conn = None
+
+
+def run_ppt_job(job_id, course_id, force=False):
+    """
+    Build and upload the course PPT, retrying with a linear backoff on failure
+    """
+    conn = None
+    try:
+        conn = get_db_connection(DB_CONFIG)
+        if not conn:
+            raise RuntimeError("Database connection failed")
+
+        for attempt in range(1, PPT_JOB_MAX_ATTEMPTS + 1):
+            if not update_ppt_job(conn, job_id, 'running', attempts=attempt):
+                print(f"PPT job {job_id} was superseded; stopping")
+                return
+            try:
+                result = generate_ppt_for_course(
+                    course_id=course_id,
+                    filename=None,  # Auto-generate filename
+                    template_path=None,  # Use default template
+                    max_slides=30,
+                    upload_to_cloud=True,
+                    force=force
+                )
+                if not result.get('cloud_url'):
+                    raise RuntimeError("PPT was generated but not uploaded to S3")
+
+                update_ppt_job(conn, job_id, 'completed', ppt_url=result['cloud_url'])
+                print(f"✅ PPT job {job_id} completed for course_id {course_id}")
+                return
+            except Exception as e:
+                print(f"❌ PPT job {job_id} attempt {attempt}/{PPT_JOB_MAX_ATTEMPTS} failed: {str(e)}")
+                if attempt >= PPT_JOB_MAX_ATTEMPTS:
+                    update_ppt_job(conn, job_id, 'failed', error=str(e))
+                    return
+                update_ppt_job(conn, job_id, 'retrying', error=str(e))
+                time.sleep(PPT_JOB_RETRY_DELAY_SECONDS * attempt)
+
+    except Exception as e:
+        print(f"❌ PPT job {job_id} could not be processed: {str(e)}")
+        if conn:
+            try:
+                conn.rollback()
+                update_ppt_job(conn, job_id, 'failed', error=str(e))
+            except Exception as db_error:
+                print(f"Failed to record PPT job failure: {str(db_error)}")
+    finally:
+        _untrack_job(job_id)
+        if conn:
+            conn.close()
@@ -1,83 +1,133 @@
-from app.utils.db_utils import get_db_connection
-from app.config.database import DB_CONFIG
+from psycopg2.extras import execute_values
+
+from app.models.analytics_page_model import fetch_analytics_page
+from app.utils.validation import parse_positive_int
 import uuid
 import json
 
-def create_qc_batch(qc_batch_name):
-    """
-    Create a new QC batch and return the qc_id
+def parse_qc_user_courses(user_courses):
     """
-    conn = get_db_connection(DB_CONFIG)
-    if not conn:
-        return None
-    
-    try:
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO lms.qcbatch(qc_batch_name) VALUES (%s) RETURNING qc_id",
-            (qc_batch_name,)
-        )
-        qc_id = cursor.fetchone()[0]
-        conn.commit()
-        return qc_id
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        cursor.close()
-        conn.close()
+    Validate the user_courses of a QC batch request before anything is written.
+    IDs and validity_days may be numbers or numeric strings; they are converted
+    to int so they compare with the integer columns.
 
-def update_user_qc_id(user_id, qc_id):
+    :return: (user_rows, course_rows, errors) where user_rows is [user_id] in
+        request order, course_rows is [(user_id, course_id, validity_days)] and
+        errors lists every malformed row (the request should be rejected if any)
     """
-    Update the qc_id for a specific user
-    """
-    conn = get_db_connection(DB_CONFIG)
-    if not conn:
-        return None
-    
-    try:
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE lms.users SET qc_id = %s WHERE user_id = %s RETURNING user_id",
-            (qc_id, user_id)
-        )
-        updated_user = cursor.fetchone()
-        conn.commit()
-        return updated_user[0] if updated_user else None
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        cursor.close()
-        conn.close()
+    errors = []
+    user_rows = []
+    course_rows = []
+    if not isinstance(user_courses, list):
+        return user_rows, course_rows, ['user_courses must be a list']
+    for index, user_data in enumerate(user_courses):
+        if not isinstance(user_data, dict):
+            errors.append(f"user_courses[{index}] must be an object")
+            continue
+        user_id = parse_positive_int(user_data.get('user_id'))
+        courses = user_data.get('courses')
+        if not user_id or not isinstance(courses, list) or not courses:
+            errors.append(f"Invalid data for user: {user_data.get('user_id')}")
+            continue
+        user_rows.append(user_id)
+        for course in courses:
+            course_id = parse_positive_int(course.get('course_id')) if isinstance(course, dict) else None
+            validity_days = parse_positive_int(course.get('validity_days')) if isinstance(course, dict) else None
+            if not course_id or not validity_days:
+                errors.append(f"Invalid course data for user {user_id}: course_id and validity_days must be positive integers")
+                continue
+            course_rows.append((user_id, course_id, validity_days))
+    return user_rows, course_rows, errors
+
 
-def create_qc_user_course(qc_id, user_id, course_id, validity):
+def create_qc_batch_bulk(conn, qc_batch_name, user_rows, course_rows, atomic=False):
     """
-    Create a new QC user course association
+    Create a QC batch, assign its users and create their course associations
+    in one transaction with set-based statements. Takes the rows returned by
+    parse_qc_user_courses.
+
+    Unknown users or courses are reported in ``errors``. With ``atomic=True``
+    any such error rolls back the whole batch; otherwise the valid rows are committed.
+
+    :return: Dictionary with 'qc_id' (None if rolled back), 'results', 'errors' and 'committed'
     """
-    conn = get_db_connection(DB_CONFIG)
-    if not conn:
-        return None
-    
+    errors = []
     try:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO lms.qc_user_course(qc_id, user_id, course_id, validity) 
-            VALUES (%s, %s, %s, %s) 
-            RETURNING qcuc_id
-            """,
-            (qc_id, user_id, course_id, validity)
-        )
-        qcuc_id = cursor.fetchone()[0]
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO lms.qcbatch(qc_batch_name) VALUES (%s) RETURNING qc_id",
+                (qc_batch_name,)
+            )
+            qc_id = cursor.fetchone()[0]
+
+            updated_users = set()
+            if user_rows:
+                updated = execute_values(
+                    cursor,
+                    """
+                    UPDATE lms.users AS u SET qc_id = v.qc_id
+                    FROM (VALUES %s) AS v(user_id, qc_id)
+                    WHERE u.user_id = v.user_id
+                    RETURNING u.user_id
+                    """,
+                    [(user_id, qc_id) for user_id in user_rows],
+                    fetch=True
+                )
+                updated_users = {row[0] for row in updated}
+            for user_id in user_rows:
+                if user_id not in updated_users:
+                    errors.append(f"Failed to update QC ID for user: {user_id}")
+
+            # Unknown courses would fail the whole INSERT; report them per row instead
+            course_ids = list({row[1] for row in course_rows})
+            known_courses = set()
+            if course_ids:
+                cursor.execute("SELECT course_id FROM lms.course_master WHERE course_id = ANY(%s)", (course_ids,))
+                known_courses = {row[0] for row in cursor.fetchall()}
+
+            insert_rows = []
+            for user_id, course_id, validity_days in course_rows:
+                if user_id not in updated_users:
+                    continue
+                if course_id not in known_courses:
+                    errors.append(f"Failed to create course association for user {user_id} and course {course_id}")
+                    continue
+                insert_rows.append((qc_id, user_id, course_id, validity_days))
+
+            if atomic and errors:
+                conn.rollback()
+                return {'qc_id': None, 'results': [], 'errors': errors, 'committed': False}
+
+            created = []
+            if insert_rows:
+                created = execute_values(
+                    cursor,
+                    """
+                    INSERT INTO lms.qc_user_course(qc_id, user_id, course_id, validity)
+                    VALUES %s
+                    RETURNING qcuc_id, user_id, course_id, validity
+                    """,
+                    insert_rows,
+                    fetch=True
+                )
         conn.commit()
-        return qcuc_id
-    except Exception as e:
+    except Exception:
         conn.rollback()
-        raise e
-    finally:
-        cursor.close()
-        conn.close()
+        raise
+
+    courses_by_user = {}
+    for qcuc_id, user_id, course_id, validity in created:
+        courses_by_user.setdefault(user_id, []).append({
+            'course_id': course_id,
+            'validity_days': validity,
+            'qcuc_id': qcuc_id
+        })
+    results = [
+        {'user_id': user_id, 'courses': courses_by_user.get(user_id, [])}
+        for user_id in user_rows
+        if user_id in updated_users
+    ]
+    return {'qc_id': qc_id, 'results': results, 'errors': errors, 'committed': True}
 
 def get_qc_batch_analytics(conn):
     """
@@ -172,14 +222,8 @@ def extend_course_validity(conn, user_id, course_id, new_validity):
         conn.rollback()
         raise e
 
-def get_detailed_qc_analytics(conn):
-    """
-    Get detailed analytics data for all QC batches including user course progress
-    """
-    try:
-        cursor = conn.cursor()
-        cursor.execute("""
-            WITH user_course_data AS (
+# One row per (user, QC course) with the columns the QC analytics aggregate over
+QC_ANALYTICS_ROWS_QUERY = """
     SELECT 
         u.user_id,
         u.username,
@@ -216,6 +260,25 @@ def get_detailed_qc_analytics(conn):
         lms.user_certicate_enrollment AS ce ON ce.certificate_id = cert_m.certificate_id AND ce.user_id = u.user_id
     WHERE 
         cm.course_id IS NOT NULL
+"""
+
+
+def get_qc_analytics_page(conn, page):
+    """
+    One keyset-paginated, filtered page of QC batch analytics
+    """
+    return fetch_analytics_page(conn, QC_ANALYTICS_ROWS_QUERY, 'qc_id', page)
+
+
+def get_detailed_qc_analytics(conn):
+    """
+    Get detailed analytics data for all QC batches including user course progress
+    """
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            WITH user_course_data AS (
+{QC_ANALYTICS_ROWS_QUERY}
 ),
 user_courses AS (
     SELECT
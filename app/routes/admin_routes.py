@@ -1,16 +1,33 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, Response
 from app.models.course_master_model import get_batch_analytics_data
+from app.models.batch_analytics_model import get_batch_analytics_snapshot, get_batch_analytics_page, get_batch_analytics_source, start_batch_analytics_refresher
+from app.models.analytics_page_model import iter_analytics_rows, ANALYTICS_EXPORT_COLUMNS
+from app.utils.pagination import wants_analytics_page, parse_analytics_page_args, parse_analytics_filters
+from app.utils.export_utils import EXPORT_FORMATS, streaming_export_response, json_passthrough_response, csv_row_chunks
 from app.utils.db_utils import get_db_connection
 from app.config.database import DB_CONFIG
 from app.models.user_model import find_admin_by_email, get_all_users
-from app.models.batch_model import create_login_key
-import csv
-import io
+from app.models.batch_model import create_login_keys_bulk
 
 admin_bp = Blueprint('admin', __name__)
 
 @admin_bp.route('/api/admin/batch-analytics', methods=['GET'])
 def get_batch_analytics():
+    """
+    Batch analytics. Without query parameters the full document is returned;
+    with cursor/limit/page_by/summary or batch_id/course_id/completion_status
+    filters a single keyset-paginated page is returned instead.
+    """
+    page = None
+    if wants_analytics_page(request.args):
+        try:
+            page = parse_analytics_page_args(request.args)
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+
     try:
         # Verify admin token
         conn = get_db_connection(DB_CONFIG)
@@ -20,7 +37,24 @@ def get_batch_analytics():
                 'message': 'Failed to connect to database'
             }), 500
             
-        analytics_data = get_batch_analytics_data(conn)
+        start_batch_analytics_refresher()
+        if page is not None:
+            return jsonify({
+                'status': 'success',
+                'data': get_batch_analytics_page(conn, page)
+            }), 200
+
+        # Read the materialized snapshot; fall back to the live query if it is unavailable
+        try:
+            snapshot_json = get_batch_analytics_snapshot(conn)
+            if snapshot_json is not None:
+                # Pre-serialized by Postgres; splice it into the envelope as-is
+                return json_passthrough_response(snapshot_json)
+            analytics_data = None
+        except Exception as snapshot_error:
+            print(f"Batch analytics snapshot unavailable, using live query: {str(snapshot_error)}")
+            conn.rollback()
+            analytics_data = get_batch_analytics_data(conn)
         
         if analytics_data is None:
             return jsonify({
@@ -42,6 +76,40 @@ def get_batch_analytics():
         if 'conn' in locals():
             conn.close()
 
+@admin_bp.route('/api/admin/batch-analytics/export', methods=['GET'])
+def export_batch_analytics():
+    """
+    Stream batch analytics as one row per (user, course) in NDJSON (default) or CSV.
+    Accepts the batch_id / course_id / completion_status filters.
+    """
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({
+            'status': 'error',
+            'message': f"format must be one of: {', '.join(EXPORT_FORMATS)}"
+        }), 400
+    try:
+        filters = parse_analytics_filters(request.args)
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+    conn = get_db_connection(DB_CONFIG)
+    if conn is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Failed to connect to database'
+        }), 500
+
+    # The response generator owns the connection from here on
+    source_sql = get_batch_analytics_source(conn)
+    rows = iter_analytics_rows(conn, source_sql, 'batch_id', filters)
+    return streaming_export_response(
+        conn, rows, ('batch_id',) + ANALYTICS_EXPORT_COLUMNS, export_format, 'batch_analytics'
+    )
+
 @admin_bp.route('/api/admin/generate-user-keys', methods=['POST'])
 def generate_user_keys():
     try:
@@ -61,24 +129,23 @@ def generate_user_keys():
                 'message': 'Number of users must be a positive integer'
             }), 400
 
-        # Generate keys
-        generated_keys = []
-        for _ in range(num_users):
-            key_id = create_login_key(batch_id)
-            if key_id:
-                generated_keys.append([key_id])
-
-        # Create CSV in memory
-        si = io.StringIO()
-        writer = csv.writer(si)
-        writer.writerow(['Key ID'])  # Header
-        writer.writerows(generated_keys)
-        
-        # Create the response
-        output = io.BytesIO()
-        output.write(si.getvalue().encode())
-        output.seek(0)
-        
+        # Generate all keys with one COPY in a single transaction
+        codes = create_login_keys_bulk(batch_id, num_users)
+        if codes is None:
+            return jsonify({
+                'status': 'error',
+                'message': 'Failed to connect to database'
+            }), 500
+
+        # ?format=csv streams the keys as a CSV download instead of JSON
+        if request.args.get('format') == 'csv':
+            return Response(
+                csv_row_chunks(([code] for code in codes), header=['Key ID']),
+                mimetype='text/csv',
+                headers={'Content-Disposition': 'attachment; filename=generated_keys.csv'}
+            )
+
+        generated_keys = [[code] for code in codes]
         return jsonify({
             'status': 'success',
             'message': f'Successfully generated {len(generated_keys)} keys',
@@ -3,6 +3,8 @@ import google.generativeai as genai
 import os
 from dotenv import load_dotenv
 import json
+from app.config.ff_config import AI_REQUEST_COALESCING
+from app.utils.single_flight import StreamCoalescer, normalize_question
 
 load_dotenv()
 
@@ -11,6 +13,12 @@ ai_bp = Blueprint('ai', __name__)
 # Configure Gemini
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
+# Identical concurrent questions share one upstream Gemini stream
+ask_coalescer = StreamCoalescer(
+    'ai-ask',
+    enabled=AI_REQUEST_COALESCING
+)
+
 
 def stream_gemini_text_response(response):
     try:
@@ -38,21 +46,25 @@ def ask_companian():
         # Combine system prompt and user question
         prompt = f"{system_prompt}\n\nStudent's question: {question}"
 
-        generation_config = genai.types.GenerationConfig(
-            temperature=0.7,
-            top_p=0.9,
-            top_k=40,
-            max_output_tokens=2048,
-        )
+        def start_generation(info):
+            generation_config = genai.types.GenerationConfig(
+                temperature=0.7,
+                top_p=0.9,
+                top_k=40,
+                max_output_tokens=2048,
+            )
 
-        model = genai.GenerativeModel('gemini-2.5-flash-lite')
-        response = model.generate_content(
-            prompt,
-            generation_config=generation_config,
-            stream=True
-        )
+            model = genai.GenerativeModel('gemini-2.5-flash-lite')
+            response = model.generate_content(
+                prompt,
+                generation_config=generation_config,
+                stream=True
+            )
+            return stream_gemini_text_response(response)
+
+        response_stream, _, _ = ask_coalescer.subscribe(normalize_question(question), start_generation)
 
-        return Response(stream_gemini_text_response(response), mimetype='text/plain')
+        return Response(response_stream, mimetype='text/plain')
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify, request
 from app.utils.db_utils import get_db_connection
 from app.models.assessment_submission_model import submit_assessment_and_enroll_certificate
 from app.config.database import DB_CONFIG
+from app.models.batch_analytics_model import request_batch_analytics_refresh
 
 assessment_submission_bp = Blueprint('assessment_submission', __name__)
 
@@ -24,6 +25,7 @@ def submit_assessment():
         success = submit_assessment_and_enroll_certificate(conn, user_id, course_id, answers)
         
         if success:
+            request_batch_analytics_refresh()
             return jsonify({
                 'success': True,
                 'message': 'Assessment submitted and certificate enrolled successfully'
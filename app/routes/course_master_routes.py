@@ -2,6 +2,8 @@ from flask import Blueprint, jsonify, request
 from app.utils.db_utils import get_db_connection
 from app.config.database import DB_CONFIG
 from app.models.course_master_model import get_courses, find_course_by_id, enroll_user_in_course, get_user_courses_with_validity
+from app.models.batch_analytics_model import request_batch_analytics_refresh
+from app.models.job_recommendation_model import request_job_recommendation_refresh
 from psycopg2.extras import RealDictCursor
 
 course_bp = Blueprint('course', __name__)
@@ -111,6 +113,8 @@ def enroll_user():
     try:
         enrollment = enroll_user_in_course(conn, user_id, course_id)
         if enrollment:
+            request_batch_analytics_refresh()
+            request_job_recommendation_refresh(user_id)
             return jsonify({'message': 'User enrolled successfully', 'enrollment': enrollment}), 200
         else:
             return jsonify({'error': 'Enrollment failed'}), 500
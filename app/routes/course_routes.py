@@ -1,8 +1,11 @@
 from flask import Blueprint, request, jsonify
 import pandas as pd
+import os
+import tempfile
 from io import BytesIO
 from app.utils.db_utils import get_db_connection
-from app.models.course_model import create_course, create_course_enrollment, create_course_content
+from app.models.course_model import create_course, create_course_enrollment, import_course_content
+from app.models.course_content_import_model import get_import_task, start_course_content_import
 from app.config.database import DB_CONFIG
 
 course_bp = Blueprint('course_management', __name__)
@@ -86,16 +89,7 @@ def upload_course_content():
         if missing_columns:
             return jsonify({'error': f'Missing required columns: {missing_columns}'}), 400
 
-        # Handle empty cells and convert to string where needed
-        df = df.fillna('')
-        for col in df.columns:
-            if col not in ['course_id', 'course_mastertitle_breakdown_id', 'course_subtitle_id']:
-                df[col] = df[col].astype(str).str.strip()
-
-        # Convert DataFrame to list of dictionaries
-        course_contents = df.to_dict('records')
-        
-        if not course_contents:
+        if df.empty:
             return jsonify({'error': 'Excel file is empty'}), 400
 
         conn = get_db_connection(DB_CONFIG)
@@ -103,7 +97,8 @@ def upload_course_content():
             return jsonify({'error': 'Database connection failed'}), 500
 
         try:
-            result = create_course_content(conn, course_contents)
+            # Vectorized validation, then one COPY + merge; invalid rows come back in 'errors'
+            result = import_course_content(conn, df)
             return jsonify({
                 'message': 'Course content uploaded successfully',
                 'details': result
@@ -119,3 +114,72 @@ def upload_course_content():
             
     except Exception as e:
         return jsonify({'error': f'Error processing Excel file: {str(e)}'}), 400
+
+
+@course_bp.route('/api/courseContent/upload-stream', methods=['POST'])
+def upload_course_content_stream():
+    """
+    Import a large .xlsx or .csv upload in the background, in fixed-size chunks.
+    The upload is spooled to disk instead of memory; poll upload-status for progress.
+    """
+    if 'file' not in request.files:
+        return jsonify({'error': 'No file provided'}), 400
+
+    file = request.files['file']
+    filename = file.filename.lower()
+    if filename.endswith('.xlsx'):
+        file_format = 'xlsx'
+    elif filename.endswith('.csv'):
+        file_format = 'csv'
+    else:
+        return jsonify({'error': 'Invalid file format. Streaming import supports .xlsx and .csv files'}), 400
+
+    fd, path = tempfile.mkstemp(prefix='course_content_', suffix=f'.{file_format}')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            file.save(fh)
+    except Exception as e:
+        os.remove(path)
+        return jsonify({'error': f'Error saving upload: {str(e)}'}), 400
+
+    conn = get_db_connection(DB_CONFIG)
+    if not conn:
+        os.remove(path)
+        return jsonify({'error': 'Database connection failed'}), 500
+
+    try:
+        # The background task removes the spooled file when it finishes
+        task_id = start_course_content_import(conn, path, file_format)
+    except Exception as e:
+        conn.rollback()
+        os.remove(path)
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+    finally:
+        conn.close()
+    return jsonify({
+        'message': 'Course content import started',
+        'task_id': task_id,
+        'status_url': f'/api/courseContent/upload-status/{task_id}'
+    }), 202
+
+
+@course_bp.route('/api/courseContent/upload-status/<task_id>', methods=['GET'])
+def course_content_upload_status(task_id):
+    """
+    Progress of a streaming import. Served from the database, so the poll may
+    land on any worker; tasks expire after COURSE_CONTENT_IMPORT_TASK_TTL_SECONDS.
+    """
+    conn = get_db_connection(DB_CONFIG)
+    if not conn:
+        return jsonify({'error': 'Database connection failed'}), 500
+
+    try:
+        task = get_import_task(conn, task_id)
+    except Exception as e:
+        conn.rollback()
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+    finally:
+        conn.close()
+    if not task:
+        return jsonify({'error': 'Task not found'}), 404
+    return jsonify(task)
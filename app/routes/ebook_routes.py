@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify
 from app.utils.db_utils import get_db_connection
 from app.config.database import DB_CONFIG
 from app.models.ebook_model import get_ebook_details
+from app.utils.s3_utils import presign_url
 
 ebook_bp = Blueprint('ebook', __name__)
 
@@ -14,6 +15,9 @@ def fetch_ebook_details():
     try:
         ebooks = get_ebook_details(conn)
         if ebooks:
+            # Serve S3-hosted eBooks through short-lived presigned URLs
+            for ebook in ebooks:
+                ebook['e_book_object_url'], ebook['e_book_url_expires_at'] = presign_url(ebook['e_book_object_url'])
             return jsonify({'ebooks': ebooks}), 200
         else:
             return jsonify({'message': 'No eBooks found'}), 404
@@ -5,6 +5,9 @@ Strictly uses only book knowledge - returns "not in knowledge" for unrelated que
 """
 
 import os
+import re
+import math
+import time
 import pinecone
 import threading
 import requests
@@ -20,8 +23,20 @@ from app.config.ff_config import (
     SIMILARITY_THRESHOLD,
     TOP_K,
     SYSTEM_PROMPT,
+    CHUNK_SIZE,
+    CHUNK_OVERLAP,
+    BATCH_SIZE,
+    HYBRID_RETRIEVAL,
+    LEXICAL_INDEX_PATH,
+    RRF_K,
+    CONTEXT_TOKEN_BUDGET,
+    CHARS_PER_TOKEN,
+    WARMUP_ON_START,
+    AI_REQUEST_COALESCING,
     validate_config
 )
+from app.utils.lexical_index import LexicalIndex, chunk_key, reciprocal_rank_fusion
+from app.utils.single_flight import StreamCoalescer, normalize_question
 
 # Import Google Gen AI client for embeddings
 # Use google.generativeai (same as ai_route.py) for consistency
@@ -100,6 +115,145 @@ def init_pinecone():
     return index
 
 
+# Lazily loaded BM25 side index over the same chunks stored in Pinecone.
+# Every worker loads its own copy from LEXICAL_INDEX_PATH (built by ingest_book
+# or build_lexical_index.py) and reloads it when the file's mtime changes, so
+# all workers must read the same path (same host or a shared volume).
+_lexical_index = None
+_lexical_index_mtime = None
+_lexical_index_lock = threading.Lock()
+
+
+def _lexical_index_file_mtime():
+    try:
+        return os.path.getmtime(LEXICAL_INDEX_PATH)
+    except OSError:
+        return None
+
+
+def get_lexical_index():
+    """Get the local lexical index, (re)loading it when the file on disk changes."""
+    global _lexical_index, _lexical_index_mtime
+    mtime = _lexical_index_file_mtime()
+    if _lexical_index is None or mtime != _lexical_index_mtime:
+        with _lexical_index_lock:
+            if _lexical_index is None or mtime != _lexical_index_mtime:
+                try:
+                    _lexical_index = LexicalIndex.load(LEXICAL_INDEX_PATH)
+                except Exception as e:
+                    print(f"Warning: Failed to load lexical index, starting empty: {str(e)}")
+                    _lexical_index = LexicalIndex()
+                _lexical_index_mtime = mtime
+    return _lexical_index
+
+
+def save_lexical_index(lexical_index):
+    """Persist the index and record its mtime so this worker does not reload it."""
+    global _lexical_index_mtime
+    with _lexical_index_lock:
+        lexical_index.save(LEXICAL_INDEX_PATH)
+        _lexical_index_mtime = _lexical_index_file_mtime()
+
+
+def split_text(text, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP):
+    """
+    Split text into overlapping windows.
+
+    Returns:
+        List of tuples (start, end, chunk_text) with character offsets
+    """
+    if not text:
+        return []
+    step = max(1, chunk_size - chunk_overlap)
+    windows = []
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + chunk_size)
+        # Prefer to break on whitespace so words are not cut in half
+        if end < len(text):
+            space = text.rfind(" ", start + step, end)
+            if space != -1:
+                end = space
+        chunk = text[start:end].strip()
+        if chunk:
+            windows.append((start, end, chunk))
+        if end >= len(text):
+            break
+        next_start = end - chunk_overlap
+        space = text.find(" ", next_start, end)
+        if space != -1:
+            next_start = space + 1
+        start = max(start + 1, next_start)
+    return windows
+
+
+def ingest_book(index, source, text):
+    """
+    Chunk a book, upsert its embeddings into Pinecone and add the chunks
+    to the lexical index.
+
+    Args:
+        index: Pinecone Index object
+        source: Book name stored as the chunk source
+        text: Full book text
+
+    Returns:
+        Number of chunks ingested
+    """
+    windows = split_text(text)
+    lexical_index = get_lexical_index()
+
+    for batch_start in range(0, len(windows), BATCH_SIZE):
+        batch = windows[batch_start:batch_start + BATCH_SIZE]
+        vectors = embed_texts_genai([chunk for _, _, chunk in batch])
+
+        records = []
+        lexical_chunks = []
+        for offset, ((start, end, chunk), vector) in enumerate(zip(batch, vectors)):
+            chunk_number = batch_start + offset
+            metadata = {
+                "source": source,
+                "chunk_id": f"chunk_{chunk_number}",
+                "text": chunk,
+                "start": start,
+                "end": end,
+            }
+            records.append({"id": f"{source}-{chunk_number}", "values": vector, "metadata": metadata})
+            lexical_chunks.append((chunk_key(metadata), chunk, metadata))
+
+        index.upsert(vectors=records)
+        lexical_index.add_many(lexical_chunks)
+
+    save_lexical_index(lexical_index)
+    return len(windows)
+
+
+def backfill_lexical_index(index, batch_size=100):
+    """
+    Build the lexical index from chunks that are already stored in Pinecone.
+    Requires the serverless Pinecone SDK (``index.list``).
+
+    Returns:
+        Number of chunks newly added to the lexical index
+    """
+    lexical_index = get_lexical_index()
+    added = 0
+    for ids in index.list(limit=batch_size):
+        res = index.fetch(ids=list(ids))
+        vectors = res.vectors if hasattr(res, 'vectors') else res.get("vectors", {})
+        chunks = []
+        for vector in vectors.values():
+            meta = vector.metadata if hasattr(vector, 'metadata') else vector.get("metadata", {})
+            meta = dict(meta or {})
+            text = meta.get("text") or meta.get("page_content", "")
+            if text:
+                chunks.append((chunk_key(meta), text, meta))
+        added += lexical_index.add_many(chunks)
+
+    save_lexical_index(lexical_index)
+    return added
+
+
 def embed_texts_genai(texts):
     """
     Create embeddings using Google Gen AI.
@@ -284,6 +438,33 @@ def embed_texts_genai(texts):
 def retrieve_relevant_chunks(index, query_text, top_k=TOP_K):
     """
     Retrieve relevant chunks from Pinecone based on query.
+    When hybrid retrieval is enabled, results are fused with BM25 hits from
+    the local lexical index using reciprocal-rank fusion.
+    
+    Args:
+        index: Pinecone Index object
+        query_text: User's question
+        top_k: Number of top results to retrieve
+        
+    Returns:
+        List of tuples (metadata, score, text)
+    """
+    vector_chunks = retrieve_vector_chunks(index, query_text, top_k)
+
+    if not HYBRID_RETRIEVAL:
+        return vector_chunks
+
+    lexical_index = get_lexical_index()
+    if len(lexical_index) == 0:
+        return vector_chunks
+
+    lexical_chunks = lexical_index.search(query_text, top_k=top_k)
+    return reciprocal_rank_fusion(vector_chunks, lexical_chunks, k=RRF_K, top_k=top_k)
+
+
+def retrieve_vector_chunks(index, query_text, top_k=TOP_K):
+    """
+    Retrieve relevant chunks from Pinecone by embedding similarity.
     
     Args:
         index: Pinecone Index object
@@ -345,7 +526,142 @@ def retrieve_relevant_chunks(index, query_text, top_k=TOP_K):
     return retrieved_chunks
 
 
-def generate_answer_strict(question, retrieved_chunks, stream=False):
+_SENTENCE_END_RE = re.compile(r'[.!?]["\')\]]?(?=\s|$)')
+_MIN_OVERLAP_CHARS = 20
+
+
+def estimate_tokens(text):
+    """Approximate the token count of text for prompt budgeting."""
+    if not text:
+        return 0
+    return int(math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+def _trim_to_sentence(text, max_chars):
+    """Cut text to at most max_chars, ending on a sentence boundary ("" if none fits)."""
+    if len(text) <= max_chars:
+        return text
+    if max_chars <= 0:
+        return ""
+    window = text[:max_chars + 1]
+    ends = [m.end() for m in _SENTENCE_END_RE.finditer(window) if m.end() <= max_chars]
+    return window[:ends[-1]].rstrip() if ends else ""
+
+
+def _remove_window_overlap(kept_text, chunk_text):
+    """
+    Strip the part of chunk_text that overlaps kept_text. Neighbouring chunks
+    of the same source share up to CHUNK_OVERLAP characters.
+
+    Returns:
+        The non-overlapping remainder, or "" if chunk_text is fully contained
+    """
+    if chunk_text in kept_text:
+        return ""
+    max_k = min(len(kept_text), len(chunk_text), 2 * CHUNK_OVERLAP)
+    for k in range(max_k, _MIN_OVERLAP_CHARS - 1, -1):
+        # chunk follows kept: its head repeats kept's tail
+        if kept_text.endswith(chunk_text[:k]):
+            return chunk_text[k:].lstrip()
+        # chunk precedes kept: its tail repeats kept's head
+        if kept_text.startswith(chunk_text[-k:]):
+            return chunk_text[:-k].rstrip()
+    return chunk_text
+
+
+def build_context(retrieved_chunks, token_budget=CONTEXT_TOKEN_BUDGET):
+    """
+    Assemble the prompt context from retrieved chunks within a token budget.
+
+    Chunks below SIMILARITY_THRESHOLD are dropped (the best chunk and exact-term
+    lexical hits are always considered), overlapping windows from the same
+    source are de-duplicated, and the last chunk that does not fit is trimmed
+    at a sentence boundary.
+
+    Args:
+        retrieved_chunks: List of (metadata, score, text) tuples, best first
+        token_budget: Maximum number of context tokens
+
+    Returns:
+        Tuple (context string, stats dict)
+    """
+    stats = {
+        "token_budget": token_budget,
+        "context_tokens": 0,
+        "chunks_retrieved": len(retrieved_chunks),
+        "chunks_used": 0,
+        "chunks_below_threshold": 0,
+        "chunks_deduplicated": 0,
+        "chunks_trimmed": 0,
+    }
+    best_score = max((c[1] for c in retrieved_chunks), default=0.0)
+    kept_by_source = {}
+    context_parts = []
+    remaining = token_budget
+
+    for meta, score, text in retrieved_chunks:
+        # Extract text - try multiple sources
+        if isinstance(meta, dict):
+            chunk_text = meta.get("text") or meta.get("page_content") or text
+            source = meta.get("source", "Unknown")
+            chunk_id = meta.get("chunk_id", "Unknown")
+            lexical_hit = bool(meta.get("lexical_rank"))
+        else:
+            chunk_text = text or getattr(meta, "text", None) or getattr(meta, "page_content", "")
+            source = getattr(meta, "source", "Unknown")
+            chunk_id = getattr(meta, "chunk_id", "Unknown")
+            lexical_hit = False
+
+        # Use text parameter if chunk_text is empty
+        if not chunk_text:
+            chunk_text = text
+        if not chunk_text:
+            continue
+
+        if score < SIMILARITY_THRESHOLD and score < best_score and not lexical_hit:
+            stats["chunks_below_threshold"] += 1
+            continue
+
+        chunk_text = chunk_text.strip()
+        for kept_text in kept_by_source.get(source, []):
+            chunk_text = _remove_window_overlap(kept_text, chunk_text)
+            if not chunk_text:
+                break
+        if not chunk_text:
+            stats["chunks_deduplicated"] += 1
+            continue
+
+        header = f"---\nSource: {source} | {chunk_id} | Similarity Score: {score:.3f}\n\n"
+        header_tokens = estimate_tokens(header)
+        chunk_tokens = estimate_tokens(chunk_text)
+
+        if header_tokens + chunk_tokens > remaining:
+            max_chars = int((remaining - header_tokens) * CHARS_PER_TOKEN)
+            chunk_text = _trim_to_sentence(chunk_text, max_chars)
+            if not chunk_text:
+                break
+            chunk_tokens = estimate_tokens(chunk_text)
+            stats["chunks_trimmed"] += 1
+
+        context_parts.append(f"{header}{chunk_text}\n")
+        kept_by_source.setdefault(source, []).append(chunk_text)
+        remaining -= header_tokens + chunk_tokens
+        stats["chunks_used"] += 1
+        if remaining <= 0:
+            break
+
+    context = "\n".join(context_parts)
+    stats["context_tokens"] = estimate_tokens(context)
+    print(
+        f"Debug: Context assembled with {stats['context_tokens']}/{token_budget} tokens from "
+        f"{stats['chunks_used']}/{stats['chunks_retrieved']} chunks "
+        f"(below threshold: {stats['chunks_below_threshold']}, deduplicated: {stats['chunks_deduplicated']}, "
+        f"trimmed: {stats['chunks_trimmed']})"
+    )
+    return context, stats
+
+
+def generate_answer_strict(question, retrieved_chunks, stream=False, context=None):
     """
     Generate answer using only retrieved book chunks.
     Returns "not in knowledge" if question is unrelated.
@@ -354,6 +670,7 @@ def generate_answer_strict(question, retrieved_chunks, stream=False):
         question: User's question
         retrieved_chunks: List of (metadata, score, text) tuples
         stream: If True, yields chunks instead of returning full answer
+        context: Optional context already assembled with build_context
         
     Returns:
         Answer string (if stream=False) or generator (if stream=True)
@@ -367,7 +684,10 @@ def generate_answer_strict(question, retrieved_chunks, stream=False):
     
     # Check if best match meets similarity threshold
     # Note: Pinecone cosine similarity scores range from 0 to 1, where 1 is most similar
-    best_score = retrieved_chunks[0][1] if retrieved_chunks else 0.0
+    # Fused results are ordered by RRF, so take the best vector score across all chunks
+    best_score = max(c[1] for c in retrieved_chunks)
+    # Exact-term (BM25) hits are kept even when the embedding similarity is low
+    has_lexical_hit = any(isinstance(c[0], dict) and c[0].get("lexical_rank") for c in retrieved_chunks)
     
     # Debug: print top scores for troubleshooting
     print(f"Debug: Retrieved {len(retrieved_chunks)} chunks, top scores: {[f'{c[1]:.3f}' for c in retrieved_chunks[:3]]}")
@@ -376,35 +696,21 @@ def generate_answer_strict(question, retrieved_chunks, stream=False):
         print(f"Debug: Best score {best_score:.3f} below threshold {SIMILARITY_THRESHOLD}, but proceeding with retrieved chunks anyway")
         # Don't return immediately - let's try with lower threshold
         # Only return if score is really low (< 0.3)
-        if best_score < 0.3:
+        if best_score < 0.3 and not has_lexical_hit:
             if stream:
                 yield "I don't know — that information is not in my knowledge (the books)."
                 return
             return "I don't know — that information is not in my knowledge (the books)."
     
-    # Build context from retrieved chunks
-    context_parts = []
-    for meta, score, text in retrieved_chunks:
-        # Extract text - try multiple sources
-        if isinstance(meta, dict):
-            chunk_text = meta.get("text") or meta.get("page_content") or text
-            source = meta.get("source", "Unknown")
-            chunk_id = meta.get("chunk_id", "Unknown")
-        else:
-            chunk_text = text or getattr(meta, "text", None) or getattr(meta, "page_content", "")
-            source = getattr(meta, "source", "Unknown")
-            chunk_id = getattr(meta, "chunk_id", "Unknown")
-        
-        # Use text parameter if chunk_text is empty
-        if not chunk_text:
-            chunk_text = text
-        
-        if chunk_text:  # Only add if we have text
-            context_parts.append(
-                f"---\nSource: {source} | {chunk_id} | Similarity Score: {score:.3f}\n\n{chunk_text}\n"
-            )
-    
-    context = "\n".join(context_parts[:TOP_K])
+    # Build context from retrieved chunks within the token budget
+    if context is None:
+        context, _ = build_context(retrieved_chunks)
+
+    if not context:
+        if stream:
+            yield "I don't know — that information is not in my knowledge (the books)."
+            return
+        return "I don't know — that information is not in my knowledge (the books)."
     
     # Build prompt with strict instructions
     prompt = (
@@ -528,7 +834,7 @@ def generate_answer_strict(question, retrieved_chunks, stream=False):
                 raise Exception(f"Failed to generate answer: {str(e)}")
 
 
-def ask_question(question, index=None, stream=False):
+def ask_question(question, index=None, stream=False, stats=None):
     """
     Main function to ask a question and get an answer.
     
@@ -536,6 +842,7 @@ def ask_question(question, index=None, stream=False):
         question: User's question
         index: Optional Pinecone Index object (will initialize if not provided)
         stream: If True, returns a generator for streaming response
+        stats: Optional dict that is filled with the context assembly stats
         
     Returns:
         Answer string (if stream=False) or generator (if stream=True)
@@ -545,12 +852,17 @@ def ask_question(question, index=None, stream=False):
     
     # Retrieve relevant chunks
     retrieved_chunks = retrieve_relevant_chunks(index, question)
+
+    # Assemble the token-budgeted context up front so its size can be reported
+    context, context_stats = build_context(retrieved_chunks)
+    if stats is not None:
+        stats.update(context_stats)
     
     # Generate answer (with or without streaming)
     if stream:
-        return generate_answer_strict(question, retrieved_chunks, stream=True)
+        return generate_answer_strict(question, retrieved_chunks, stream=True, context=context)
     else:
-        answer = generate_answer_strict(question, retrieved_chunks, stream=False)
+        answer = generate_answer_strict(question, retrieved_chunks, stream=False, context=context)
         return answer
 
 
@@ -606,6 +918,60 @@ def get_pinecone_index():
     return _pinecone_index
 
 
+# Warm-up state reported by the readiness endpoint
+_warmup_state = {
+    'status': 'pending',  # pending -> warming -> ready | failed
+    'error': None,
+    'duration_ms': None
+}
+_warmup_lock = threading.Lock()
+
+
+def warm_up():
+    """
+    Initialize the Pinecone index handle, the embedding backend and the
+    lexical index, then run a dummy query so the first real request does
+    not pay for client setup and connection handshakes.
+    """
+    with _warmup_lock:
+        if _warmup_state['status'] in ('warming', 'ready'):
+            return
+        _warmup_state['status'] = 'warming'
+
+    started = time.time()
+    try:
+        index = get_pinecone_index()
+        get_lexical_index()
+        warm_vec = embed_texts_genai(["warm-up"])[0]
+        index.query(vector=warm_vec, top_k=1, include_metadata=False)
+        _warmup_state['error'] = None
+        _warmup_state['status'] = 'ready'
+        print(f"Flim-frame warm-up completed in {int((time.time() - started) * 1000)} ms")
+    except Exception as e:
+        _warmup_state['error'] = str(e)
+        _warmup_state['status'] = 'failed'
+        print(f"Warning: Flim-frame warm-up failed: {str(e)}")
+    finally:
+        _warmup_state['duration_ms'] = int((time.time() - started) * 1000)
+
+
+def start_warm_up():
+    """Run warm_up in a background daemon thread if warm-up is enabled."""
+    if not WARMUP_ON_START:
+        return None
+    thread = threading.Thread(target=warm_up, name="flim-frame-warmup")
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+# Identical concurrent questions share one upstream answer stream
+ask_coalescer = StreamCoalescer(
+    'flim-frame-ask',
+    enabled=AI_REQUEST_COALESCING
+)
+
+
 def stream_gemini_text_response(response_generator):
     """
     Stream generator function for Gemini text responses.
@@ -636,11 +1002,23 @@ def ask_question_api():
         # Get Pinecone index (lazy initialization)
         index = get_pinecone_index()
         
-        # Ask question with streaming enabled
-        response_generator = ask_question(question, index, stream=True)
+        # Ask question with streaming enabled; identical concurrent questions
+        # share one retrieval + generation
+        def start_answer(context_stats):
+            return stream_gemini_text_response(
+                ask_question(question, index, stream=True, stats=context_stats)
+            )
+
+        response_generator, context_stats, _ = ask_coalescer.subscribe(
+            normalize_question(question), start_answer
+        )
         
-        # Return streaming response
-        return Response(stream_gemini_text_response(response_generator), mimetype='text/plain')
+        # Return streaming response, reporting the assembled context size
+        return Response(
+            response_generator,
+            mimetype='text/plain',
+            headers={'X-Context-Tokens': str(context_stats.get('context_tokens', 0))}
+        )
         
     except Exception as e:
         return jsonify({
@@ -667,12 +1045,45 @@ def health_check():
         }), 500
 
 
+@flim_frame_bp.route('/api/flim-frame/ready', methods=['GET'])
+def readiness_check():
+    """
+    Readiness endpoint for load balancers.
+    Returns 503 until the worker has finished warming up.
+
+    Warm-up state is per worker and a probe reaches whichever worker accepts
+    it, so a 200 only says that worker is warm. Under gunicorn the warm-up
+    runs in post_worker_init (gunicorn.conf.py), before a worker accepts any
+    request, so every worker in rotation is warm unless its warm-up timed out
+    or failed.
+    """
+    if not WARMUP_ON_START:
+        return jsonify({
+            'status': 'ready',
+            'warmup': 'disabled'
+        }), 200
+
+    state = dict(_warmup_state)
+    if state['status'] == 'failed':
+        # Retry in the background so a transient failure does not keep the worker out of rotation
+        retry = threading.Thread(target=warm_up, name="flim-frame-warmup")
+        retry.daemon = True
+        retry.start()
+
+    return jsonify({
+        'status': state['status'],
+        'error': state['error'],
+        'duration_ms': state['duration_ms'],
+        'pid': os.getpid()
+    }), 200 if state['status'] == 'ready' else 503
+
+
 @flim_frame_bp.route('/api/flim-frame/test-pinecone', methods=['GET'])
 def test_pinecone():
     """Test Pinecone connection."""
     try:
-        validate_config()
-        index = init_pinecone()
+        # Reuse the worker's cached index handle instead of re-initializing
+        index = get_pinecone_index()
         # Try a simple query to test connection
         test_query = "test"
         test_vec = embed_texts_genai([test_query])[0]
@@ -1,10 +1,16 @@
 from flask import Blueprint, jsonify, request
 from app.utils.db_utils import get_db_connection
-from app.models.initial_assessment_response_model import upsert_initial_assessment_response
+from app.utils.validation import parse_positive_int
+from app.models.initial_assessment_response_model import (
+    MAX_RESPONSES_PER_BATCH,
+    upsert_initial_assessment_response,
+    upsert_initial_assessment_responses,
+)
 from app.config.database import DB_CONFIG
 
 initial_assessment_responses_bp = Blueprint('responses', __name__)
 
+
 @initial_assessment_responses_bp.route('/api/initial_assessment_response', methods=['POST'])
 def post_initial_assessment_response():
     data = request.get_json()  # Get the data from the request body
@@ -37,3 +43,50 @@ def post_initial_assessment_response():
 
     finally:
         conn.close()
+
+
+@initial_assessment_responses_bp.route('/api/initial_assessment_responses', methods=['POST'])
+def post_initial_assessment_responses():
+    """
+    Save all answers of a tab in one request:
+    {"user_id": 1, "tab_id": 2, "responses": [{"question_id": 5, "selected_option_id": 17}, ...]}
+    A response may carry its own tab_id, which overrides the top-level one.
+    """
+    data = request.get_json(silent=True) or {}
+
+    user_id = parse_positive_int(data.get('user_id'))
+    responses = data.get('responses')
+    if not user_id or not isinstance(responses, list) or not responses:
+        return jsonify({'error': 'User ID and a non-empty responses list are required'}), 400
+    if len(responses) > MAX_RESPONSES_PER_BATCH:
+        return jsonify({'error': f'At most {MAX_RESPONSES_PER_BATCH} responses can be saved at once'}), 400
+
+    rows = []
+    for index, response in enumerate(responses):
+        if not isinstance(response, dict):
+            return jsonify({'error': f'responses[{index}] must be an object'}), 400
+        # IDs are normalised so "5" and 5 are the same question when de-duplicating
+        question_id = parse_positive_int(response.get('question_id'))
+        selected_option_id = parse_positive_int(response.get('selected_option_id'))
+        tab_id = parse_positive_int(response.get('tab_id', data.get('tab_id')))
+        if not question_id or not selected_option_id or not tab_id:
+            return jsonify({'error': f'responses[{index}]: Question ID, Selected Option ID, and Tab ID must be positive integers'}), 400
+        rows.append((question_id, selected_option_id, tab_id))
+
+    conn = get_db_connection(DB_CONFIG)
+    if not conn:
+        return jsonify({'error': 'Database connection failed'}), 500
+
+    try:
+        result = upsert_initial_assessment_responses(conn, user_id, rows)
+
+        if 'error' in result:
+            return jsonify({'error': result['error']}), 404
+
+        return jsonify({'message': 'Responses successfully saved or updated', 'saved': result['saved']}), 200
+
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {e}'}), 500
+
+    finally:
+        conn.close()
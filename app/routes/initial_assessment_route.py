@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
 from app.utils.db_utils import get_db_connection
 from app.config.database import DB_CONFIG
-from app.models.initial_assessment_model import get_user_initial_assessment_details
+from app.models.initial_assessment_model import get_user_initial_assessment_details, rescore_users
 
 user_initial_assessment_bp = Blueprint('user_initial_assessment', __name__)
 
@@ -27,3 +27,32 @@ def get_user_details_route():
             return jsonify({'error': 'Failed to record assessment results'}), 500
     finally:
         conn.close()
+
+
+@user_initial_assessment_bp.route('/api/initial-assessment/rescore', methods=['POST'])
+def rescore_initial_assessments_route():
+    """
+    Re-score stored results after the rubric tables changed.
+    Body: {"user_ids": [1, 2, ...]} or {} for every user with results.
+
+    Only this worker's rubric cache is reset. Other workers keep scoring new
+    submissions with the old rubric for up to ASSESSMENT_RUBRIC_CACHE_SECONDS;
+    re-score again after that window if those results must use the new one.
+    """
+    data = request.get_json(silent=True) or {}
+    user_ids = data.get('user_ids')
+    if user_ids is not None and (not isinstance(user_ids, list) or not all(isinstance(u, int) for u in user_ids)):
+        return jsonify({'error': 'user_ids must be a list of integers'}), 400
+
+    conn = get_db_connection(DB_CONFIG)
+    if not conn:
+        return jsonify({'error': 'Database connection failed'}), 500
+
+    try:
+        rescored = rescore_users(conn, user_ids)
+        return jsonify({'message': 'Assessment results re-scored', 'rescored_users': rescored}), 200
+    except Exception as e:
+        conn.rollback()
+        return jsonify({'error': f'Failed to re-score assessment results: {str(e)}'}), 500
+    finally:
+        conn.close()
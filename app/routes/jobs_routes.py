@@ -1,37 +1,66 @@
 from flask import Blueprint, jsonify, request
 from app.utils.db_utils import get_db_connection
-from app.models.jobs_model import get_all_jobs, get_jobs_by_user_courses
+from app.utils.pagination import parse_page_limit, parse_page_cursor
+from app.models.job_recommendation_model import (
+    ALL_JOBS_CACHE_SECONDS,
+    get_all_jobs_page,
+    get_user_job_recommendations_page,
+)
 from app.config.database import DB_CONFIG
 
 jobs_bp = Blueprint('jobs', __name__)
 
-# @jobs_bp.route('/api/jobs', methods=['GET'])
-# def fetch_all_jobs():
-#     conn = get_db_connection(DB_CONFIG)
-#     if not conn:
-#         return jsonify({'error': 'Database connection failed'}), 500
+@jobs_bp.route('/api/jobs', methods=['GET'])
+def fetch_all_jobs():
+    try:
+        limit = parse_page_limit(request.args)
+        cursor = parse_page_cursor(request.args)
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+
+    conn = get_db_connection(DB_CONFIG)
+    if not conn:
+        return jsonify({'error': 'Database connection failed'}), 500
 
-#     try:
-#         jobs = get_all_jobs(conn)
-#         return jsonify({'jobs': jobs}), 200
-#     except Exception as e:
-#         return jsonify({'error': str(e)}), 500
-#     finally:
-#         conn.close()
+    try:
+        page = get_all_jobs_page(conn, limit, cursor)
+        response = jsonify({
+            'jobs': page['items'],
+            'next_cursor': page['next_cursor'],
+            'limit': page['limit']
+        })
+        response.headers['Cache-Control'] = f'public, max-age={ALL_JOBS_CACHE_SECONDS}'
+        return response, 200
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
 
 @jobs_bp.route('/api/jobs/<int:user_id>', methods=['GET'])
 def fetch_jobs_by_user_courses(user_id):
+    try:
+        limit = parse_page_limit(request.args)
+        cursor = parse_page_cursor(request.args)
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+
     conn = get_db_connection(DB_CONFIG)
     if not conn:
         return jsonify({'error': 'Database connection failed'}), 500
 
     try:
-        recommended_jobs = get_jobs_by_user_courses(conn, user_id)
-        all_jobs = get_all_jobs(conn)
+        # Served from the precomputed lms.user_job_recommendations table; all jobs are on /api/jobs
+        page = get_user_job_recommendations_page(conn, user_id, limit, cursor)
         return jsonify({
-            'recommended_jobs': recommended_jobs,
-            'all_jobs': all_jobs
+            'recommended_jobs': page['items'],
+            'next_cursor': page['next_cursor'],
+            'limit': page['limit'],
+            'computed_at': page['computed_at']
         }), 200
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
     finally:
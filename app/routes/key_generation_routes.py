@@ -1,10 +1,6 @@
-from flask import Blueprint, request, jsonify, send_file
-from app.utils.db_utils import get_db_connection
-from app.config.database import DB_CONFIG
-from app.models.batch_model import create_batch, associate_course_with_batch, create_login_key
-import uuid
-import csv
-import io
+from flask import Blueprint, request, jsonify, Response
+from app.models.batch_model import create_batch_with_keys
+from app.utils.export_utils import csv_row_chunks
 
 key_generation_bp = Blueprint('key_generation', __name__)
 
@@ -26,39 +22,16 @@ def generate_keys():
         return jsonify({'error': 'course_ids must be a non-empty array'}), 400
 
     try:
-        # Create batch
-        batch_id = create_batch(batch_name)
+        # Batch, course associations and keys are written in one transaction
+        batch_id, codes = create_batch_with_keys(batch_name, course_ids, validity_days, num_users)
         if not batch_id:
             return jsonify({'error': 'Failed to create batch'}), 500
 
-        # Associate each course with the batch
-        for course_id in course_ids:
-            bc_id = associate_course_with_batch(batch_id, course_id, validity_days)
-            if not bc_id:
-                return jsonify({'error': f'Failed to associate course {course_id} with batch'}), 500
-
-        # Generate keys
-        generated_keys = []
-        for _ in range(num_users):
-            key_id = create_login_key(batch_id)
-            if key_id:
-                generated_keys.append([key_id])
-
-        # Create CSV in memory
-        si = io.StringIO()
-        writer = csv.writer(si)
-        writer.writerows(generated_keys)
-        
-        # Create the response
-        output = io.BytesIO()
-        output.write(si.getvalue().encode())
-        output.seek(0)
-        
-        return send_file(
-            output,
+        # Keys are only sent once committed; the CSV is written out in chunks
+        return Response(
+            csv_row_chunks([code] for code in codes),
             mimetype='text/csv',
-            as_attachment=True,
-            download_name='generated_keys.csv'
+            headers={'Content-Disposition': 'attachment; filename=generated_keys.csv'}
         )
 
     except Exception as e:
@@ -2,13 +2,15 @@ from flask import Blueprint, jsonify
 from app.utils.db_utils import get_db_connection
 from app.config.database import DB_CONFIG
 from app.models.ppt_url_model import get_course_ppt_url
+from app.models.ppt_job_model import get_latest_ppt_job
+from app.utils.s3_utils import presign_url
 
 ppt_url_bp = Blueprint('ppt_url', __name__)
 
 @ppt_url_bp.route('/api/course-ppt-url/<int:course_id>', methods=['GET'])
 def get_course_ppt_url_route(course_id):
     """
-    Get PPT URL for a specific course by course_id
+    Get PPT URL and the latest PPT generation job status for a course by course_id
     """
     try:
         conn = get_db_connection(DB_CONFIG)
@@ -16,20 +18,55 @@ def get_course_ppt_url_route(course_id):
             return jsonify({'error': 'Database connection failed'}), 500
         
         result = get_course_ppt_url(conn, course_id)
+        ppt_job = get_latest_ppt_job(conn, course_id)
         conn.close()
+
+        job_data = None
+        if ppt_job:
+            job_data = {
+                'job_id': ppt_job['job_id'],
+                'status': ppt_job['status'],
+                'attempts': ppt_job['attempts'],
+                'error': ppt_job['error'],
+                'stale': ppt_job['stale'],
+                'created_date': str(ppt_job['created_date']),
+                'updated_date': str(ppt_job['updated_date'])
+            }
         
         if result and result['ppt_url']:
+            # Decks are private; hand out a short-lived presigned URL
+            ppt_url, expires_at = presign_url(result['ppt_url'])
+            return jsonify({
+                'course_id': course_id,
+                'ppt_url': ppt_url,
+                'ppt_url_expires_at': expires_at,
+                'status': 'success',
+                'ppt_job': job_data
+            }), 200
+        elif job_data and job_data['stale']:
+            # The worker running the job stopped; not 202, so clients stop polling
             return jsonify({
                 'course_id': course_id,
-                'ppt_url': result['ppt_url'],
-                'status': 'success'
+                'ppt_url': None,
+                'status': 'stalled',
+                'message': 'PPT generation stopped; approve the course again to resume it',
+                'ppt_job': job_data
             }), 200
+        elif job_data and job_data['status'] in ('queued', 'running', 'retrying'):
+            return jsonify({
+                'course_id': course_id,
+                'ppt_url': None,
+                'status': 'pending',
+                'message': 'PPT generation is in progress',
+                'ppt_job': job_data
+            }), 202
         else:
             return jsonify({
                 'course_id': course_id,
                 'ppt_url': None,
                 'status': 'not_found',
-                'message': 'No PPT URL found for this course'
+                'message': 'No PPT URL found for this course',
+                'ppt_job': job_data
             }), 404
             
     except Exception as e:
@@ -1,16 +1,19 @@
 from flask import Blueprint, request, jsonify
 from app.models.qc_batch_model import (
-    create_qc_batch, 
-    update_user_qc_id, 
-    create_qc_user_course,
+    create_qc_batch_bulk,
+    parse_qc_user_courses,
     get_qc_batch_analytics,
     add_course_to_user,
     extend_course_validity,
-    get_detailed_qc_analytics
+    get_detailed_qc_analytics,
+    get_qc_analytics_page,
+    QC_ANALYTICS_ROWS_QUERY
 )
+from app.models.analytics_page_model import iter_analytics_rows, ANALYTICS_EXPORT_COLUMNS
 from app.utils.db_utils import get_db_connection
+from app.utils.pagination import wants_analytics_page, parse_analytics_page_args, parse_analytics_filters
+from app.utils.export_utils import EXPORT_FORMATS, streaming_export_response, json_passthrough_response
 from app.config.database import DB_CONFIG
-import json
 
 qc_batch_bp = Blueprint('qc_batch', __name__)
 
@@ -27,63 +30,40 @@ def create_qc_batch_route():
                 'message': 'Missing required fields: batch_name and user_courses'
             }), 400
 
-        # Create QC batch
-        qc_id = create_qc_batch(batch_name)
-        if not qc_id:
+        user_rows, course_rows, invalid_rows = parse_qc_user_courses(user_courses)
+        if invalid_rows:
             return jsonify({
                 'status': 'error',
-                'message': 'Failed to create QC batch'
-            }), 500
-
-        results = []
-        errors = []
-
-        # Process each user and their courses
-        for user_data in user_courses:
-            user_id = user_data.get('user_id')
-            courses = user_data.get('courses')
-
-            if not user_id or not courses:
-                errors.append(f"Invalid data for user: {user_id}")
-                continue
-
-            # Update user's qc_id
-            updated_user = update_user_qc_id(user_id, qc_id)
-            if not updated_user:
-                errors.append(f"Failed to update QC ID for user: {user_id}")
-                continue
-
-            # Create course associations
-            user_course_results = []
-            for course in courses:
-                course_id = course.get('course_id')
-                validity_days = course.get('validity_days')
+                'message': 'Invalid user_courses',
+                'errors': invalid_rows
+            }), 400
 
-                if not course_id or not validity_days:
-                    errors.append(f"Invalid course data for user {user_id}")
-                    continue
+        # Write everything in one transaction; atomic=true rolls back the whole
+        # batch if any user or course is unknown, otherwise valid rows are kept
+        atomic = bool(data.get('atomic', False))
+        conn = get_db_connection(DB_CONFIG)
+        if conn is None:
+            return jsonify({
+                'status': 'error',
+                'message': 'Failed to connect to database'
+            }), 500
 
-                qcuc_id = create_qc_user_course(qc_id, user_id, course_id, validity_days)
-                if qcuc_id:
-                    user_course_results.append({
-                        'course_id': course_id,
-                        'validity_days': validity_days,
-                        'qcuc_id': qcuc_id
-                    })
-                else:
-                    errors.append(f"Failed to create course association for user {user_id} and course {course_id}")
+        outcome = create_qc_batch_bulk(conn, batch_name, user_rows, course_rows, atomic=atomic)
+        errors = outcome['errors']
 
-            results.append({
-                'user_id': user_id,
-                'courses': user_course_results
-            })
+        if not outcome['committed']:
+            return jsonify({
+                'status': 'error',
+                'message': 'QC batch was not created because some rows failed',
+                'errors': errors
+            }), 422
 
         return jsonify({
             'status': 'success',
             'data': {
-                'qc_id': qc_id,
+                'qc_id': outcome['qc_id'],
                 'batch_name': batch_name,
-                'results': results,
+                'results': outcome['results'],
                 'errors': errors if errors else None
             }
         }), 200
@@ -93,6 +73,9 @@ def create_qc_batch_route():
             'status': 'error',
             'message': str(e)
         }), 500
+    finally:
+        if 'conn' in locals() and conn is not None:
+            conn.close()
 
 @qc_batch_bp.route('/api/qc-batch/analytics', methods=['GET'])
 def get_qc_analytics():
@@ -232,6 +215,21 @@ def extend_validity():
 
 @qc_batch_bp.route('/api/qc-batch/detailed-analytics', methods=['GET'])
 def get_detailed_analytics():
+    """
+    Detailed QC analytics. Without query parameters the full document is
+    returned; with cursor/limit/page_by/summary or batch_id (qc_id)/course_id/
+    completion_status filters a single keyset-paginated page is returned.
+    """
+    page = None
+    if wants_analytics_page(request.args):
+        try:
+            page = parse_analytics_page_args(request.args)
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+
     try:
         conn = get_db_connection(DB_CONFIG)
         if conn is None:
@@ -239,6 +237,12 @@ def get_detailed_analytics():
                 'status': 'error',
                 'message': 'Failed to connect to database'
             }), 500
+
+        if page is not None:
+            return jsonify({
+                'status': 'success',
+                'data': get_qc_analytics_page(conn, page)
+            }), 200
             
         analytics_data = get_detailed_qc_analytics(conn)
         
@@ -248,19 +252,9 @@ def get_detailed_analytics():
                 'message': 'Failed to fetch detailed analytics data'
             }), 500
             
-        try:
-            # Parse the JSON string from PostgreSQL
-            parsed_data = json.loads(analytics_data)
-            return jsonify({
-                'status': 'success',
-                'data': parsed_data
-            }), 200
-        except json.JSONDecodeError as e:
-            print(f"JSON parsing error: {str(e)}")
-            return jsonify({
-                'status': 'error',
-                'message': 'Invalid data format received from database'
-            }), 500
+        # The JSON text comes straight from PostgreSQL; splice it into the envelope
+        # instead of parsing and re-encoding it
+        return json_passthrough_response(analytics_data)
         
     except Exception as e:
         print(f"Error in get_detailed_analytics route: {str(e)}")  # Add logging
@@ -270,4 +264,37 @@ def get_detailed_analytics():
         }), 500
     finally:
         if 'conn' in locals():
-            conn.close()
\ No newline at end of file
+            conn.close()
+
+@qc_batch_bp.route('/api/qc-batch/detailed-analytics/export', methods=['GET'])
+def export_detailed_analytics():
+    """
+    Stream QC analytics as one row per (user, course) in NDJSON (default) or CSV.
+    Accepts the batch_id (qc_id) / course_id / completion_status filters.
+    """
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({
+            'status': 'error',
+            'message': f"format must be one of: {', '.join(EXPORT_FORMATS)}"
+        }), 400
+    try:
+        filters = parse_analytics_filters(request.args)
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+    conn = get_db_connection(DB_CONFIG)
+    if conn is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Failed to connect to database'
+        }), 500
+
+    # The response generator owns the connection from here on
+    rows = iter_analytics_rows(conn, QC_ANALYTICS_ROWS_QUERY, 'qc_id', filters)
+    return streaming_export_response(
+        conn, rows, ('qc_id',) + ANALYTICS_EXPORT_COLUMNS, export_format, 'qc_analytics'
+    )
@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
 from app.utils.db_utils import get_db_connection
 from app.models.transaction_view_model import get_course_content_by_id, get_course_questions_by_id, approve_course_content
-from app.models.ppt_generation_model import generate_ppt_for_course
+from app.models.ppt_job_model import enqueue_ppt_job
 from app.config.database import DB_CONFIG
 
 transaction_view_bp = Blueprint('transaction_view', __name__)
@@ -71,7 +71,7 @@ def get_course_questions_transaction(course_id):
 def approve_course_transaction(course_id):
     """
     Approve a course by calling the process_course_content stored procedure
-    and generate PPT with S3 upload and database update
+    and queue PPT generation (S3 upload + database update) as a background job
     """
     try:
         conn = get_db_connection(DB_CONFIG)
@@ -81,34 +81,23 @@ def approve_course_transaction(course_id):
         # Step 1: Approve course content
         approve_course_content(conn, course_id)
         
-        # Step 2: Generate PPT with full workflow (S3 upload + DB update)
+        # Step 2: Queue PPT generation; progress is reported by /api/course-ppt-url/<course_id>
+        # ?force_ppt=true rebuilds the deck even if the course content is unchanged
+        force_ppt = request.args.get('force_ppt', 'false').lower() in ('1', 'true', 'yes')
         try:
-            ppt_result = generate_ppt_for_course(
-                course_id=course_id,
-                filename=None,  # Auto-generate filename
-                template_path=None,  # Use default template
-                max_slides=30,
-                upload_to_cloud=True
-            )
-            
+            ppt_job = enqueue_ppt_job(conn, course_id, force=force_ppt)
             response_data = {
-                'message': 'Course approved and PPT generated successfully',
+                'message': 'Course approved successfully, PPT generation queued',
                 'course_id': course_id,
-                'ppt_filename': ppt_result['filename'],
-                'ppt_url': ppt_result['cloud_url'],
-                'ppt_generated': True
+                'ppt_generated': False,
+                'ppt_job_id': ppt_job['job_id'],
+                'ppt_status': ppt_job['status'],
+                'ppt_status_url': f'/api/course-ppt-url/{course_id}'
             }
-            
-            if ppt_result['cloud_url']:
-                response_data['ppt_status'] = 'Uploaded to S3 and database updated'
-            else:
-                response_data['ppt_status'] = 'Generated locally only (S3 upload failed)'
-                response_data['local_path'] = ppt_result['local_path']
-            
         except Exception as ppt_error:
-            # Course approval succeeded, but PPT generation failed
+            # Course approval succeeded, but the PPT job could not be queued
             response_data = {
-                'message': 'Course approved successfully, but PPT generation failed',
+                'message': 'Course approved successfully, but PPT generation could not be queued',
                 'course_id': course_id,
                 'ppt_generated': False,
                 'ppt_error': str(ppt_error)
@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+
+from flask import Response
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+
+def ndjson_chunks(rows, chunk_rows=500):
+    """Serialize dict rows as newline-delimited JSON, a few hundred rows per chunk."""
+    buffer = []
+    for row in rows:
+        buffer.append(json.dumps(row, default=str))
+        if len(buffer) >= chunk_rows:
+            yield '\n'.join(buffer) + '\n'
+            buffer = []
+    if buffer:
+        yield '\n'.join(buffer) + '\n'
+
+
+def csv_row_chunks(rows, header=None, chunk_rows=500):
+    """Serialize list rows as CSV (optional header first), a few hundred rows per chunk."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    pending = 0
+    if header:
+        writer.writerow(header)
+        pending = 1
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_rows:
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate(0)
+            pending = 0
+    if pending:
+        yield out.getvalue()
+
+
+def csv_chunks(rows, columns, chunk_rows=500):
+    """Serialize dict rows as CSV (header first), a few hundred rows per chunk."""
+    return csv_row_chunks(([row.get(column) for column in columns] for row in rows), columns, chunk_rows)
+
+
+def json_passthrough_response(raw_json, status=200):
+    """
+    Wrap JSON text produced by Postgres in the {"status": "success", "data": ...}
+    envelope without parsing and re-encoding it.
+    """
+    body = '{"status":"success","data":' + raw_json + '}'
+    return Response(body, status=status, mimetype='application/json')
+
+
+def streaming_export_response(conn, rows, columns, export_format, filename):
+    """
+    Stream rows as NDJSON or CSV. The connection is closed once the last row
+    has been sent (or the client disconnects).
+    """
+    def generate():
+        try:
+            if export_format == 'csv':
+                yield from csv_chunks(rows, columns)
+            else:
+                yield from ndjson_chunks(rows)
+        except Exception as e:
+            print(f"Error streaming {filename} export: {str(e)}")
+            raise
+        finally:
+            conn.close()
+
+    return Response(
+        generate(),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={
+            'Content-Disposition': f'attachment; filename={filename}.{export_format}',
+            'X-Accel-Buffering': 'no'
+        }
+    )
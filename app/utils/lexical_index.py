@@ -0,0 +1,223 @@
+"""
+Local BM25 side index for the book chatbot.
+
+Keeps an inverted index over the same chunks that are stored in Pinecone so
+exact terms (API names, character names, ...) can be matched lexically.
+Postings, term frequencies and document lengths are held in compact
+``array`` buffers and the index grows incrementally as chunks are ingested.
+"""
+
+import math
+import os
+import pickle
+import re
+import tempfile
+import threading
+import heapq
+from array import array
+
+# Keeps dotted / underscored identifiers such as ``os.path.join`` together
+_TOKEN_RE = re.compile(r"[a-z0-9_]+(?:[.'][a-z0-9_]+)*")
+
+_STOP_WORDS = frozenset((
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how",
+    "in", "is", "it", "of", "on", "or", "that", "the", "this", "to", "was",
+    "what", "when", "where", "which", "who", "why", "with",
+))
+
+_MAX_TF = 65535  # Term frequencies are stored as unsigned shorts
+
+
+def tokenize(text):
+    """Lower-case and split text into index terms, dropping stop words."""
+    if not text:
+        return []
+    return [tok for tok in _TOKEN_RE.findall(text.lower()) if tok not in _STOP_WORDS]
+
+
+class LexicalIndex:
+    """
+    Incremental BM25 inverted index.
+
+    Each document is a chunk identified by a stable key (the Pinecone vector
+    id). Metadata and text are kept so lexical hits can be returned in the
+    same ``(metadata, score, text)`` shape as ``retrieve_relevant_chunks``.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._doc_keys = []          # doc number -> chunk key
+        self._doc_meta = []          # doc number -> metadata dict
+        self._doc_lengths = array("I")
+        self._total_length = 0
+        self._key_to_doc = {}
+        # term -> (doc numbers, term frequencies)
+        self._postings = {}
+
+    def __len__(self):
+        return len(self._doc_keys)
+
+    def add(self, key, text, metadata=None):
+        """
+        Add a chunk to the index.
+
+        Returns False if a chunk with the same key is already indexed.
+        """
+        with self._lock:
+            if key in self._key_to_doc:
+                return False
+
+            terms = tokenize(text)
+            doc = len(self._doc_keys)
+            self._doc_keys.append(key)
+            meta = dict(metadata or {})
+            meta.setdefault("text", text)
+            self._doc_meta.append(meta)
+            self._doc_lengths.append(len(terms))
+            self._total_length += len(terms)
+            self._key_to_doc[key] = doc
+
+            counts = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            for term, tf in counts.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = (array("I"), array("H"))
+                    self._postings[term] = postings
+                postings[0].append(doc)
+                postings[1].append(min(tf, _MAX_TF))
+            return True
+
+    def add_many(self, chunks):
+        """
+        Add ``(key, text, metadata)`` tuples; returns the number newly indexed.
+        """
+        added = 0
+        for key, text, metadata in chunks:
+            if self.add(key, text, metadata):
+                added += 1
+        return added
+
+    def search(self, query_text, top_k=5):
+        """
+        Score indexed chunks against the query with BM25.
+
+        Returns:
+            List of tuples (metadata, bm25_score, text), best first
+        """
+        terms = set(tokenize(query_text))
+        with self._lock:
+            n_docs = len(self._doc_keys)
+            if not terms or n_docs == 0:
+                return []
+
+            avg_len = (self._total_length / n_docs) or 1.0
+            k1, b = self.k1, self.b
+            lengths = self._doc_lengths
+            scores = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                docs, tfs = postings
+                df = len(docs)
+                idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+                for doc, tf in zip(docs, tfs):
+                    norm = k1 * (1.0 - b + b * lengths[doc] / avg_len)
+                    scores[doc] = scores.get(doc, 0.0) + idf * tf * (k1 + 1.0) / (tf + norm)
+
+            best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+            results = []
+            for doc, score in best:
+                meta = self._doc_meta[doc]
+                results.append((meta, score, meta.get("text", "")))
+            return results
+
+    def save(self, path):
+        """Atomically persist the index to ``path``."""
+        with self._lock:
+            state = {
+                "k1": self.k1,
+                "b": self.b,
+                "doc_keys": self._doc_keys,
+                "doc_meta": self._doc_meta,
+                "doc_lengths": self._doc_lengths,
+                "total_length": self._total_length,
+                "postings": self._postings,
+            }
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    pickle.dump(state, fh, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    @classmethod
+    def load(cls, path):
+        """Load an index saved with ``save``; returns an empty index if missing."""
+        index = cls()
+        if not path or not os.path.exists(path):
+            return index
+        with open(path, "rb") as fh:
+            state = pickle.load(fh)
+        index.k1 = state["k1"]
+        index.b = state["b"]
+        index._doc_keys = state["doc_keys"]
+        index._doc_meta = state["doc_meta"]
+        index._doc_lengths = state["doc_lengths"]
+        index._total_length = state["total_length"]
+        index._postings = state["postings"]
+        index._key_to_doc = {key: doc for doc, key in enumerate(index._doc_keys)}
+        return index
+
+
+def chunk_key(meta):
+    """Stable identity for a chunk, shared by the vector and lexical retrievers."""
+    if isinstance(meta, dict):
+        source = meta.get("source", "Unknown")
+        chunk_id = meta.get("chunk_id", "Unknown")
+    else:
+        source = getattr(meta, "source", "Unknown")
+        chunk_id = getattr(meta, "chunk_id", "Unknown")
+    return f"{source}::{chunk_id}"
+
+
+def reciprocal_rank_fusion(vector_results, lexical_results, k=60, top_k=5):
+    """
+    Fuse vector and lexical result lists with reciprocal-rank fusion.
+
+    Both inputs are lists of (metadata, score, text) tuples, best first.
+    The returned tuples keep the vector similarity as their score (0.0 for
+    lexical-only hits) and record the fusion details in the metadata under
+    ``rrf_score``, ``vector_rank`` and ``lexical_rank``.
+    """
+    fused = {}
+    for rank_field, results in (("vector_rank", vector_results), ("lexical_rank", lexical_results)):
+        for rank, (meta, score, text) in enumerate(results, start=1):
+            key = chunk_key(meta)
+            entry = fused.get(key)
+            if entry is None:
+                base = dict(meta) if isinstance(meta, dict) else {"text": text}
+                entry = {"meta": base, "score": 0.0, "text": text, "rrf": 0.0}
+                fused[key] = entry
+            entry["rrf"] += 1.0 / (k + rank)
+            entry["meta"][rank_field] = rank
+            if rank_field == "vector_rank":
+                entry["score"] = score
+            if not entry["text"]:
+                entry["text"] = text
+
+    ranked = sorted(fused.values(), key=lambda entry: entry["rrf"], reverse=True)[:top_k]
+    results = []
+    for entry in ranked:
+        entry["meta"]["rrf_score"] = entry["rrf"]
+        results.append((entry["meta"], entry["score"], entry["text"]))
+    return results
@@ -0,0 +1,104 @@
+import base64
+import json
+
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 500
+
+ANALYTICS_PAGE_PARAMS = ('cursor', 'limit', 'page_by', 'summary', 'batch_id', 'course_id', 'completion_status')
+COMPLETION_STATUSES = ('Completed', 'In Progress', 'Not Started')
+
+
+def encode_cursor(values):
+    """Encode keyset values as an opaque, URL-safe cursor string."""
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor; raises ValueError if it is malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, dict):
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def wants_analytics_page(args):
+    """True when any pagination/filter parameter is present on the request."""
+    return any(name in args for name in ANALYTICS_PAGE_PARAMS)
+
+
+def parse_analytics_filters(args):
+    """
+    Validate the batch_id / course_id / completion_status filters from request.args.
+    Raises ValueError with a client-facing message on bad input.
+    """
+    filters = {}
+    for name in ('batch_id', 'course_id'):
+        value = args.get(name)
+        if value is not None:
+            try:
+                filters[name] = int(value)
+            except ValueError:
+                raise ValueError(f'{name} must be an integer')
+
+    completion_status = args.get('completion_status')
+    if completion_status is not None:
+        if completion_status not in COMPLETION_STATUSES:
+            raise ValueError(f"completion_status must be one of: {', '.join(COMPLETION_STATUSES)}")
+        filters['completion_status'] = completion_status
+    return filters
+
+
+def parse_page_limit(args, default=DEFAULT_PAGE_LIMIT):
+    """Validate the 'limit' parameter; raises ValueError with a client-facing message."""
+    try:
+        limit = int(args.get('limit', default))
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+    if limit <= 0 or limit > MAX_PAGE_LIMIT:
+        raise ValueError(f'limit must be between 1 and {MAX_PAGE_LIMIT}')
+    return limit
+
+
+def parse_page_cursor(args):
+    """Decode the optional 'cursor' parameter (None on the first page)."""
+    if args.get('cursor'):
+        return decode_cursor(args['cursor'])
+    return None
+
+
+def parse_analytics_page_args(args):
+    """
+    Validate analytics pagination parameters from request.args.
+
+    Returns a dict with page_by, summary, limit, cursor (decoded or None) and
+    the batch_id / course_id / completion_status filters. Raises ValueError
+    with a client-facing message on bad input.
+    """
+    page_by = args.get('page_by', 'batch')
+    if page_by not in ('batch', 'user'):
+        raise ValueError("page_by must be 'batch' or 'user'")
+
+    limit = parse_page_limit(args)
+    filters = parse_analytics_filters(args)
+
+    cursor = parse_page_cursor(args)
+    if cursor is not None:
+        if cursor.get('page_by') != page_by:
+            raise ValueError('cursor does not match page_by')
+        # Keyset values are compared in SQL; a missing one would silently match nothing
+        keys = ('batch', 'user') if page_by == 'user' else ('batch',)
+        if not all(isinstance(cursor.get(key), int) and not isinstance(cursor.get(key), bool) for key in keys):
+            raise ValueError('Invalid cursor')
+
+    return {
+        'page_by': page_by,
+        'summary': args.get('summary', 'false').lower() in ('1', 'true', 'yes'),
+        'limit': limit,
+        'cursor': cursor,
+        'filters': filters
+    }
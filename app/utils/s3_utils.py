@@ -0,0 +1,151 @@
+import os
+import re
+import threading
+import time
+from urllib.parse import unquote, urlparse
+
+import boto3
+from botocore.config import Config
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+S3_MAX_POOL_CONNECTIONS = int(os.getenv('S3_MAX_POOL_CONNECTIONS', 20))
+S3_MAX_ATTEMPTS = int(os.getenv('S3_MAX_ATTEMPTS', 5))
+S3_PRESIGNED_URL_EXPIRY = int(os.getenv('S3_PRESIGNED_URL_EXPIRY', 3600))
+S3_PRESIGNED_CACHE_MAX_ENTRIES = int(os.getenv('S3_PRESIGNED_CACHE_MAX_ENTRIES', 1000))
+# Objects stay private by default; clients get presigned URLs from the API
+S3_PUBLIC_READ = os.getenv('S3_PUBLIC_READ', 'false').lower() == 'true'
+# Content-addressed keys never change, so clients and CDNs may cache them for good
+S3_IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# <bucket>.s3.<region>.amazonaws.com/<key>, <bucket>.s3.amazonaws.com/<key>, <bucket>.s3-<region>.amazonaws.com/<key>
+_VIRTUAL_HOST_RE = re.compile(r'^(?P<bucket>.+)\.s3[.-](?:[a-z0-9-]+\.)?amazonaws\.com$')
+# s3.<region>.amazonaws.com/<bucket>/<key>
+_PATH_STYLE_RE = re.compile(r'^s3[.-](?:[a-z0-9-]+\.)?amazonaws\.com$|^s3\.amazonaws\.com$')
+
+# Presigned URLs are reused for half their lifetime so repeat requests get the
+# same URL and browser/CDN caches keep hitting. Entries are kept in insertion
+# order, so the oldest is evicted first once the cache is full
+_presigned_cache = {}
+_presigned_lock = threading.Lock()
+
+# One client per worker process; boto3 clients are thread-safe once created
+_s3_client = None
+_s3_client_pid = None
+_s3_client_lock = threading.Lock()
+
+
+def get_s3_client():
+    """
+    Get the cached S3 client for this worker, creating it on first use.
+    The client is rebuilt after a fork so workers never share connection pools.
+    """
+    global _s3_client, _s3_client_pid
+    pid = os.getpid()
+    if _s3_client is None or _s3_client_pid != pid:
+        with _s3_client_lock:
+            if _s3_client is None or _s3_client_pid != pid:
+                aws_access_key = os.getenv('AWS_ACCESS_KEY_ID')
+                aws_secret_key = os.getenv('AWS_SECRET_ACCESS_KEY')
+                aws_region = os.getenv('AWS_REGION', 'us-east-1')
+
+                if not aws_access_key or not aws_secret_key:
+                    raise ValueError("AWS credentials not found in environment variables")
+
+                _s3_client = boto3.client(
+                    's3',
+                    aws_access_key_id=aws_access_key,
+                    aws_secret_access_key=aws_secret_key,
+                    region_name=aws_region,
+                    # Optional S3-compatible endpoint (e.g. MinIO for local development)
+                    endpoint_url=os.getenv('AWS_S3_ENDPOINT_URL') or None,
+                    config=Config(
+                        max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+                        # total_max_attempts counts the first try; max_attempts would add one more
+                        retries={'total_max_attempts': S3_MAX_ATTEMPTS, 'mode': 'standard'}
+                    )
+                )
+                _s3_client_pid = pid
+    return _s3_client
+
+
+def reset_s3_client():
+    """Drop the cached client (e.g. after credentials change)."""
+    global _s3_client, _s3_client_pid
+    with _s3_client_lock:
+        _s3_client = None
+        _s3_client_pid = None
+    with _presigned_lock:
+        _presigned_cache.clear()
+
+
+def parse_s3_url(url):
+    """
+    Split an S3 object URL into (bucket, key).
+
+    Returns None for URLs that do not point at S3 (e.g. external eBook links).
+    """
+    if not url:
+        return None
+    parsed = urlparse(url)
+    if parsed.scheme == 's3':
+        key = parsed.path.lstrip('/')
+        return (parsed.netloc, unquote(key)) if parsed.netloc and key else None
+    if parsed.scheme not in ('http', 'https'):
+        return None
+
+    host = (parsed.hostname or '').lower()
+    path = unquote(parsed.path.lstrip('/'))
+    match = _VIRTUAL_HOST_RE.match(host)
+    if match and path:
+        return match.group('bucket'), path
+    if _PATH_STYLE_RE.match(host) and '/' in path:
+        bucket, key = path.split('/', 1)
+        return (bucket, key) if key else None
+    return None
+
+
+def presign_url(url, expires_in=None):
+    """
+    Turn a stored S3 object URL into a short-lived presigned GET URL.
+
+    Non-S3 URLs are returned unchanged. Returns (url, expires_at) where
+    expires_at is a unix timestamp (None when the URL was not signed).
+    """
+    location = parse_s3_url(url)
+    if not location:
+        return url, None
+
+    expires_in = expires_in or S3_PRESIGNED_URL_EXPIRY
+    now = time.time()
+    cached = _presigned_cache.get((location, expires_in))
+    if cached and now < cached['refresh_at']:
+        return cached['url'], cached['expires_at']
+
+    try:
+        signed = get_s3_client().generate_presigned_url(
+            'get_object',
+            Params={'Bucket': location[0], 'Key': location[1]},
+            ExpiresIn=expires_in
+        )
+    except Exception as e:
+        print(f"Error presigning S3 URL: {e}")
+        return url, None
+
+    entry = {'url': signed, 'expires_at': int(now + expires_in), 'refresh_at': now + expires_in / 2}
+    with _presigned_lock:
+        _presigned_cache.pop((location, expires_in), None)
+        if len(_presigned_cache) >= S3_PRESIGNED_CACHE_MAX_ENTRIES:
+            _prune_presigned_cache(now)
+        _presigned_cache[(location, expires_in)] = entry
+    return signed, entry['expires_at']
+
+
+def _prune_presigned_cache(now):
+    """Drop entries due for refresh, then the oldest ones until there is room. Caller holds the lock."""
+    for key in [key for key, entry in _presigned_cache.items() if now >= entry['refresh_at']]:
+        del _presigned_cache[key]
+    while _presigned_cache and len(_presigned_cache) >= S3_PRESIGNED_CACHE_MAX_ENTRIES:
+        del _presigned_cache[next(iter(_presigned_cache))]
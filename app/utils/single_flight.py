@@ -0,0 +1,121 @@
+"""
+Single-flight coalescing for streamed LLM answers.
+
+Concurrent identical requests (after normalization) share one upstream
+generation. The upstream stream is pumped into a shared buffer by a
+background thread; every subscriber replays the buffered prefix and then
+follows the live stream. Coalescing is per worker process.
+"""
+
+import threading
+
+
+def normalize_question(text):
+    """Normalize a question so trivially different copies share one flight."""
+    return " ".join((text or "").lower().split()).rstrip(" ?!.")
+
+
+class _Flight:
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.chunks = []
+        self.info = {}
+        self.started = False
+        self.done = False
+        self.error = None
+
+
+class StreamCoalescer:
+    """
+    Registry of in-flight upstream streams keyed by normalized request.
+
+    ``subscribe(key, start)`` returns ``(generator, info, is_leader)``.
+    Only the first caller for a key runs ``start(info)``, which must return
+    an iterable of text chunks and may record request details in ``info``.
+    """
+
+    def __init__(self, name, enabled=True):
+        self.name = name
+        self.enabled = enabled
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, key, start):
+        if not self.enabled:
+            info = {}
+            return iter(start(info)), info, True
+
+        with self._lock:
+            flight = self._flights.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = _Flight()
+                self._flights[key] = flight
+
+        if is_leader:
+            try:
+                upstream = start(flight.info)
+            except Exception as e:
+                self._finish(key, flight, error=e)
+                raise
+            with flight.cond:
+                flight.started = True
+                flight.cond.notify_all()
+            pump = threading.Thread(
+                target=self._pump,
+                args=(key, flight, upstream),
+                name=f"{self.name}-single-flight"
+            )
+            pump.daemon = True
+            pump.start()
+        else:
+            with flight.cond:
+                while not flight.started and not flight.done:
+                    flight.cond.wait()
+            if not flight.started and flight.error is not None:
+                # The leader failed before any generation began
+                raise flight.error
+            print(f"Debug: {self.name} request coalesced onto an in-flight generation")
+
+        return self._follow(flight), flight.info, is_leader
+
+    def _pump(self, key, flight, upstream):
+        """Drain the upstream stream into the shared buffer."""
+        try:
+            for chunk in upstream:
+                if not chunk:
+                    continue
+                with flight.cond:
+                    flight.chunks.append(chunk)
+                    flight.cond.notify_all()
+        except Exception as e:
+            with flight.cond:
+                flight.chunks.append(f"\n[Error streaming response: {str(e)}]")
+                flight.cond.notify_all()
+        finally:
+            self._finish(key, flight)
+
+    def _finish(self, key, flight, error=None):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        with flight.cond:
+            flight.error = error
+            flight.done = True
+            flight.cond.notify_all()
+
+    @staticmethod
+    def _follow(flight):
+        """Yield the buffered prefix, then the live stream until it completes."""
+        position = 0
+        while True:
+            with flight.cond:
+                while position >= len(flight.chunks) and not flight.done:
+                    flight.cond.wait()
+                pending = flight.chunks[position:]
+                position += len(pending)
+                finished = flight.done and position >= len(flight.chunks)
+            for chunk in pending:
+                yield chunk
+            if finished:
+                return
@@ -0,0 +1,14 @@
+def parse_positive_int(value):
+    """
+    Parse an ID or count sent as a JSON number or numeric string.
+    Returns None unless it is a positive integer (booleans and fractions are rejected).
+    """
+    if isinstance(value, bool):
+        return None
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return None
+    if isinstance(value, float) and number != value:
+        return None
+    return number if number > 0 else None
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: json.loads + jsonify vs. splicing Postgres JSON text into the envelope
+
+Builds a synthetic batch analytics document for N users, shaped like the
+JSON text get_batch_analytics_snapshot returns (the "data" part only; the
+response envelope is added by each path), and compares the CPU time and
+peak Python memory of the two response paths.
+
+    python benchmarks/analytics_passthrough_benchmark.py --users 10000 --courses 5
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify
+
+from app.utils.export_utils import json_passthrough_response
+
+STATUSES = ('Completed', 'In Progress', 'Not Started')
+
+
+def synthetic_document(users, courses, users_per_batch=200):
+    """JSON text as Postgres produces it for the batch analytics snapshot query (no envelope)"""
+    batches = []
+    for start in range(0, users, users_per_batch):
+        batch_users = []
+        for user_id in range(start + 1, min(start + users_per_batch, users) + 1):
+            batch_users.append({
+                'username': f'user{user_id}@example.com',
+                'initial_assessment': 'completed',
+                'courses': [
+                    {
+                        'course_id': course_id,
+                        'course_name': f'Course {course_id}',
+                        'enrollment_status': 'Enrolled' if (user_id + course_id) % 3 else 'Not Enrolled',
+                        'completion_status': STATUSES[(user_id + course_id) % 3],
+                        'certificate_id': course_id if (user_id + course_id) % 3 == 0 else None,
+                        'validity': 90,
+                        'updated_date': '2024-06-01T10:00:00'
+                    }
+                    for course_id in range(1, courses + 1)
+                ]
+            })
+        batches.append({'batch_id': start // users_per_batch + 1, 'batch_name': f'Batch {start // users_per_batch + 1}', 'users': batch_users})
+    document = {
+        'total_users': users,
+        'total_batches': len(batches),
+        'total_courses': courses,
+        'batches': batches,
+        'refreshed_at': '2024-06-01T10:05:00'
+    }
+    return json.dumps(document)
+
+
+def measure(label, fn, runs):
+    tracemalloc.start()
+    cpu_started = time.process_time()
+    for _ in range(runs):
+        body = fn()
+    cpu_ms = (time.process_time() - cpu_started) / runs * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<26} {cpu_ms:9.1f} ms CPU/request   peak {peak / 1024 / 1024:8.1f} MiB   body {len(body) / 1024 / 1024:.1f} MiB")
+    return cpu_ms, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analytics JSON pass-through benchmark")
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--courses', type=int, default=5)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    raw_json = synthetic_document(args.users, args.courses)
+    print(f"Synthetic document: {args.users} users x {args.courses} courses, {len(raw_json) / 1024 / 1024:.1f} MiB")
+
+    def parse_and_jsonify():
+        with app.app_context():
+            return jsonify({'status': 'success', 'data': json.loads(raw_json)}).get_data()
+
+    def passthrough():
+        with app.app_context():
+            return json_passthrough_response(raw_json).get_data()
+
+    before_cpu, before_peak = measure("json.loads + jsonify", parse_and_jsonify, args.runs)
+    after_cpu, after_peak = measure("pass-through", passthrough, args.runs)
+    print(f"CPU reduction:    {before_cpu / after_cpu:.1f}x")
+    print(f"Memory reduction: {before_peak / after_peak:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
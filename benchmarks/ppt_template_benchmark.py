@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: opening the PPT template per deck vs. the cached template
+
+Compares re-parsing the template file with a linear layout scan (the old
+behaviour) against cloning from the cached template bytes with the
+precomputed layout map, both on their own and as part of a full deck
+build with synthetic course rows.
+
+    python benchmarks/ppt_template_benchmark.py --runs 50
+    python benchmarks/ppt_template_benchmark.py --template templates/lms_template.pptx
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pptx import Presentation
+
+from app.models import ppt_generation_model as ppt
+
+
+def open_uncached(template_path):
+    """Old path: parse the file and scan the layouts on every deck"""
+    prs = Presentation(template_path) if template_path else Presentation()
+    for layout in prs.slide_layouts:
+        if layout.name and ("Title and Content" in layout.name or "Title and Body" in layout.name):
+            return prs, layout
+    return prs, prs.slide_layouts[1]
+
+
+def open_cached(template_path):
+    """New path: clone the cached bytes and use the precomputed layout index"""
+    prs, template = ppt._new_presentation(template_path)
+    return prs, ppt._get_layout(prs, template)
+
+
+def synthetic_rows(sections=6, topics=5):
+    rows = []
+    for sect_id in range(1, sections + 1):
+        for sub_id in range(1, topics + 1):
+            rows.append({
+                'course_id': 1,
+                'course_mastertitle_breakdown_id': sect_id,
+                'course_mastertitle_breakdown': f"Module {sect_id}",
+                'course_subtitle_id': sub_id,
+                'course_subtitle': f"Topic {sect_id}.{sub_id}",
+                'subtitle_content': "\n".join(f"Explanation line {n} for this topic" for n in range(4)),
+                'subtitle_code': "print('hello')\nx = 1\ny = x + 1",
+                'subtitle_help_text': "Practice with the examples above",
+                'helpfull_links': "https://docs.python.org/3/"
+            })
+    return rows
+
+
+def timed(label, fn, runs):
+    fn()  # warm up (fills the template cache on the cached path)
+    started = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    per_call = (time.perf_counter() - started) / runs * 1000
+    print(f"{label:<32} {per_call:8.2f} ms/deck")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PPT template cache benchmark")
+    parser.add_argument('--runs', type=int, default=30)
+    parser.add_argument('--template', default=None, help='Template to benchmark (python-pptx default when omitted)')
+    args = parser.parse_args()
+
+    rows = synthetic_rows()
+    template_path = args.template
+
+    def build_uncached():
+        # Same deck build, but with the template cache dropped before every deck
+        ppt._template_cache.clear()
+        ppt.build_presentation_bytes(1, rows, template_path)
+
+    print(f"Template: {template_path or 'python-pptx default'} | runs: {args.runs}")
+    open_before = timed("open template (uncached)", lambda: open_uncached(template_path), args.runs)
+    open_after = timed("open template (cached)", lambda: open_cached(template_path), args.runs)
+    build_before = timed("full deck (uncached template)", build_uncached, args.runs)
+    build_after = timed("full deck (cached template)", lambda: ppt.build_presentation_bytes(1, rows, template_path), args.runs)
+
+    print(f"Template open speed-up: {open_before / open_after:.2f}x")
+    print(f"Deck build speed-up:    {build_before / build_after:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
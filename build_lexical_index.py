@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Build the BM25 lexical index used by the book chatbot's hybrid retrieval
+
+Without this index (LEXICAL_INDEX_PATH, data/lexical_index.pkl by default)
+retrieval falls back to vector-only results. Either ingest a book, which
+embeds it into Pinecone and adds its chunks to the index, or backfill the
+index from the chunks already stored in Pinecone.
+
+Every worker loads the pickle from LEXICAL_INDEX_PATH and reloads it when
+the file changes, so run this where the workers can read the file (same
+host, a shared volume, or copy it into the image before deploying).
+
+Examples:
+    python build_lexical_index.py --backfill
+    python build_lexical_index.py --ingest books/flim_frame.txt --source "Flim Frame"
+"""
+
+import argparse
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+from app.config.ff_config import LEXICAL_INDEX_PATH
+from app.routes.flim_frame_ai import backfill_lexical_index, get_lexical_index, get_pinecone_index, ingest_book
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the book chatbot's lexical (BM25) index")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--backfill', action='store_true', help='Index every chunk already stored in Pinecone')
+    mode.add_argument('--ingest', metavar='PATH', help='Text file of a book to embed and index')
+    parser.add_argument('--source', help='Book name stored with each chunk (defaults to the file name)')
+    parser.add_argument('--batch-size', type=int, default=100, help='Vectors fetched per Pinecone request (backfill)')
+    args = parser.parse_args()
+
+    index = get_pinecone_index()
+    started = time.perf_counter()
+    if args.backfill:
+        added = backfill_lexical_index(index, batch_size=args.batch_size)
+        print(f"📚 Added {added} chunks from Pinecone")
+    else:
+        with open(args.ingest, encoding='utf-8') as fh:
+            text = fh.read()
+        source = args.source or os.path.splitext(os.path.basename(args.ingest))[0]
+        chunks = ingest_book(index, source, text)
+        print(f"📚 Ingested {chunks} chunks from {source}")
+
+    print(f"💾 {len(get_lexical_index())} chunks in {LEXICAL_INDEX_PATH} ({time.perf_counter() - started:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
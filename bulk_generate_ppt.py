@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Bulk PPT generation for many courses
+
+Reads course content for all requested courses in one query, builds the
+decks in a process pool (python-pptx is CPU bound) and uploads them to S3
+concurrently. Courses whose content hash already has a deck are skipped
+unless --force is given.
+
+Examples:
+    python bulk_generate_ppt.py --course-ids 2 3 4 5
+    python bulk_generate_ppt.py --all --force --build-workers 8
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+from psycopg2.extras import RealDictCursor
+
+from app.utils.db_utils import get_db_connection
+from app.config.database import DB_CONFIG
+from app.models.ppt_generation_model import (
+    build_presentation_bytes,
+    compute_deck_hash,
+    deck_metadata,
+    default_deck_filename,
+    fetch_course_rows_bulk,
+    get_deck_by_hash,
+    record_published_deck,
+    update_course_ppt_url,
+    upload_deck,
+)
+
+
+def get_all_course_ids(conn):
+    """Return every course that has stored content"""
+    with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        cursor.execute("SELECT DISTINCT course_id FROM lms.course_content ORDER BY course_id")
+        return [row['course_id'] for row in cursor.fetchall()]
+
+
+def _build(course_id, rows, template_path, max_slides):
+    """Process pool entry point: build one deck and return its bytes"""
+    return build_presentation_bytes(course_id, rows, template_path, max_slides)
+
+
+def _upload(data, filename, output_dir, metadata):
+    """Thread pool entry point: upload one deck (or write it to output_dir)"""
+    if output_dir:
+        local_path = os.path.join(output_dir, f"{filename}.pptx")
+        with open(local_path, 'wb') as fh:
+            fh.write(data)
+        return local_path
+    # Bulk decks always use content-hashed filenames
+    cloud_url = upload_deck(data, filename, metadata, immutable=True)
+    if not cloud_url:
+        raise RuntimeError("AWS_S3_BUCKET_NAME is not configured")
+    return cloud_url
+
+
+def generate_decks(course_ids, template_path=None, max_slides=30, build_workers=None,
+                   upload_workers=8, force=False, output_dir=None):
+    """
+    Build and publish decks for many courses.
+
+    :return: Dictionary with 'generated', 'reused', 'failed' (course_id -> error), 'elapsed' and 'decks_per_second'
+    """
+    conn = get_db_connection(DB_CONFIG)
+    if not conn:
+        raise RuntimeError("Database connection failed")
+
+    started = time.perf_counter()
+    generated = {}
+    reused = {}
+    failed = {}
+
+    try:
+        if not course_ids:
+            course_ids = get_all_course_ids(conn)
+
+        rows_by_course = fetch_course_rows_bulk(conn, course_ids)
+        print(f"📚 Loaded content for {len(rows_by_course)} of {len(course_ids)} courses")
+        for course_id in course_ids:
+            if course_id not in rows_by_course:
+                failed[course_id] = f"No content found for course_id={course_id}"
+
+        # Work out which decks actually need building
+        pending = {}
+        for course_id, rows in rows_by_course.items():
+            content_hash = compute_deck_hash(rows, template_path, max_slides)
+            if not force and not output_dir:
+                existing_deck = get_deck_by_hash(conn, content_hash)
+                if existing_deck:
+                    update_course_ppt_url(conn, course_id, existing_deck['ppt_url'], only_if_changed=True)
+                    reused[course_id] = existing_deck['ppt_url']
+                    continue
+            pending[course_id] = content_hash
+
+        print(f"🛠️  Building {len(pending)} decks ({len(reused)} unchanged)")
+
+        with ProcessPoolExecutor(max_workers=build_workers) as build_pool, \
+                ThreadPoolExecutor(max_workers=upload_workers, thread_name_prefix='ppt-upload') as upload_pool:
+            build_futures = {
+                build_pool.submit(_build, course_id, rows_by_course[course_id], template_path, max_slides): course_id
+                for course_id in pending
+            }
+            upload_futures = {}
+            for future in as_completed(build_futures):
+                course_id = build_futures[future]
+                try:
+                    data = future.result()
+                except Exception as e:
+                    failed[course_id] = f"build failed: {str(e)}"
+                    continue
+                filename = default_deck_filename(course_id, pending[course_id])
+                upload_futures[upload_pool.submit(
+                    _upload, data, filename, output_dir, deck_metadata(course_id, pending[course_id])
+                )] = course_id
+
+            # Database writes stay on this thread; the connection is not shared with the pools
+            for future in as_completed(upload_futures):
+                course_id = upload_futures[future]
+                try:
+                    location = future.result()
+                except Exception as e:
+                    failed[course_id] = f"upload failed: {str(e)}"
+                    continue
+                if not output_dir:
+                    # One bad row must not abort the rest of the batch
+                    try:
+                        recorded = record_published_deck(conn, course_id, pending[course_id], location)
+                    except Exception as e:
+                        conn.rollback()
+                        failed[course_id] = f"record failed: {str(e)}"
+                        print(f"❌ Course {course_id}: uploaded to {location} but not recorded: {str(e)}")
+                        continue
+                    if not recorded:
+                        failed[course_id] = "record failed: course_master not updated"
+                        continue
+                generated[course_id] = location
+                print(f"✅ Course {course_id}: {location}")
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        'generated': generated,
+        'reused': reused,
+        'failed': failed,
+        'elapsed': elapsed,
+        'decks_per_second': len(generated) / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate course PPT decks in bulk")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--course-ids', type=int, nargs='+', help='Courses to generate decks for')
+    target.add_argument('--all', action='store_true', help='Every course with stored content')
+    parser.add_argument('--template', default=None, help='Path to a .pptx template')
+    parser.add_argument('--max-slides', type=int, default=30)
+    parser.add_argument('--build-workers', type=int, default=os.cpu_count(), help='Processes building decks')
+    parser.add_argument('--upload-workers', type=int, default=8, help='Threads uploading decks')
+    parser.add_argument('--force', action='store_true', help='Rebuild decks even if the content is unchanged')
+    parser.add_argument('--output-dir', default=None, help='Write decks here instead of uploading to S3')
+    args = parser.parse_args()
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    print("🚀 Bulk PPT generation")
+    print("=" * 45)
+    summary = generate_decks(
+        course_ids=None if args.all else args.course_ids,
+        template_path=args.template,
+        max_slides=args.max_slides,
+        build_workers=args.build_workers,
+        upload_workers=args.upload_workers,
+        force=args.force,
+        output_dir=args.output_dir
+    )
+
+    print("=" * 45)
+    print(f"📊 Generated: {len(summary['generated'])} | Unchanged: {len(summary['reused'])} | Failed: {len(summary['failed'])}")
+    print(f"⏱️  {summary['elapsed']:.1f}s ({summary['decks_per_second']:.2f} decks/s)")
+    for course_id, error in sorted(summary['failed'].items()):
+        print(f"❌ Course {course_id}: {error}")
+
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Add the full-text search column and GIN index to lms.jobs_master
+
+Job matching (/api/jobs/<user_id> and the precomputed recommendations) uses
+the stored search_vector column when it exists and the slower inline
+expression otherwise. Workers only check whether the column exists; run this
+once per database, outside request handling, e.g. as a deploy step:
+
+    python create_job_search_index.py
+
+Adding the generated column rewrites jobs_master once (it is locked while
+that happens); the index is then built with CREATE INDEX CONCURRENTLY.
+Running it again is a no-op. Workers pick the column up within
+JOB_SEARCH_INDEX_CHECK_SECONDS.
+"""
+
+import sys
+import time
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+from app.utils.db_utils import get_db_connection
+from app.config.database import DB_CONFIG
+from app.models.jobs_model import create_job_search_index
+
+
+def main():
+    conn = get_db_connection(DB_CONFIG)
+    if not conn:
+        print("❌ Database connection failed")
+        return 1
+
+    started = time.perf_counter()
+    try:
+        create_job_search_index(conn)
+    except Exception as e:
+        print(f"❌ Could not create the job search index: {str(e)}")
+        return 1
+    finally:
+        conn.close()
+    print(f"✅ lms.jobs_master search_vector and GIN index ready ({time.perf_counter() - started:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
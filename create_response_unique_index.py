@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Make initial assessment answers unique per (user_id, question_id)
+
+Saving answers upserts with ON CONFLICT once the unique index exists and
+falls back to UPDATE-then-INSERT otherwise. Workers only check whether the
+index exists; run this once per database, outside request handling, e.g. as
+a deploy step:
+
+    python create_response_unique_index.py
+
+Duplicate answers left by older releases are removed first (one row of each
+user and question is kept; the copies hold the same answer), then the index is built with
+CREATE UNIQUE INDEX CONCURRENTLY. Running it again is a no-op. Workers pick
+the index up within RESPONSE_UNIQUE_INDEX_CHECK_SECONDS.
+"""
+
+import sys
+import time
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+from app.utils.db_utils import get_db_connection
+from app.config.database import DB_CONFIG
+from app.models.initial_assessment_response_model import RESPONSE_UNIQUE_INDEX, create_response_unique_index
+
+
+def main():
+    conn = get_db_connection(DB_CONFIG)
+    if not conn:
+        print("❌ Database connection failed")
+        return 1
+
+    started = time.perf_counter()
+    try:
+        removed = create_response_unique_index(conn)
+    except Exception as e:
+        print(f"❌ Could not create {RESPONSE_UNIQUE_INDEX}: {str(e)}")
+        return 1
+    finally:
+        conn.close()
+    print(f"🧹 Removed {removed} duplicate answers")
+    print(f"✅ lms.{RESPONSE_UNIQUE_INDEX} ready ({time.perf_counter() - started:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
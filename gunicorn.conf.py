@@ -4,10 +4,18 @@ import os
 # Bind to the port provided by environment or default 5000
 bind = f"0.0.0.0:{int(os.getenv('PORT', '5000'))}"
 
+# Profiles:
+#   default   - sync workers with a couple of threads for the CRUD API (main:app)
+#   streaming - cooperative gevent workers for the LLM streaming endpoints (stream_main:app),
+#               so each worker can hold thousands of open streams
+profile = os.getenv("GUNICORN_PROFILE", "default").lower()
+
 # Workers: 2-4 x CPU cores is a common rule of thumb; start conservative
 workers = int(os.getenv("WEB_CONCURRENCY", max(2, multiprocessing.cpu_count())))
 threads = int(os.getenv("GUNICORN_THREADS", 2))
-worker_class = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gevent" if profile == "streaming" else "sync")
+# Max simultaneous clients per worker (only used by async worker classes)
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 1000))
 
 # Timeouts
 timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
@@ -21,3 +29,44 @@ loglevel = os.getenv("GUNICORN_LOGLEVEL", "info")
 # Proxy handling (if running behind a reverse proxy)
 forwarded_allow_ips = "*"
 proxy_protocol = False
+
+
+def post_fork(server, worker):
+    """Make blocking client libraries cooperative under the gevent worker."""
+    if worker_class != "gevent":
+        return
+    try:
+        # psycopg2 waits on the gevent hub instead of blocking the whole worker
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+    except ImportError:
+        server.log.warning("psycogreen not installed; database calls will block the gevent worker")
+    try:
+        # The Gemini SDK streams over gRPC, which needs its gevent integration
+        from grpc.experimental import gevent as grpc_gevent
+        grpc_gevent.init_gevent()
+    except ImportError:
+        pass
+
+
+def post_worker_init(worker):
+    """
+    Warm the book chatbot backends before this worker accepts requests.
+
+    Gunicorn only starts the worker's accept loop after this hook returns, so
+    with FLIM_FRAME_WARMUP=true no worker serves traffic cold. The wait is
+    bounded by FLIM_FRAME_WARMUP_TIMEOUT (kept below the gunicorn timeout);
+    if it runs over, warm-up finishes in the background and that worker's
+    /api/flim-frame/ready reports 503 until it is done.
+    """
+    if os.getenv("FLIM_FRAME_WARMUP", "false").lower() != "true":
+        return
+    from app.routes.flim_frame_ai import start_warm_up
+    warmup_timeout = float(os.getenv("FLIM_FRAME_WARMUP_TIMEOUT", min(30, timeout / 2)))
+    thread = start_warm_up()
+    if thread is not None:
+        thread.join(warmup_timeout)
+    if thread is not None and thread.is_alive():
+        worker.log.warning("Flim-frame warm-up still running after %ss in worker %s", warmup_timeout, worker.pid)
+    else:
+        worker.log.info("Flim-frame warm-up finished in worker %s", worker.pid)
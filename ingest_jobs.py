@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Job ingestion into lms.jobs_master
+
+Parses Naukri search result pages, skips jobs whose apply link is already
+stored, fetches the remaining detail pages concurrently and bulk-loads the
+jobs with COPY. New jobs are added to the precomputed user recommendations.
+
+Search result pages are rendered client-side and --listing-url only does a
+plain HTTP fetch, so it usually finds no job cards. Collect listing pages by
+opening the search in a browser once it has rendered, saving the page
+("Save page as", HTML only) and passing it with --listing-file. Until the
+fetcher can render pages itself, helper/naukriScrapper.py (Selenium) remains
+the way to scrape listings unattended.
+
+Examples:
+    python ingest_jobs.py --listing-url "https://www.naukri.com/python-jobs-in-chennai?jobAge=1"
+    python ingest_jobs.py --listing-file saved/python-chennai.html --workers 16
+"""
+
+import argparse
+import sys
+import time
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+from app.utils.db_utils import get_db_connection
+from app.config.database import DB_CONFIG
+from app.jobs_ingestion.fetcher import fetch_page
+from app.jobs_ingestion.pipeline import JOB_FETCH_WORKERS, ingest_jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest jobs into lms.jobs_master")
+    parser.add_argument('--listing-url', action='append', default=[], help='Search results URL (repeatable)')
+    parser.add_argument('--listing-file', action='append', default=[], help='Saved search results HTML (repeatable)')
+    parser.add_argument('--workers', type=int, default=JOB_FETCH_WORKERS, help='Concurrent detail page fetches')
+    parser.add_argument('--refresh-existing', action='store_true', help='Re-fetch and update jobs already stored')
+    args = parser.parse_args()
+
+    if not args.listing_url and not args.listing_file:
+        parser.error('give at least one --listing-url or --listing-file')
+
+    listing_pages = [fetch_page(url) for url in args.listing_url]
+    for path in args.listing_file:
+        with open(path, encoding='utf-8') as fh:
+            listing_pages.append(fh.read())
+
+    conn = get_db_connection(DB_CONFIG)
+    if not conn:
+        print("❌ Database connection failed")
+        return 1
+
+    print("🚀 Job ingestion")
+    print("=" * 45)
+    started = time.perf_counter()
+    try:
+        summary = ingest_jobs(conn, listing_pages, workers=args.workers, refresh_existing=args.refresh_existing)
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - started
+
+    print("=" * 45)
+    print(f"📊 Listed: {summary['listed']} | Already stored: {summary['skipped']} | Fetched: {summary['fetched']}")
+    print(f"💾 Inserted: {summary['inserted']} | Updated: {summary['updated']} | Users with new matches: {summary['recommendation_users']}")
+    print(f"⏱️  {elapsed:.1f}s")
+    for failure in summary['fetch_failures']:
+        print(f"❌ {failure['url']}: {failure['error']}")
+
+    return 1 if summary['fetch_failures'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
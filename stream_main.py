@@ -0,0 +1,27 @@
+"""
+Streaming entry point.
+
+Serves only the long-lived LLM streaming endpoints (/api/ai/ask,
+/api/flim-frame/ask and the /api/content-generate SSE syllabus stream) so they
+can run under the cooperative gevent worker profile:
+
+    GUNICORN_PROFILE=streaming gunicorn -c gunicorn.conf.py stream_main:app
+
+Plain CRUD routes keep running on the sync workers serving main:app.
+"""
+from app.routes.ai_route import ai_bp
+from app.routes.flim_frame_ai import flim_frame_bp
+from app.routes.content_generate_route import content_generate_bp
+from flask import Flask
+from app.config.cors_config import configure_cors
+
+app = Flask(__name__)
+configure_cors(app)
+
+# Register streaming blueprints
+app.register_blueprint(ai_bp)
+app.register_blueprint(flim_frame_bp)
+app.register_blueprint(content_generate_bp)
+
+if __name__ == '__main__':
+    app.run(host="0.0.0.0", port=5001, debug=True)
@@ -0,0 +1,92 @@
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("pinecone")
+
+from app.routes import flim_frame_ai
+from app.routes.flim_frame_ai import _remove_window_overlap, _trim_to_sentence, build_context
+
+SHARED = "The shared window repeats this sentence."
+
+
+def _chunk(chunk_id, score, text, **meta):
+    return ({"source": "book", "chunk_id": chunk_id, "text": text, **meta}, score, text)
+
+
+@pytest.fixture(autouse=True)
+def threshold(monkeypatch):
+    monkeypatch.setattr(flim_frame_ai, "SIMILARITY_THRESHOLD", 0.3)
+
+
+def test_chunks_below_threshold_are_dropped_except_best_and_lexical_hits():
+    context, stats = build_context([
+        _chunk("c1", 0.25, "Best chunk even though it is weak."),
+        _chunk("c2", 0.20, "Weak chunk that should be dropped."),
+        _chunk("c3", 0.10, "Exact term match from the lexical index.", lexical_rank=1),
+    ])
+
+    assert "Best chunk" in context
+    assert "Exact term match" in context
+    assert "Weak chunk" not in context
+    assert stats["chunks_below_threshold"] == 1
+    assert stats["chunks_used"] == 2
+
+
+def test_chunk_following_kept_text_loses_its_head_overlap():
+    kept = "First part of the chapter. " + SHARED
+    chunk = SHARED + " Second part of the chapter."
+
+    assert _remove_window_overlap(kept, chunk) == "Second part of the chapter."
+
+
+def test_chunk_preceding_kept_text_loses_its_tail_overlap():
+    kept = SHARED + " Second part of the chapter."
+    chunk = "First part of the chapter. " + SHARED
+
+    assert _remove_window_overlap(kept, chunk) == "First part of the chapter."
+
+
+def test_contained_or_unrelated_chunks():
+    kept = "First part of the chapter. " + SHARED
+
+    assert _remove_window_overlap(kept, SHARED) == ""
+    assert _remove_window_overlap(kept, "Nothing in common here.") == "Nothing in common here."
+
+
+def test_overlapping_windows_are_deduplicated_in_context():
+    context, stats = build_context([
+        _chunk("c1", 0.9, "First part of the chapter. " + SHARED),
+        _chunk("c2", 0.8, SHARED + " Second part of the chapter."),
+        _chunk("c3", 0.7, SHARED),
+    ])
+
+    assert context.count(SHARED) == 1
+    assert "Second part of the chapter." in context
+    assert stats["chunks_used"] == 2
+    assert stats["chunks_deduplicated"] == 1
+
+
+def test_trim_to_sentence():
+    text = "One. Two! Three?"
+
+    assert _trim_to_sentence(text, 100) == text
+    assert _trim_to_sentence(text, 10) == "One. Two!"
+    assert _trim_to_sentence(text, 3) == ""
+    assert _trim_to_sentence(text, 0) == ""
+
+
+def test_last_chunk_is_trimmed_at_a_sentence_when_budget_runs_out():
+    text = "Short opening sentence. " + "This sentence is far too long to fit in the remaining budget. " * 5
+
+    context, stats = build_context([_chunk("c1", 0.9, text)], token_budget=30)
+
+    assert stats["chunks_trimmed"] == 1
+    assert stats["context_tokens"] <= 30
+    assert context.rstrip().endswith("Short opening sentence.")
+
+
+def test_chunk_with_no_sentence_in_budget_is_dropped():
+    context, stats = build_context([_chunk("c1", 0.9, "x" * 500)], token_budget=20)
+
+    assert context == ""
+    assert stats["chunks_used"] == 0
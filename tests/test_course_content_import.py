@@ -0,0 +1,110 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("psycopg2")
+
+from app.models.course_model import validate_course_content_frame
+
+
+class _Cursor:
+    def __init__(self, known_courses):
+        self.known_courses = known_courses
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params):
+        self.rows = [(course_id,) for course_id in params[0] if course_id in self.known_courses]
+
+    def fetchall(self):
+        return self.rows
+
+
+class _Connection:
+    def __init__(self, known_courses):
+        self.known_courses = known_courses
+
+    def cursor(self):
+        return _Cursor(self.known_courses)
+
+
+def test_validation_reports_each_bad_row():
+    df = pd.DataFrame({
+        'course_id': [1, 1, None, 1, 9],
+        'course_mastertitle_breakdown_id': [1, 1, 1, 2, 1],
+        'course_subtitle_id': [1, 1, 1, 'x', 1],
+        'course_subtitle': ['Intro', 'Intro again', 'No course', 'Bad id', 'Unknown course'],
+    })
+    valid, errors = validate_course_content_frame(_Connection({1}), df)
+
+    assert list(valid['row_num']) == [1]
+    assert valid['course_subtitle'].tolist() == ['Intro']
+    assert [error['row'] for error in errors] == [2, 3, 4, 5]
+    assert errors[0]['error'].startswith('Duplicate')
+    assert errors[1]['error'] == 'Missing or invalid course_id'
+    assert errors[2]['error'] == 'Missing or invalid course_subtitle_id'
+    assert errors[3]['error'] == 'Course ID 9 does not exist'
+
+
+def test_titles_longer_than_column_are_rejected():
+    df = pd.DataFrame({
+        'course_id': [1],
+        'course_mastertitle_breakdown_id': [1],
+        'course_subtitle_id': [1],
+        'course_subtitle': ['x' * 101],
+    })
+    valid, errors = validate_course_content_frame(_Connection({1}), df, row_offset=10)
+    assert valid.empty
+    assert errors == [{'row': 11, 'error': 'course_subtitle is longer than 100 characters'}]
+
+
+def test_csv_upload_is_read_in_fixed_size_chunks(tmp_path):
+    pytest.importorskip("openpyxl")
+    from app.models.course_content_import_model import iter_upload_chunks
+
+    path = tmp_path / 'content.csv'
+    lines = ['course_id,course_mastertitle_breakdown_id,course_subtitle_id,course_subtitle']
+    lines += [f'1,1,{n},Topic {n}' for n in range(1, 8)]
+    lines.insert(4, ',,,')  # blank rows are skipped
+    path.write_text('\n'.join(lines) + '\n')
+
+    chunks = list(iter_upload_chunks(str(path), 'csv', chunk_rows=3))
+
+    assert [len(df) for df, _, _ in chunks] == [3, 3, 1]
+    # Row numbers are the file's, so the blank row leaves a gap
+    assert [rows for _, rows, _ in chunks] == [[1, 2, 3], [5, 6, 7], [8]]
+    assert list(chunks[-1][0]['course_subtitle']) == ['Topic 7']
+
+
+def test_chunk_errors_point_at_source_rows(tmp_path):
+    pytest.importorskip("openpyxl")
+    from app.models.course_content_import_model import iter_upload_chunks
+
+    path = tmp_path / 'content.csv'
+    path.write_text(
+        'course_id,course_mastertitle_breakdown_id,course_subtitle_id,course_subtitle\n'
+        '1,1,1,Intro\n'
+        ',,,\n'
+        '\n'
+        '1,1,x,Bad id\n'
+    )
+    (chunk_df, row_numbers, _), = iter_upload_chunks(str(path), 'csv')
+    valid, errors = validate_course_content_frame(_Connection({1}), chunk_df, row_numbers=row_numbers)
+
+    assert list(valid['row_num']) == [1]
+    assert errors == [{'row': 4, 'error': 'Missing or invalid course_subtitle_id'}]
+
+
+def test_stream_import_rejects_missing_columns(tmp_path):
+    pytest.importorskip("openpyxl")
+    from app.models.course_content_import_model import iter_upload_chunks
+
+    path = tmp_path / 'content.csv'
+    path.write_text('course_id,course_subtitle\n1,Intro\n')
+
+    with pytest.raises(ValueError, match='Missing required columns'):
+        list(iter_upload_chunks(str(path), 'csv'))
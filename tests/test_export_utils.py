@@ -0,0 +1,33 @@
+import csv
+import datetime
+import io
+import json
+
+import pytest
+
+pytest.importorskip("flask")
+
+from app.utils.export_utils import csv_chunks, ndjson_chunks
+
+ROWS = [
+    {'user_id': n, 'username': f'user{n}', 'updated_date': datetime.date(2024, 1, 1)}
+    for n in range(1, 1206)
+]
+
+
+def test_ndjson_is_streamed_in_chunks():
+    chunks = list(ndjson_chunks(iter(ROWS), chunk_rows=500))
+    assert len(chunks) == 3
+    lines = ''.join(chunks).splitlines()
+    assert len(lines) == len(ROWS)
+    assert json.loads(lines[0]) == {'user_id': 1, 'username': 'user1', 'updated_date': '2024-01-01'}
+
+
+def test_csv_has_header_and_every_row():
+    columns = ('user_id', 'username')
+    chunks = list(csv_chunks(iter(ROWS), columns, chunk_rows=500))
+    assert len(chunks) > 1
+    parsed = list(csv.reader(io.StringIO(''.join(chunks))))
+    assert parsed[0] == list(columns)
+    assert len(parsed) == len(ROWS) + 1
+    assert parsed[-1] == ['1205', 'user1205']
@@ -0,0 +1,134 @@
+import pytest
+
+flask = pytest.importorskip("flask")
+pytest.importorskip("psycopg2")
+
+from app.models import initial_assessment_response_model as response_model
+from app.routes import initial_assessment_response_route as response_route
+
+
+class _Cursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.row = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.row = (1,) if 'FROM lms.users' in query and params[0] in self.conn.users else None
+
+    def fetchone(self):
+        return self.row
+
+
+class _Connection:
+    def __init__(self, users):
+        self.users = users
+        self.committed = False
+
+    def cursor(self):
+        return _Cursor(self)
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def client(monkeypatch):
+    conn = _Connection(users={1})
+    saved = []
+    monkeypatch.setattr(response_route, 'get_db_connection', lambda config: conn)
+    monkeypatch.setattr(response_model, '_unique_index_ready', True)
+    monkeypatch.setattr(
+        response_model, 'execute_values',
+        lambda cursor, query, rows, **kwargs: saved.append(list(rows))
+    )
+    app = flask.Flask(__name__)
+    app.register_blueprint(response_route.initial_assessment_responses_bp)
+    with app.test_client() as test_client:
+        test_client.saved = saved
+        test_client.conn = conn
+        yield test_client
+
+
+def _post(client, body):
+    return client.post('/api/initial_assessment_responses', json=body)
+
+
+def test_batch_is_saved_once_and_last_answer_wins(client):
+    response = _post(client, {'user_id': 1, 'tab_id': 2, 'responses': [
+        {'question_id': 5, 'selected_option_id': 17},
+        {'question_id': 6, 'selected_option_id': 20, 'tab_id': 3},
+        {'question_id': '5', 'selected_option_id': '18'},
+    ]})
+
+    assert response.status_code == 200
+    assert response.get_json()['saved'] == 2
+    assert client.saved == [[(1, 5, 18, 2), (1, 6, 20, 3)]]
+    assert client.conn.committed
+
+
+def test_unknown_user_is_not_found(client):
+    response = _post(client, {'user_id': 99, 'tab_id': 2, 'responses': [{'question_id': 5, 'selected_option_id': 17}]})
+
+    assert response.status_code == 404
+    assert client.saved == []
+
+
+@pytest.mark.parametrize('body', [
+    {'user_id': 1, 'tab_id': 2, 'responses': []},
+    {'user_id': 'abc', 'tab_id': 2, 'responses': [{'question_id': 5, 'selected_option_id': 17}]},
+    {'user_id': 1, 'tab_id': 2, 'responses': [{'question_id': 'five', 'selected_option_id': 17}]},
+    {'user_id': 1, 'tab_id': 2, 'responses': [{'question_id': 5, 'selected_option_id': 1.5}]},
+    {'user_id': 1, 'responses': [{'question_id': 5, 'selected_option_id': 17}]},
+    {'user_id': 1, 'tab_id': 2, 'responses': ['5']},
+    {'user_id': 1, 'tab_id': 2, 'responses': [{'question_id': n, 'selected_option_id': 1} for n in range(1, 502)]},
+])
+def test_invalid_batches_are_rejected(client, body):
+    response = _post(client, body)
+
+    assert response.status_code == 400
+    assert client.saved == []
+
+
+def test_missing_unique_index_is_only_looked_up(monkeypatch):
+    queries = []
+    catalog = {'row': None}
+
+    class CatalogCursor(_Cursor):
+        def execute(self, query, params=None):
+            queries.append(query)
+
+        def fetchone(self):
+            return catalog['row']
+
+    class CatalogConnection(_Connection):
+        def cursor(self):
+            return CatalogCursor(self)
+
+    clock = [1000.0]
+    monkeypatch.setattr(response_model.time, 'time', lambda: clock[0])
+    monkeypatch.setattr(response_model, '_unique_index_ready', None)
+    monkeypatch.setattr(response_model, '_unique_index_checked_at', 0.0)
+    conn = CatalogConnection(users=set())
+
+    assert response_model.has_response_unique_index(conn) is False
+    assert response_model.has_response_unique_index(conn) is False
+    assert len(queries) == 1
+
+    # create_response_unique_index.py has run in the meantime
+    catalog['row'] = (True,)
+    clock[0] += response_model.RESPONSE_UNIQUE_INDEX_CHECK_SECONDS
+    assert response_model.has_response_unique_index(conn) is True
+    assert len(queries) == 2
+    assert all(query.lstrip().startswith('SELECT') for query in queries)
@@ -0,0 +1,93 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("psycopg2")
+
+from app.models.initial_assessment_model import DEFAULT_RUBRIC, build_rubric, compute_scores
+
+
+def _default_rubric():
+    return build_rubric(
+        [(column, rule['min_raw'], rule['max_raw']) for column, rule in DEFAULT_RUBRIC.items()],
+        [(column, question_id) for column, rule in DEFAULT_RUBRIC.items() for question_id in rule['questions']]
+    )
+
+
+def _reference_score(answers, column):
+    """The formula the SQL scoring used: clip(50 + (raw - min) * 50 / (max - min), 50, 100)"""
+    rule = DEFAULT_RUBRIC[column]
+    raw = sum(score for question_id, score in answers.items() if question_id in rule['questions'])
+    return min(100, max(50, 50 + (raw - rule['min_raw']) * 50 / (rule['max_raw'] - rule['min_raw'])))
+
+
+def test_bulk_scores_match_the_original_formula():
+    rubric = _default_rubric()
+    answers = {
+        7: {question_id: (question_id % 4) + 1 for question_id in range(1, 26)},
+        3: {question_id: 4 for question_id in range(1, 26)},
+        9: {12: 1, 21: 2, 99: 4},  # question 99 is in no category
+    }
+    users, questions, values = [], [], []
+    for user_id, user_answers in answers.items():
+        for question_id, score in user_answers.items():
+            users.append(user_id)
+            questions.append(question_id)
+            values.append(score)
+
+    user_ids = [3, 7, 9, 11]  # user 11 has no responses
+    scores = compute_scores(rubric, user_ids, users, questions, values)
+
+    for row, user_id in enumerate(user_ids[:3]):
+        for col, column in enumerate(rubric['columns']):
+            assert scores[row, col] == pytest.approx(_reference_score(answers[user_id], column))
+    assert np.isnan(scores[3]).all()
+
+
+def test_question_can_count_towards_several_categories():
+    rubric = _default_rubric()
+    scores = compute_scores(rubric, [1], [1], [21], [4])
+    columns = rubric['columns']
+
+    # Question 21 feeds both tech_skill and interests
+    assert scores[0, columns.index('tech_skill')] == pytest.approx(50)
+    assert scores[0, columns.index('interests')] == pytest.approx(50)
+    scores = compute_scores(rubric, [1], [1] * 5, [4, 6, 7, 9, 21], [4] * 5)
+    assert scores[0, columns.index('interests')] == pytest.approx(100)
+
+
+class _SeedCursor:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query):
+        pass
+
+
+class _SeedConnection:
+    def cursor(self):
+        return _SeedCursor()
+
+    def commit(self):
+        pass
+
+
+@pytest.mark.parametrize('table_empty', [True, False])
+def test_rubric_is_seeded_only_into_an_empty_table(monkeypatch, table_empty):
+    from app.models import initial_assessment_model
+
+    statements = []
+
+    def fake_execute_values(cursor, query, rows, fetch=False, **kwargs):
+        statements.append(query)
+        if fetch:
+            return [(row[0],) for row in rows] if table_empty else []
+
+    monkeypatch.setattr(initial_assessment_model, 'execute_values', fake_execute_values)
+    monkeypatch.setattr(initial_assessment_model, '_tables_ready', False)
+    initial_assessment_model.ensure_rubric_tables(_SeedConnection())
+
+    assert 'WHERE NOT EXISTS' in statements[0]
+    assert len(statements) == (2 if table_empty else 1)
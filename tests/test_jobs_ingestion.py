@@ -0,0 +1,107 @@
+import os
+
+import pytest
+
+pytest.importorskip("bs4")
+
+from app.jobs_ingestion.parser import parse_job_description, parse_job_listings
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'jobs')
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as fh:
+        return fh.read()
+
+
+def _fetch_fixture(url):
+    """Serve detail pages from the saved fixtures instead of the network"""
+    return _fixture(f"detail_{url.rsplit('-', 1)[-1]}.html")
+
+
+def test_listing_page_is_parsed():
+    jobs = parse_job_listings(_fixture('listing.html'))
+
+    assert len(jobs) == 3
+    assert jobs[0] == {
+        'title': 'Python Developer',
+        'company': 'Acme Software',
+        'salary': '3-5 Lacs PA',
+        'location': 'Chennai',
+        'skills': ['Python', 'Django', 'SQL'],
+        'url': 'https://www.naukri.com/job-listings-python-developer-acme-chennai-101'
+    }
+    assert jobs[1]['salary'] == 'Not Disclosed'
+    assert jobs[1]['url'] == 'https://www.naukri.com/job-listings-qa-engineer-globex-chennai-102'
+
+
+def test_description_is_extracted():
+    description = parse_job_description(_fixture('detail_101.html'))
+
+    assert description.splitlines() == [
+        'We are hiring a Python developer.',
+        'Build REST APIs with Django',
+        'Write SQL for PostgreSQL'
+    ]
+    assert parse_job_description('<html><body><p>Removed</p></body></html>') is None
+
+
+def test_seen_jobs_are_skipped_and_details_fetched_concurrently():
+    pytest.importorskip("requests")
+    pytest.importorskip("psycopg2")
+    from app.jobs_ingestion.pipeline import fetch_descriptions, select_new_jobs
+
+    listed = parse_job_listings(_fixture('listing.html'))
+    seen = {'https://www.naukri.com/job-listings-qa-engineer-globex-chennai-102'}
+    jobs = select_new_jobs(listed, seen)
+
+    # The QA job is already stored and the third card repeats the first
+    assert [job['url'] for job in jobs] == ['https://www.naukri.com/job-listings-python-developer-acme-chennai-101']
+
+    failures = fetch_descriptions(jobs + [{'url': 'https://www.naukri.com/job-listings-gone-999'}], _fetch_fixture, workers=4)
+    assert jobs[0]['description'].startswith('We are hiring a Python developer.')
+    assert [failure['url'] for failure in failures] == ['https://www.naukri.com/job-listings-gone-999']
+
+
+@pytest.mark.parametrize('broken_page', [None, 'detail_103.html'])
+def test_failed_fetches_are_not_stored(monkeypatch, broken_page):
+    pytest.importorskip("requests")
+    pytest.importorskip("psycopg2")
+    from app.jobs_ingestion import pipeline
+
+    stored = []
+    monkeypatch.setattr(pipeline, 'load_seen_urls', lambda conn: set())
+    monkeypatch.setattr(pipeline, 'upsert_jobs', lambda conn, jobs: stored.extend(jobs) or {'inserted_ids': [], 'updated_rows': 0})
+
+    def flaky_fetch(url):
+        if url.endswith('-102'):
+            if broken_page is None:
+                raise IOError('timed out')
+            return _fixture(broken_page)
+        return _fetch_fixture(url)
+
+    summary = pipeline.ingest_jobs(None, [_fixture('listing.html')], fetch=flaky_fetch, workers=2)
+
+    # The QA job is neither stored nor remembered as seen, so the next run retries it
+    assert [job['url'] for job in stored] == ['https://www.naukri.com/job-listings-python-developer-acme-chennai-101']
+    assert [failure['url'] for failure in summary['fetch_failures']] == [
+        'https://www.naukri.com/job-listings-qa-engineer-globex-chennai-102'
+    ]
+    assert summary['fetched'] == 1
+
+
+def test_detail_page_without_description_is_a_failure():
+    pytest.importorskip("requests")
+    pytest.importorskip("psycopg2")
+    from app.jobs_ingestion.pipeline import fetch_descriptions
+
+    # detail_103.html is a captcha page: fetched fine, but no description block
+    jobs = [{'url': 'https://www.naukri.com/job-listings-python-developer-acme-chennai-101'},
+            {'url': 'https://www.naukri.com/job-listings-data-analyst-initech-chennai-103'}]
+    failures = fetch_descriptions(jobs, _fetch_fixture, workers=2)
+
+    assert failures == [{
+        'url': 'https://www.naukri.com/job-listings-data-analyst-initech-chennai-103',
+        'error': 'No job description found on the detail page'
+    }]
+    assert jobs[1]['description'] is None
@@ -0,0 +1,70 @@
+import math
+
+import pytest
+
+from app.utils.lexical_index import LexicalIndex, chunk_key, reciprocal_rank_fusion, tokenize
+
+
+def _meta(chunk_id, text):
+    return {"source": "book", "chunk_id": chunk_id, "text": text}
+
+
+def _index(docs):
+    index = LexicalIndex()
+    index.add_many((chunk_key(_meta(chunk_id, text)), text, _meta(chunk_id, text)) for chunk_id, text in docs)
+    return index
+
+
+def test_tokenize_keeps_identifiers_and_drops_stop_words():
+    assert tokenize("How is os.path.join used in the_loop?") == ["os.path.join", "used", "the_loop"]
+
+
+def test_bm25_scores_match_the_formula():
+    index = _index([
+        ("c1", "frodo carries the ring"),
+        ("c2", "sam cooks potatoes"),
+        ("c3", "frodo frodo and sam"),
+    ])
+
+    results = index.search("frodo", top_k=5)
+
+    # df = 2 of 3 docs; every doc has 3 terms after stop words
+    idf = math.log(1.0 + (3 - 2 + 0.5) / (2 + 0.5))
+
+    def bm25(tf, length, avg=3.0, k1=1.2, b=0.75):
+        return idf * tf * (k1 + 1.0) / (tf + k1 * (1.0 - b + b * length / avg))
+
+    assert [meta["chunk_id"] for meta, _, _ in results] == ["c3", "c1"]
+    assert results[0][1] == pytest.approx(bm25(2, 3))
+    assert results[1][1] == pytest.approx(bm25(1, 3))
+    assert results[0][2] == "frodo frodo and sam"
+
+
+def test_duplicate_keys_are_not_indexed_twice_and_survive_save(tmp_path):
+    index = _index([("c1", "gandalf the grey")])
+    assert index.add(chunk_key(_meta("c1", "x")), "gandalf again", _meta("c1", "x")) is False
+
+    path = tmp_path / "lexical_index.pkl"
+    index.save(str(path))
+    loaded = LexicalIndex.load(str(path))
+
+    assert len(loaded) == 1
+    assert loaded.search("gandalf")[0][0]["chunk_id"] == "c1"
+    assert len(LexicalIndex.load(str(tmp_path / "missing.pkl"))) == 0
+
+
+def test_reciprocal_rank_fusion_merges_and_ranks():
+    vector = [(_meta("a", "A"), 0.9, "A"), (_meta("b", "B"), 0.8, "B")]
+    lexical = [(_meta("b", "B"), 7.0, "B"), (_meta("c", "C"), 5.0, "C")]
+
+    fused = reciprocal_rank_fusion(vector, lexical, k=60, top_k=3)
+
+    assert [meta["chunk_id"] for meta, _, _ in fused] == ["b", "a", "c"]
+    b_meta, b_score, _ = fused[0]
+    assert b_meta["rrf_score"] == pytest.approx(1 / 62 + 1 / 61)
+    assert (b_meta["vector_rank"], b_meta["lexical_rank"]) == (2, 1)
+    # Vector similarity is kept as the score; lexical-only hits score 0.0
+    assert b_score == 0.8
+    assert fused[2][1] == 0.0
+    assert "vector_rank" not in fused[2][0]
+
@@ -0,0 +1,71 @@
+import pytest
+
+from app.utils.pagination import (
+    decode_cursor,
+    encode_cursor,
+    parse_analytics_page_args,
+    parse_page_cursor,
+    parse_page_limit,
+    wants_analytics_page,
+)
+
+
+def test_cursor_round_trip():
+    values = {'page_by': 'user', 'batch': 3, 'user': 1042}
+    cursor = encode_cursor(values)
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == values
+
+
+def test_malformed_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor!')
+
+
+def test_full_document_without_page_params():
+    assert not wants_analytics_page({})
+    assert wants_analytics_page({'summary': 'true'})
+
+
+def test_parse_defaults_and_filters():
+    page = parse_analytics_page_args({'batch_id': '7', 'completion_status': 'Completed'})
+    assert page['page_by'] == 'batch'
+    assert page['summary'] is False
+    assert page['cursor'] is None
+    assert page['filters'] == {'batch_id': 7, 'completion_status': 'Completed'}
+
+
+@pytest.mark.parametrize('args', [
+    {'page_by': 'course'},
+    {'limit': '0'},
+    {'limit': 'many'},
+    {'course_id': 'abc'},
+    {'completion_status': 'Done'},
+    {'page_by': 'batch', 'cursor': encode_cursor({'page_by': 'user', 'batch': 1, 'user': 2})},
+    {'page_by': 'user', 'cursor': encode_cursor({'page_by': 'user', 'batch': 1})},
+    {'page_by': 'user', 'cursor': encode_cursor({'page_by': 'user', 'user': 2})},
+    {'page_by': 'user', 'cursor': encode_cursor({'page_by': 'user', 'batch': '1', 'user': 2})},
+    {'page_by': 'batch', 'cursor': encode_cursor({'page_by': 'batch'})},
+    {'page_by': 'batch', 'cursor': encode_cursor({'page_by': 'batch', 'batch': None})},
+])
+def test_parse_rejects_bad_input(args):
+    with pytest.raises(ValueError):
+        parse_analytics_page_args(args)
+
+
+def test_page_limit_and_cursor_helpers():
+    assert parse_page_limit({}) == 50
+    assert parse_page_limit({'limit': '10'}) == 10
+    assert parse_page_cursor({}) is None
+    assert parse_page_cursor({'cursor': encode_cursor({'job': 7})}) == {'job': 7}
+    with pytest.raises(ValueError):
+        parse_page_limit({'limit': '0'})
+
+
+def test_well_formed_cursors_are_accepted():
+    user_cursor = {'page_by': 'user', 'batch': 3, 'user': 1042}
+    page = parse_analytics_page_args({'page_by': 'user', 'cursor': encode_cursor(user_cursor)})
+    assert page['cursor'] == user_cursor
+
+    page = parse_analytics_page_args({'cursor': encode_cursor({'page_by': 'batch', 'batch': 3})})
+    assert page['cursor'] == {'page_by': 'batch', 'batch': 3}
@@ -0,0 +1,30 @@
+import pytest
+
+pytest.importorskip("psycopg2")
+
+from app.models.qc_batch_model import parse_qc_user_courses
+
+
+def test_string_ids_are_converted_to_int():
+    user_rows, course_rows, errors = parse_qc_user_courses([
+        {'user_id': '12', 'courses': [{'course_id': '3', 'validity_days': '30'}, {'course_id': 4, 'validity_days': 7}]},
+        {'user_id': 13, 'courses': [{'course_id': 3, 'validity_days': 30.0}]},
+    ])
+
+    assert errors == []
+    assert user_rows == [12, 13]
+    assert course_rows == [(12, 3, 30), (12, 4, 7), (13, 3, 30)]
+
+
+@pytest.mark.parametrize('user_courses', [
+    'not a list',
+    ['12'],
+    [{'user_id': 'abc', 'courses': [{'course_id': 3, 'validity_days': 30}]}],
+    [{'user_id': 12, 'courses': []}],
+    [{'user_id': 12, 'courses': [{'course_id': 3, 'validity_days': 0}]}],
+    [{'user_id': 12, 'courses': [{'course_id': 3.5, 'validity_days': 30}]}],
+    [{'user_id': True, 'courses': [{'course_id': 3, 'validity_days': 30}]}],
+])
+def test_malformed_rows_are_reported(user_courses):
+    _, _, errors = parse_qc_user_courses(user_courses)
+    assert errors
@@ -0,0 +1,132 @@
+import io
+
+import pytest
+
+boto3 = pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+pytest.importorskip("pptx")
+pytest.importorskip("psycopg2")
+
+from app.utils import s3_utils
+from app.models import ppt_generation_model
+
+BUCKET = "lms-test-presentations"
+
+# moto >= 5 exposes a single mock_aws; older releases use per-service mocks
+mock_aws = getattr(moto, "mock_aws", None) or moto.mock_s3
+
+
+@pytest.fixture
+def s3_bucket(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_REGION", "us-east-1")
+    monkeypatch.delenv("AWS_S3_ENDPOINT_URL", raising=False)
+    with mock_aws():
+        s3_utils.reset_s3_client()
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+        s3_utils.reset_s3_client()
+
+
+def test_s3_client_is_cached_per_worker(s3_bucket):
+    assert s3_utils.get_s3_client() is s3_utils.get_s3_client()
+
+
+def test_s3_client_uses_pool_and_retry_config(s3_bucket):
+    config = s3_utils.get_s3_client().meta.config
+    assert config.max_pool_connections == s3_utils.S3_MAX_POOL_CONNECTIONS
+    assert config.retries["total_max_attempts"] == s3_utils.S3_MAX_ATTEMPTS
+
+
+def test_s3_client_requires_credentials(monkeypatch):
+    monkeypatch.delenv("AWS_ACCESS_KEY_ID", raising=False)
+    monkeypatch.delenv("AWS_SECRET_ACCESS_KEY", raising=False)
+    s3_utils.reset_s3_client()
+    with pytest.raises(ValueError):
+        s3_utils.get_s3_client()
+
+
+def test_uploads_share_one_client(s3_bucket, monkeypatch):
+    created = []
+    real_client = boto3.client
+
+    def counting_client(*args, **kwargs):
+        created.append(args)
+        return real_client(*args, **kwargs)
+
+    monkeypatch.setattr(s3_utils.boto3, "client", counting_client)
+
+    for n in range(3):
+        url = ppt_generation_model.upload_fileobj_to_s3(
+            io.BytesIO(f"deck-{n}".encode()), BUCKET, f"presentations/deck_{n}.pptx"
+        )
+        assert url == f"https://{BUCKET}.s3.us-east-1.amazonaws.com/presentations/deck_{n}.pptx"
+
+    assert len(created) == 1
+
+    obj = s3_bucket.get_object(Bucket=BUCKET, Key="presentations/deck_2.pptx")
+    assert obj["Body"].read() == b"deck-2"
+    assert obj["ContentType"] == ppt_generation_model.PPTX_CONTENT_TYPE
+
+
+def test_uploads_are_cacheable_and_carry_metadata(s3_bucket):
+    ppt_generation_model.upload_fileobj_to_s3(
+        io.BytesIO(b"deck"), BUCKET, "presentations/course_1_presentation_abc.pptx",
+        metadata={"course-id": "1", "content-hash": "abc"}, immutable=True
+    )
+    head = s3_bucket.head_object(Bucket=BUCKET, Key="presentations/course_1_presentation_abc.pptx")
+    assert head["CacheControl"] == s3_utils.S3_IMMUTABLE_CACHE_CONTROL
+    assert head["Metadata"] == {"course-id": "1", "content-hash": "abc"}
+
+
+def test_custom_keys_are_not_cached_forever(s3_bucket):
+    ppt_generation_model.upload_fileobj_to_s3(io.BytesIO(b"deck"), BUCKET, "presentations/my_deck.pptx")
+    head = s3_bucket.head_object(Bucket=BUCKET, Key="presentations/my_deck.pptx")
+    assert "CacheControl" not in head
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://bucket.s3.us-east-1.amazonaws.com/presentations/a%20b.pptx", ("bucket", "presentations/a b.pptx")),
+    ("https://bucket.s3.amazonaws.com/ebooks/book.pdf", ("bucket", "ebooks/book.pdf")),
+    ("https://s3.eu-west-1.amazonaws.com/bucket/ebooks/book.pdf", ("bucket", "ebooks/book.pdf")),
+    ("s3://bucket/key.pdf", ("bucket", "key.pdf")),
+    ("https://drive.google.com/file/d/123", None),
+    (None, None),
+])
+def test_parse_s3_url(url, expected):
+    assert s3_utils.parse_s3_url(url) == expected
+
+
+def test_presigned_urls_are_reused_until_half_expiry(s3_bucket):
+    url = f"https://{BUCKET}.s3.us-east-1.amazonaws.com/presentations/deck.pptx"
+    signed, expires_at = s3_utils.presign_url(url, expires_in=600)
+    assert "Signature" in signed or "X-Amz-Signature" in signed
+    assert expires_at is not None
+    assert s3_utils.presign_url(url, expires_in=600) == (signed, expires_at)
+
+
+def test_non_s3_urls_are_not_signed():
+    assert s3_utils.presign_url("https://example.com/book.pdf") == ("https://example.com/book.pdf", None)
+
+
+def test_presigned_cache_is_bounded(s3_bucket, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(s3_utils.time, "time", lambda: clock[0])
+    monkeypatch.setattr(s3_utils, "S3_PRESIGNED_CACHE_MAX_ENTRIES", 3)
+    urls = [f"https://{BUCKET}.s3.us-east-1.amazonaws.com/presentations/deck_{n}.pptx" for n in range(5)]
+
+    s3_utils.presign_url(urls[0], expires_in=600)
+    clock[0] += 300  # deck_0 is now due for refresh
+    for url in urls[1:3]:
+        s3_utils.presign_url(url, expires_in=600)
+    s3_utils.presign_url(urls[3], expires_in=600)
+
+    cached = {key[0][1] for key in s3_utils._presigned_cache}
+    assert cached == {"presentations/deck_1.pptx", "presentations/deck_2.pptx", "presentations/deck_3.pptx"}
+
+    s3_utils.presign_url(urls[4], expires_in=600)
+
+    cached = {key[0][1] for key in s3_utils._presigned_cache}
+    assert cached == {"presentations/deck_2.pptx", "presentations/deck_3.pptx", "presentations/deck_4.pptx"}
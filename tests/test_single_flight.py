@@ -0,0 +1,151 @@
+import threading
+import time
+
+from app.utils.single_flight import StreamCoalescer, normalize_question
+
+TIMEOUT = 5
+
+
+class _FakeUpstream:
+    """Upstream generator that yields the first chunk, then waits to be released."""
+
+    def __init__(self, chunks, error=None):
+        self.chunks = chunks
+        self.error = error
+        self.release = threading.Event()
+        self.calls = 0
+
+    def start(self, info):
+        self.calls += 1
+        info['model'] = 'fake'
+        return self._generate()
+
+    def _generate(self):
+        yield self.chunks[0]
+        assert self.release.wait(TIMEOUT)
+        for chunk in self.chunks[1:]:
+            yield chunk
+        if self.error is not None:
+            raise self.error
+
+
+def _consume(generator, into):
+    thread = threading.Thread(target=lambda: into.extend(generator))
+    thread.start()
+    return thread
+
+
+def _wait_for(predicate):
+    for _ in range(TIMEOUT * 100):
+        if predicate():
+            return
+        time.sleep(0.01)
+    raise AssertionError('condition not reached')
+
+
+def test_normalize_question():
+    assert normalize_question('  What is  a Frame? ') == normalize_question('what is a frame')
+
+
+def test_follower_replays_buffered_prefix_and_follows_live_stream():
+    coalescer = StreamCoalescer('test')
+    upstream = _FakeUpstream(['a', 'b', 'c'])
+
+    leader, leader_info, leader_is_leader = coalescer.subscribe('q', upstream.start)
+    leader_chunks = []
+    leader_thread = _consume(leader, leader_chunks)
+    _wait_for(lambda: leader_chunks == ['a'])
+
+    follower, follower_info, follower_is_leader = coalescer.subscribe('q', upstream.start)
+    follower_chunks = []
+    follower_thread = _consume(follower, follower_chunks)
+    _wait_for(lambda: follower_chunks == ['a'])
+
+    upstream.release.set()
+    leader_thread.join(TIMEOUT)
+    follower_thread.join(TIMEOUT)
+
+    assert (leader_is_leader, follower_is_leader) == (True, False)
+    assert upstream.calls == 1
+    assert follower_info is leader_info == {'model': 'fake'}
+    assert leader_chunks == follower_chunks == ['a', 'b', 'c']
+
+
+def test_stream_error_reaches_every_subscriber():
+    coalescer = StreamCoalescer('test')
+    upstream = _FakeUpstream(['a', 'b'], error=RuntimeError('quota exceeded'))
+
+    subscribers = [coalescer.subscribe('q', upstream.start)[0] for _ in range(2)]
+    results = [[], []]
+    threads = [_consume(generator, into) for generator, into in zip(subscribers, results)]
+    upstream.release.set()
+    for thread in threads:
+        thread.join(TIMEOUT)
+
+    assert upstream.calls == 1
+    for chunks in results:
+        assert chunks[:2] == ['a', 'b']
+        assert 'quota exceeded' in chunks[-1]
+
+
+def test_start_failure_is_raised_to_waiting_followers():
+    coalescer = StreamCoalescer('test')
+    entered = threading.Event()
+    release = threading.Event()
+
+    def failing_start(info):
+        entered.set()
+        assert release.wait(TIMEOUT)
+        raise ConnectionError('upstream unavailable')
+
+    errors = {}
+
+    def subscribe(role, start):
+        try:
+            coalescer.subscribe('q', start)
+        except ConnectionError as e:
+            errors[role] = e
+
+    leader_thread = threading.Thread(target=subscribe, args=('leader', failing_start))
+    leader_thread.start()
+    assert entered.wait(TIMEOUT)
+    flight = coalescer._flights['q']
+
+    follower_start_calls = []
+    follower_thread = threading.Thread(target=subscribe, args=('follower', follower_start_calls.append))
+    follower_thread.start()
+    _wait_for(lambda: flight.cond._waiters)
+
+    release.set()
+    leader_thread.join(TIMEOUT)
+    follower_thread.join(TIMEOUT)
+
+    assert errors['follower'] is errors['leader']
+    assert follower_start_calls == []
+    assert coalescer._flights == {}
+
+
+def test_finished_flight_is_removed_and_next_request_leads():
+    coalescer = StreamCoalescer('test')
+    upstream = _FakeUpstream(['a', 'b'])
+    upstream.release.set()
+
+    generator, _, is_leader = coalescer.subscribe('q', upstream.start)
+    assert list(generator) == ['a', 'b']
+    _wait_for(lambda: coalescer._flights == {})
+
+    generator, _, is_leader_again = coalescer.subscribe('q', upstream.start)
+    assert list(generator) == ['a', 'b']
+    assert is_leader and is_leader_again
+    assert upstream.calls == 2
+
+
+def test_disabled_coalescer_starts_every_request():
+    coalescer = StreamCoalescer('test', enabled=False)
+    upstream = _FakeUpstream(['a'])
+
+    results = [coalescer.subscribe('q', upstream.start) for _ in range(2)]
+
+    assert upstream.calls == 2
+    assert all(is_leader for _, _, is_leader in results)
+    assert coalescer._flights == {}